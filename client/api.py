@@ -0,0 +1,302 @@
+# G-01: API-ify the Reservation System
+#
+# Group Name: 404 Team Not Found
+#
+# File Name: api.py
+#
+# Date: October 19, 2026
+
+
+# Importing Libraries
+import uuid
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# Base URL
+URL = 'http://127.0.0.1:8000/v1_0/'
+
+
+class ReservationClient:
+    '''
+    A programmatic client of the reservation system API.
+
+    All calls go through a single requests.Session, so connections to the
+    server are kept alive and reused from a connection pool instead of
+    opening a new TCP connection for every call.
+
+    Failed connections are retried with exponential backoff, and so are
+    responses with status 429, 502, 503 or 504. A 429 (or 503) response is
+    retried after the delay of its Retry-After header, so a client throttled
+    by the server waits for its token bucket to refill instead of failing.
+    Reservations and cancellations are sent with an Idempotency-Key header, so
+    a retried call is never handled twice by the server.
+
+    Attributes:
+        url (string): base URL of the versioned API.
+        timeout (float or tuple): timeout in seconds of every call.
+        session (requests.Session): the pooled session used for all calls.
+    '''
+
+    def __init__(self, url=URL, timeout=10, retries=3, backoff_factor=0.3, pool_maxsize=10, facility=None):
+        '''
+        Inputs:
+            url (string): base URL of the versioned API.
+            timeout (float or tuple): timeout in seconds of every call, or a
+                (connect timeout, read timeout) tuple.
+            retries (int): maximum number of retries of a call.
+            backoff_factor (float): base delay in seconds of the exponential
+                backoff between retries.
+            pool_maxsize (int): maximum number of connections kept open.
+            facility (string): optional, facility all the calls are made to,
+                sent in the X-Facility-Id header (default: the default facility).
+        '''
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+        if facility is not None:
+            self.session.headers['X-Facility-Id'] = facility
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'POST', 'DELETE']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        '''
+        This function closes all the pooled connections.
+
+        Inputs:
+            None.
+
+        Returns:
+            None.
+        '''
+        self.session.close()
+
+    def create_reservation(self, customer_id, resource, start_date, start_time, end_date=None, end_time=None,
+                           idempotency_key=None, days=None, waitlist=False):
+        '''
+        This function creates a (recurring) reservation.
+
+        Inputs:
+            customer_id (string): id of the customer.
+            resource (string): name of the resource to reserve.
+            start_date (string): start date of the reservation (mm-dd-yyyy).
+            start_time (string): start time of the reservation (hh:mm).
+            end_date (string): optional, end date of a recurring reservation.
+            end_time (string): optional, end time of the reservation.
+            idempotency_key (string): optional, key identifying the reservation
+                across retries (default: a new random key).
+            days (string): optional, days of the week of a recurring reservation,
+                e.g. weekdays or mon,wed,fri (default: every day).
+            waitlist (bool): optional, wait for a fully booked resource to
+                free up instead of being rejected (default: False).
+
+        Returns:
+            (requests.Response) the response of the server.
+        '''
+        json_object = {
+            "customer_id": customer_id,
+            "resource": resource,
+            "start_date": start_date,
+            "end_date": end_date,
+            "start_time": start_time,
+            "end_time": end_time,
+            "days": days,
+            "waitlist": waitlist
+        }
+        headers = {"Idempotency-Key": idempotency_key or uuid.uuid4().hex}
+        return self.session.post(self.url + 'reservations', json = json_object, headers = headers, timeout = self.timeout)
+
+    def cancel_reservation(self, reservation_id, idempotency_key=None):
+        '''
+        This function cancels a reservation.
+
+        Inputs:
+            reservation_id (string): id of the reservation to cancel.
+            idempotency_key (string): optional, key identifying the cancellation
+                across retries (default: a new random key).
+
+        Returns:
+            (requests.Response) the response of the server.
+        '''
+        json_object = {
+            "reservation_id": str(reservation_id)
+        }
+        headers = {"Idempotency-Key": idempotency_key or uuid.uuid4().hex}
+        return self.session.delete(self.url + 'reservations', json = json_object, headers = headers, timeout = self.timeout)
+
+    def cancel_reservations(self, reservation_ids=None, customer_id=None, start_date=None, end_date=None,
+                            idempotency_key=None):
+        '''
+        This function cancels several reservations at once, either a list of
+        reservations or all the reservations of a customer within a date range.
+
+        Inputs:
+            reservation_ids (list): optional, ids of the reservations to cancel.
+            customer_id (string): optional, customer whose reservations to cancel.
+            start_date (string): optional, first start date of the customer's reservations.
+            end_date (string): optional, last start date of the customer's reservations.
+            idempotency_key (string): optional, key identifying the cancellation
+                across retries (default: a new random key).
+
+        Returns:
+            (requests.Response) the response of the server.
+        '''
+        json_object = {
+            "reservation_ids": [str(reservation_id) for reservation_id in reservation_ids] if reservation_ids is not None else None,
+            "customer_id": customer_id,
+            "start_date": start_date,
+            "end_date": end_date
+        }
+        headers = {"Idempotency-Key": idempotency_key or uuid.uuid4().hex}
+        return self.session.delete(self.url + 'reservations/batch', json = json_object, headers = headers, timeout = self.timeout)
+
+    def get_waitlist_status(self, waitlist_id):
+        '''
+        This function gets the status of a waitlisted reservation request.
+
+        Inputs:
+            waitlist_id (string): id of the waitlisted request.
+
+        Returns:
+            (requests.Response) the response of the server.
+        '''
+        return self.session.get(self.url + f'waitlist/{waitlist_id}', timeout = self.timeout)
+
+    def get_quote(self, customer_id, resource, start_date, start_time, end_date=None, end_time=None, days=None):
+        '''
+        This function gets the price of a (recurring) reservation, and whether
+        it could be made, without making it.
+
+        Inputs:
+            customer_id (string): id of the customer.
+            resource (string): name of the resource to reserve.
+            start_date (string): start date of the reservation (mm-dd-yyyy).
+            start_time (string): start time of the reservation (hh:mm).
+            end_date (string): optional, end date of a recurring reservation.
+            end_time (string): optional, end time of the reservation.
+            days (string): optional, days of the week of a recurring reservation.
+
+        Returns:
+            (requests.Response) the response of the server.
+        '''
+        params = {
+            "customer_id": customer_id,
+            "resource": resource,
+            "start_date": start_date,
+            "end_date": end_date,
+            "start_time": start_time,
+            "end_time": end_time,
+            "days": days
+        }
+        return self.session.get(self.url + 'quote', params = params, timeout = self.timeout)
+
+    def get_reservations(self, start_date=None, end_date=None, customer_id=None):
+        '''
+        This function gets the report of the reservations within a date range.
+
+        Inputs:
+            start_date (string): optional, start date of the report.
+            end_date (string): optional, end date of the report.
+            customer_id (string): optional, customer to report on.
+
+        Returns:
+            (requests.Response) the response of the server.
+        '''
+        json_object = {
+            "start_date": start_date,
+            "end_date": end_date,
+            "customer_id": customer_id
+        }
+        return self.session.get(self.url + 'reservations', params = json_object, timeout = self.timeout)
+
+    def get_transactions(self, start_date=None, end_date=None):
+        '''
+        This function gets the financial transactions within a date range.
+
+        Inputs:
+            start_date (string): optional, start date of the report.
+            end_date (string): optional, end date of the report.
+
+        Returns:
+            (requests.Response) the response of the server.
+        '''
+        json_object = {
+            "start_date": start_date,
+            "end_date": end_date
+        }
+        return self.session.get(self.url + 'transactions', params = json_object, timeout = self.timeout)
+
+    def get_transactions_changes(self, after=0, limit=100):
+        '''
+        This function gets the transactions recorded after a sequence number,
+        the last_seq of the response being the sequence number to ask from next.
+
+        Inputs:
+            after (int): optional, sequence number to start after.
+            limit (int): optional, maximum number of transactions (at most 1000).
+
+        Returns:
+            (requests.Response) the response of the server.
+        '''
+        params = {
+            "after": after,
+            "limit": limit
+        }
+        return self.session.get(self.url + 'transactions/changes', params = params, timeout = self.timeout)
+
+    def get_customer_history(self, customer_id, after=0, limit=100):
+        '''
+        This function gets the history of a customer, a page at a time, the
+        last_seq of the response being the after of the next page.
+
+        Inputs:
+            customer_id (string): id of the customer.
+            after (int): optional, transaction id to start after.
+            limit (int): optional, maximum number of entries (at most 1000).
+
+        Returns:
+            (requests.Response) the response of the server.
+        '''
+        params = {
+            "after": after,
+            "limit": limit
+        }
+        return self.session.get(self.url + f'customers/{customer_id}/history', params = params, timeout = self.timeout)
+
+    def get_transactions_summary(self, start_date=None, end_date=None, resource=None):
+        '''
+        This function gets the revenue, deposits and refunds per day and
+        resource within a date range.
+
+        Inputs:
+            start_date (string): optional, start date of the summary.
+            end_date (string): optional, end date of the summary.
+            resource (string): optional, resource to summarize.
+
+        Returns:
+            (requests.Response) the response of the server.
+        '''
+        json_object = {
+            "start_date": start_date,
+            "end_date": end_date,
+            "resource": resource
+        }
+        return self.session.get(self.url + 'transactions/summary', params = json_object, timeout = self.timeout)
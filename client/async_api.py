@@ -0,0 +1,286 @@
+# G-01: API-ify the Reservation System
+#
+# Group Name: 404 Team Not Found
+#
+# File Name: async_api.py
+#
+# Date: October 19, 2026
+
+
+# Importing Libraries
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import httpx
+from api import URL
+
+
+class AsyncReservationClient:
+    '''
+    An asynchronous client of the reservation system API, built on
+    httpx.AsyncClient, so that independent queries can run concurrently
+    over a pool of kept-alive connections.
+
+    Any httpx transport can be given, e.g. httpx.ASGITransport(app=web.app)
+    to run the client against the server application in-process.
+
+    Attributes:
+        client (httpx.AsyncClient): the pooled client used for all calls.
+    '''
+
+    def __init__(self, url=URL, timeout=10, max_connections=10, transport=None, facility=None):
+        '''
+        Inputs:
+            url (string): base URL of the versioned API.
+            timeout (float): timeout in seconds of every call.
+            max_connections (int): maximum number of connections kept open.
+            transport (httpx.AsyncBaseTransport): optional, transport to
+                send the requests through.
+            facility (string): optional, facility all the calls are made to,
+                sent in the X-Facility-Id header (default: the default facility).
+        '''
+        self.client = httpx.AsyncClient(
+            base_url = url,
+            timeout = timeout,
+            limits = httpx.Limits(max_connections = max_connections),
+            transport = transport,
+            headers = {"X-Facility-Id": facility} if facility is not None else None
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def close(self):
+        '''
+        This function closes all the pooled connections.
+
+        Inputs:
+            None.
+
+        Returns:
+            None.
+        '''
+        await self.client.aclose()
+
+    async def create_reservation(self, customer_id, resource, start_date, start_time, end_date=None, end_time=None,
+                                 idempotency_key=None, days=None, waitlist=False):
+        '''
+        This function creates a (recurring) reservation.
+
+        Inputs:
+            customer_id (string): id of the customer.
+            resource (string): name of the resource to reserve.
+            start_date (string): start date of the reservation (mm-dd-yyyy).
+            start_time (string): start time of the reservation (hh:mm).
+            end_date (string): optional, end date of a recurring reservation.
+            end_time (string): optional, end time of the reservation.
+            idempotency_key (string): optional, key identifying the reservation
+                across retries (default: a new random key).
+            days (string): optional, days of the week of a recurring reservation,
+                e.g. weekdays or mon,wed,fri (default: every day).
+            waitlist (bool): optional, wait for a fully booked resource to
+                free up instead of being rejected (default: False).
+
+        Returns:
+            (httpx.Response) the response of the server.
+        '''
+        json_object = {
+            "customer_id": customer_id,
+            "resource": resource,
+            "start_date": start_date,
+            "end_date": end_date,
+            "start_time": start_time,
+            "end_time": end_time,
+            "days": days,
+            "waitlist": waitlist
+        }
+        headers = {"Idempotency-Key": idempotency_key or uuid.uuid4().hex}
+        return await self.client.post('reservations', json = json_object, headers = headers)
+
+    async def cancel_reservation(self, reservation_id, idempotency_key=None):
+        '''
+        This function cancels a reservation.
+
+        Inputs:
+            reservation_id (string): id of the reservation to cancel.
+            idempotency_key (string): optional, key identifying the cancellation
+                across retries (default: a new random key).
+
+        Returns:
+            (httpx.Response) the response of the server.
+        '''
+        json_object = {
+            "reservation_id": str(reservation_id)
+        }
+        headers = {"Idempotency-Key": idempotency_key or uuid.uuid4().hex}
+        return await self.client.request('DELETE', 'reservations', json = json_object, headers = headers)
+
+    async def get_reservations(self, start_date=None, end_date=None, customer_id=None):
+        '''
+        This function gets the report of the reservations within a date range.
+
+        Inputs:
+            start_date (string): optional, start date of the report.
+            end_date (string): optional, end date of the report.
+            customer_id (string): optional, customer to report on.
+
+        Returns:
+            (httpx.Response) the response of the server.
+        '''
+        params = without_none({
+            "start_date": start_date,
+            "end_date": end_date,
+            "customer_id": customer_id
+        })
+        return await self.client.get('reservations', params = params)
+
+    async def get_transactions(self, start_date=None, end_date=None):
+        '''
+        This function gets the financial transactions within a date range.
+
+        Inputs:
+            start_date (string): optional, start date of the report.
+            end_date (string): optional, end date of the report.
+
+        Returns:
+            (httpx.Response) the response of the server.
+        '''
+        params = without_none({
+            "start_date": start_date,
+            "end_date": end_date
+        })
+        return await self.client.get('transactions', params = params)
+
+    async def get_transactions_summary(self, start_date=None, end_date=None, resource=None):
+        '''
+        This function gets the revenue, deposits and refunds per day and
+        resource within a date range.
+
+        Inputs:
+            start_date (string): optional, start date of the summary.
+            end_date (string): optional, end date of the summary.
+            resource (string): optional, resource to summarize.
+
+        Returns:
+            (httpx.Response) the response of the server.
+        '''
+        params = without_none({
+            "start_date": start_date,
+            "end_date": end_date,
+            "resource": resource
+        })
+        return await self.client.get('transactions/summary', params = params)
+
+    async def report_pages(self, report, start_date=None, end_date=None, customer_id=None, window_days=7):
+        '''
+        This async generator pages through a report one date window at a
+        time. The request for the next window is already in flight while
+        the caller is processing (e.g. displaying) the current one.
+
+        Inputs:
+            report (string): "reservations" or "transactions".
+            start_date (string): optional, start date of the report (default: today).
+            end_date (string): optional, end date of the report (default: 7 days from start_date).
+            customer_id (string): optional, customer to report on (reservations only).
+            window_days (int): number of days covered by each page.
+
+        Yields:
+            (list) the rows of the report for each date window, in date order.
+
+        Raises:
+            httpx.HTTPStatusError: if the server rejects one of the requests.
+        '''
+        windows = date_windows(start_date, end_date, window_days)
+        if len(windows) == 0:
+            return
+
+        def fetch(window):
+            if report == 'reservations':
+                return asyncio.ensure_future(self.get_reservations(window[0], window[1], customer_id))
+            return asyncio.ensure_future(self.get_transactions(window[0], window[1]))
+
+        pending = fetch(windows[0])
+        try:
+            for i in range(len(windows)):
+                response = await pending
+                pending = fetch(windows[i + 1]) if i + 1 < len(windows) else None
+                response.raise_for_status()
+                yield response.json()["detail"][report]
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    async def dashboard(self, start_date=None, end_date=None, customer_id=None):
+        '''
+        This function loads everything an operator dashboard shows for a date
+        range, the reservations, transactions and financial summary, with
+        all three queries running concurrently.
+
+        Inputs:
+            start_date (string): optional, start date of the dashboard.
+            end_date (string): optional, end date of the dashboard.
+            customer_id (string): optional, customer to report reservations on.
+
+        Returns:
+            (dict) the detail of the three responses, under the keys
+            "reservations", "transactions" and "summary".
+
+        Raises:
+            httpx.HTTPStatusError: if the server rejects one of the requests.
+        '''
+        responses = await asyncio.gather(
+            self.get_reservations(start_date, end_date, customer_id),
+            self.get_transactions(start_date, end_date),
+            self.get_transactions_summary(start_date, end_date)
+        )
+        for response in responses:
+            response.raise_for_status()
+        reservations, transactions, summary = (response.json()["detail"] for response in responses)
+        return {
+            "reservations": reservations["reservations"],
+            "transactions": transactions["transactions"],
+            "summary": summary
+        }
+
+
+def without_none(params):
+    '''
+    This function drops the query parameters that are not set.
+
+    Inputs:
+        params (dict): query parameters.
+
+    Returns:
+        (dict) the parameters whose value is not None.
+    '''
+
+    return {key: value for key, value in params.items() if value is not None}
+
+
+def date_windows(start_date, end_date, window_days):
+    '''
+    This function splits a date range into consecutive windows, with the
+    same defaults as the server (today, and 7 days after the start date).
+
+    Inputs:
+        start_date (string): start date of the range (mm-dd-yyyy), or None.
+        end_date (string): end date of the range (mm-dd-yyyy), or None.
+        window_days (int): number of days in each window.
+
+    Returns:
+        (list) (start date, end date) string pairs of every window.
+    '''
+
+    start = datetime.strptime(start_date, "%m-%d-%Y") if start_date else datetime.today()
+    end = datetime.strptime(end_date, "%m-%d-%Y") if end_date else start + timedelta(days = 7)
+
+    windows = []
+    while start <= end:
+        last = min(start + timedelta(days = window_days - 1), end)
+        windows.append((start.strftime("%m-%d-%Y"), last.strftime("%m-%d-%Y")))
+        start = last + timedelta(days = 1)
+    return windows
@@ -0,0 +1,201 @@
+# G-01: API-ify the Reservation System
+#
+# Group Name: 404 Team Not Found
+#
+# File Name: batch.py
+#
+# Date: October 19, 2026
+
+
+# Importing Libraries
+import argparse
+import csv
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from api import URL, ReservationClient
+
+
+# Columns (CSV) or keys (JSON lines) of a row, only the ones needed by the
+# action of the row have to be filled in
+FIELDS = ['action', 'customer_id', 'resource', 'start_date', 'end_date',
+          'start_time', 'end_time', 'reservation_id']
+
+# One API client per worker thread, so each worker keeps its own connection alive
+local = threading.local()
+
+
+def read_rows(path):
+    '''
+    This function reads the rows of a batch file. Files ending in .csv are read
+    as CSV with a header line, any other file is read as JSON lines.
+
+    Inputs:
+        path (string): path of the batch file.
+
+    Returns:
+        (list) a dict for every row, with empty values replaced by None.
+    '''
+
+    rows = []
+    with open(path, newline='') as file:
+        if path.lower().endswith('.csv'):
+            lines = csv.DictReader(file)
+        else:
+            lines = (json.loads(line) for line in file if line.strip())
+
+        for line in lines:
+            row = {}
+            for field in FIELDS:
+                value = line.get(field)
+                row[field] = str(value).strip() if value not in (None, '') else None
+            rows.append(row)
+    return rows
+
+
+def get_client(url, timeout):
+    '''
+    This function returns the API client of the current worker thread.
+
+    Inputs:
+        url (string): base URL of the versioned API.
+        timeout (float): timeout in seconds of every call.
+
+    Returns:
+        (ReservationClient) the client of the thread.
+    '''
+
+    if not hasattr(local, 'client'):
+        local.client = ReservationClient(url, timeout = timeout, pool_maxsize = 1)
+    return local.client
+
+
+def submit_row(number, row, url, timeout):
+    '''
+    This function submits a single row of the batch to the server.
+
+    Inputs:
+        number (int): line number of the row in the batch, starting at 1.
+        row (dict): the row to submit.
+        url (string): base URL of the versioned API.
+        timeout (float): timeout in seconds of every call.
+
+    Returns:
+        (dict) the result of the row: its number, action, status code,
+        whether it succeeded and the detail returned by the server.
+    '''
+
+    client = get_client(url, timeout)
+    action = (row['action'] or 'reserve').lower()
+    result = {"row": number, "action": action}
+
+    try:
+        if action == 'reserve':
+            response = client.create_reservation(row['customer_id'], row['resource'],
+                row['start_date'], row['start_time'], row['end_date'], row['end_time'])
+        elif action == 'cancel':
+            response = client.cancel_reservation(row['reservation_id'])
+        else:
+            result.update(status_code = None, ok = False, detail = "Unknown action: {}".format(action))
+            return result
+    except requests.RequestException as error:
+        result.update(status_code = None, ok = False, detail = str(error))
+        return result
+
+    try:
+        detail = response.json()["detail"]
+    except ValueError:
+        detail = response.text
+    result.update(status_code = response.status_code, ok = response.ok, detail = detail)
+    return result
+
+
+def describe(result):
+    '''
+    This function formats the result of a row for the console.
+
+    Inputs:
+        result (dict): the result of a row, as returned by submit_row.
+
+    Returns:
+        (string) a single line describing the result.
+    '''
+
+    if not result["ok"]:
+        return "Row {} ({}): failed [{}] {}".format(result["row"], result["action"],
+            result["status_code"], result["detail"])
+    detail = result["detail"]
+    if result["action"] == 'reserve':
+        return "Row {} (reserve): reservation ID {}, total cost ${}, down payment ${}".format(
+            result["row"], detail["reservation_id"], detail["total_cost"], detail["down_payment"])
+    return "Row {} (cancel): refund {}%, ${}".format(result["row"],
+        detail["percent_returned"], detail["refund"])
+
+
+def run_batch(rows, url=URL, workers=8, timeout=10):
+    '''
+    This function submits all the rows of a batch concurrently, with at most
+    "workers" requests in flight at any time.
+
+    Inputs:
+        rows (list): the rows to submit, as returned by read_rows.
+        url (string): base URL of the versioned API.
+        workers (int): size of the worker pool.
+        timeout (float): timeout in seconds of every call.
+
+    Returns:
+        (list) the result of every row, in the order of the rows.
+        (float) the time taken in seconds.
+    '''
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers = workers) as executor:
+        results = list(executor.map(lambda item: submit_row(item[0], item[1], url, timeout),
+                                    enumerate(rows, start = 1)))
+    return results, time.perf_counter() - start
+
+
+def main(argv=None):
+    '''
+    This function runs the non-interactive client: it submits every
+    reservation or cancellation of a CSV/JSON lines file and prints the
+    result of each row followed by the throughput.
+
+    Inputs:
+        argv (list): command line arguments, defaults to sys.argv.
+
+    Returns:
+        (int) 0 if every row succeeded, 1 otherwise.
+    '''
+
+    parser = argparse.ArgumentParser(description = "Submit a batch of reservations and cancellations.")
+    parser.add_argument('file', help = "CSV (with a header line) or JSON lines file; columns: " + ", ".join(FIELDS))
+    parser.add_argument('--workers', type = int, default = 8, help = "number of concurrent requests (default: 8)")
+    parser.add_argument('--url', default = URL, help = "base URL of the API (default: {})".format(URL))
+    parser.add_argument('--timeout', type = float, default = 10, help = "timeout of every request in seconds (default: 10)")
+    parser.add_argument('--output', help = "also write the result of every row to this JSON lines file")
+    args = parser.parse_args(argv)
+
+    rows = read_rows(args.file)
+    results, elapsed = run_batch(rows, args.url, max(1, args.workers), args.timeout)
+
+    for result in results:
+        print(describe(result))
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            for result in results:
+                file.write(json.dumps(result) + "\n")
+
+    succeeded = sum(1 for result in results if result["ok"])
+    print("\n{} rows: {} succeeded, {} failed".format(len(results), succeeded, len(results) - succeeded))
+    if elapsed > 0:
+        print("Elapsed: {:.2f}s, throughput: {:.1f} rows/s".format(elapsed, len(results) / elapsed))
+    return 0 if succeeded == len(results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -8,13 +8,17 @@
 
 
 # Importing Libraries
-import requests
 import sys
+import batch
+from api import ReservationClient
 
 
 # Base URL
 URL = 'http://127.0.0.1:8000/v1_0/'
 
+# API client shared by all the menus, reusing its pooled connections
+client = ReservationClient(URL)
+
 
 def resource_name(book):
     '''
@@ -78,7 +82,7 @@ def print_details(json_object):
     '''
     
     # Posting the request
-    response = requests.post(URL + "reservations", json = json_object)
+    response = client.create_reservation(**json_object)
     response_info = response.json()
 
     if response.status_code == 201:
@@ -231,12 +235,8 @@ def cancellation():
     if check == "No":
         main()
     else:
-        json_object = {
-            "reservation_id": res_id
-        }
-        
         # Deleting the request
-        response = requests.delete(URL + 'reservations', json = json_object)
+        response = client.cancel_reservation(res_id)
         response_info = response.json()
 
         if response.status_code == 200:
@@ -310,13 +310,7 @@ def all_reservations_for_user():
     # User Inputs
     name = input("\nEnter your name (Leave blank and press enter for all users): ") 
     startdate, enddate = get_daterange()
-    json_object = {
-        "start_date": startdate,
-        "end_date": enddate,
-        "customer_id": name 
-    }
-
-    response = requests.get(URL + 'reservations', params = json_object)
+    response = client.get_reservations(startdate, enddate, name)
     response_info = response.json()
     
     results_per_page = 5
@@ -395,12 +389,7 @@ def financial_transactions():
     '''
 
     startdate, enddate = get_daterange()
-    json_object = {
-        "start_date": startdate,
-        "end_date": enddate
-    }
-
-    response = requests.get(URL + 'transactions', params = json_object)
+    response = client.get_transactions(startdate, enddate)
     response_info = response.json()
     
     results_per_page = 5
@@ -504,5 +493,9 @@ def main():
     sys.exit("\nThank you for using the MPCS Inc. Reservation System")
 
 if __name__ == "__main__":
+    # With a batch file given on the command line, run non-interactively
+    if len(sys.argv) > 1:
+        sys.exit(batch.main(sys.argv[1:]))
+
     # Calling the main execution
     main()
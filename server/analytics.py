@@ -0,0 +1,209 @@
+# G-01: API-ify the Reservation System
+#
+# Group Name: 404 Team Not Found
+#
+# File Name: analytics.py
+#
+# Date: October 19, 2026
+
+import threading
+from datetime import timedelta
+import numpy as np
+import opening_hours
+import reserve
+
+# Half hour slots of a day, the slot of a time in the integer representation
+# of reserve.split_time is the time // 5
+SLOTS_PER_DAY = 48
+
+# Slots reported, from the opening of the workshop to its closing on mondays
+# (see opening_hours.WEEKLY_HOURS)
+OPENING_SLOT, CLOSING_SLOT = (slot // 5 for slot in opening_hours.WEEKLY_HOURS[0])
+
+RESOURCE_INDEX = {resource: index for index, resource in enumerate(reserve.RESOURCES)}
+
+
+def capacity(resource):
+    """
+    Returns how many reservations of a resource can overlap, the limit of
+    reserve.is_available
+    """
+    count = 0
+    while reserve.is_available(resource, count + 1):
+        count += 1
+    return count
+
+
+class Occupancy:
+    """
+    The number of reservations of every resource in every half hour slot of
+    every day, as a resource x day x slot tensor grown as reservations on
+    new days come in
+
+    Attributes:
+        origin (int): The ordinal (date.toordinal) of the first day of the tensor
+        counts (numpy.ndarray): The number of reservations of resource r in
+            slot s of day origin + d at counts[r, d, s]
+    """
+    def __init__(self):
+        self.origin = 0
+        self.counts = np.zeros((len(RESOURCE_INDEX), 0, SLOTS_PER_DAY), dtype=np.int32)
+
+    def add(self, reservation, count=1):
+        """
+        Count a reservation in the slots of its days, a negative count takes
+        it out again
+        """
+        resource = RESOURCE_INDEX.get(reservation.reservation_type)
+        days = np.fromiter((day.toordinal() for day in reservation.series), dtype=np.int64)
+        if resource is None or len(days) == 0:
+            return
+        self.cover(int(days[0]), int(days[-1]))
+        self.counts[resource, days - self.origin, reservation.start_slot // 5:reservation.end_slot // 5] += count
+
+    def cover(self, first, last):
+        """
+        Grow the tensor to cover the days from the ordinal first to the
+        ordinal last, by at least its own length to keep growing cheap
+        """
+        length = self.counts.shape[1]
+        end = self.origin + length
+        if length == 0:
+            origin, new_end = first, last + 1
+        elif self.origin <= first and last < end:
+            return
+        else:
+            origin, new_end = min(self.origin, first), max(end, last + 1)
+            if origin < self.origin:
+                origin = min(origin, self.origin - length)
+            if new_end > end:
+                new_end = max(new_end, end + length)
+        counts = np.zeros((self.counts.shape[0], new_end - origin, SLOTS_PER_DAY), dtype=np.int32)
+        counts[:, self.origin - origin:self.origin - origin + length] = self.counts
+        self.origin, self.counts = origin, counts
+
+    def window(self, first_day, last_day):
+        """
+        Returns the counts of the days from first_day to last_day, as a
+        resource x day x slot tensor (zeros for days without reservations)
+        """
+        first, last = first_day.toordinal(), last_day.toordinal()
+        window = np.zeros((self.counts.shape[0], last - first + 1, SLOTS_PER_DAY), dtype=np.int32)
+        start, end = max(first, self.origin), min(last + 1, self.origin + self.counts.shape[1])
+        if start < end:
+            window[:, start - first:end - first] = self.counts[:, start - self.origin:end - self.origin]
+        return window
+
+
+class Utilization:
+    """
+    Answers utilization queries from the Occupancy of the reservations
+
+    The occupancy is brought up to date with the ledgers of transactions
+    before every query: reservations count in their slots, cancellations
+    take them out. Only the transactions recorded since the last query are
+    applied, and reports are cached until new ones are
+
+    Attributes:
+        ledger (callable): Returns the transactions recorded after a
+            transaction id, in order (reserve.transactions_after)
+        occupancy (Occupancy): The occupancy of the transactions applied
+        last (Transaction): The last transaction applied, None for none
+        reports (dict): Cached reports by query
+        lock (threading.Lock): Protects the occupancy and the cache
+    """
+    def __init__(self, ledger=reserve.transactions_after, max_reports=128):
+        self.ledger = ledger
+        self.max_reports = max_reports
+        self.occupancy = Occupancy()
+        self.last = None
+        self.reports = {}
+        self.lock = threading.Lock()
+
+    def update(self):
+        """
+        Apply the transactions recorded since the last update, starting over
+        if the ledgers no longer hold the last transaction applied (e.g. the
+        data files were reset). The lock must be held
+        """
+        if self.last is not None:
+            transactions = self.ledger(self.last.transaction_id - 1)
+            if len(transactions) == 0 or transactions[0].reservation_string != self.last.reservation_string:
+                self.occupancy, self.last = Occupancy(), None
+                self.reports.clear()
+                transactions = self.ledger(0)
+            else:
+                transactions = transactions[1:]
+        else:
+            transactions = self.ledger(0)
+        for transaction in transactions:
+            self.occupancy.add(transaction.detail, 1 if transaction.type == 'RESERVATION' else -1)
+        if transactions:
+            self.last = transactions[-1]
+            self.reports.clear()
+
+    def report(self, first_day, last_day, resources=reserve.RESOURCES, peaks=5):
+        """
+        Report the utilization of resources between two days
+
+        Args:
+            first_day (date): The first day of the report
+            last_day (date): The last day of the report
+            resources (list): The resources to report on
+            peaks (int): The number of peak hours to report
+
+        Returns:
+            A dict with the slots reported (from opening to closing time) and,
+            for every resource, its capacity, its mean utilization, a heatmap
+            of the mean utilization in every slot of every day of the week,
+            the peak hours of the heatmap, and the most reservations at once
+        """
+        key = (first_day, last_day, tuple(resources), peaks)
+        with self.lock:
+            self.update()
+            if key not in self.reports:
+                if len(self.reports) >= self.max_reports:
+                    self.reports.clear()
+                self.reports[key] = utilization_report(self.occupancy.window(first_day, last_day), first_day,
+                                                       resources, peaks)
+            return self.reports[key]
+
+
+def utilization_report(window, first_day, resources, peaks):
+    """
+    Compute the utilization report of Utilization.report from the occupancy
+    of the days reported
+    """
+    weekdays = np.array([(first_day + timedelta(days=offset)).weekday() for offset in range(window.shape[1])])
+    slots = [reserve.format_slot(slot * 5) for slot in range(OPENING_SLOT, CLOSING_SLOT)]
+    report = {"slots": slots, "resources": {}}
+    for resource in resources:
+        counts = window[RESOURCE_INDEX[resource], :, OPENING_SLOT:CLOSING_SLOT]
+        resource_capacity = capacity(resource)
+        utilization = counts / resource_capacity
+        # Mean utilization of every slot of every day of the week, over the
+        # days of the report falling on that day of the week
+        heatmap = np.zeros((7, len(slots)))
+        for weekday in range(7):
+            days = utilization[weekdays == weekday]
+            if len(days) > 0:
+                heatmap[weekday] = days.mean(axis=0)
+        busiest = zip(*np.unravel_index(np.argsort(-heatmap, axis=None, kind='stable')[:peaks], heatmap.shape))
+        day, slot = np.unravel_index(np.argmax(counts), counts.shape)
+        report["resources"][resource] = {
+            "capacity": resource_capacity,
+            "utilization": round(float(utilization.mean()), 4),
+            "heatmap": {reserve.WEEKDAY_NAMES[weekday]: [round(float(value), 4) for value in heatmap[weekday]]
+                        for weekday in range(7)},
+            "peak_hours": [{"day": reserve.WEEKDAY_NAMES[weekday], "time": slots[slot],
+                            "utilization": round(float(heatmap[weekday, slot]), 4)}
+                           for weekday, slot in busiest if heatmap[weekday, slot] > 0],
+            "max_reserved": {"count": int(counts[day, slot]),
+                             "date": (first_day + timedelta(days=int(day))).strftime('%m-%d-%Y'),
+                             "time": slots[slot]} if counts[day, slot] > 0 else None
+        }
+    return report
+
+
+# Utilization of the reservations of the server
+utilization = Utilization()
@@ -0,0 +1,191 @@
+# G-01: API-ify the Reservation System
+#
+# Group Name: 404 Team Not Found
+#
+# File Name: events.py
+#
+# Date: October 19, 2026
+
+import asyncio
+import collections
+import os
+import threading
+import orjson
+from starlette.concurrency import run_in_threadpool
+
+
+def delta(transaction):
+    """
+    Convert a recorded transaction to the change it makes to the reservations
+
+    Args:
+        transaction (reserve.Transaction): A RESERVATION or CANCELLATION transaction
+
+    Returns:
+        A dict with the sequence number of the change (the id of the
+        transaction), its type (reserve or cancel), its date and the
+        reservation made or cancelled, as in the 'GET reservations' report
+    """
+    return {
+        "seq": transaction.transaction_id,
+        "type": "reserve" if transaction.type == 'RESERVATION' else "cancel",
+        "date": transaction.transaction_date,
+        "reservation": transaction.detail.report_data()
+    }
+
+
+def format_event(event):
+    """
+    Format a change as a Server-Sent Event, its sequence number being the
+    event id a client resumes from (Last-Event-ID)
+    """
+    data = orjson.dumps(event).decode()
+    return f"id: {event['seq']}\nevent: {event['type']}\ndata: {data}\n\n"
+
+
+class Subscriber:
+    """
+    A client of the feed, receiving the changes in the queue of its event loop
+
+    Attributes:
+        loop (asyncio.AbstractEventLoop): The event loop the client runs in
+        queue (asyncio.Queue): The changes not sent to the client yet
+        overflowed (bool): Set when the client fell too far behind, it is
+            then disconnected and has to resume from its last sequence number
+    """
+    def __init__(self, loop, max_pending):
+        self.loop = loop
+        self.queue = asyncio.Queue(max_pending)
+        self.overflowed = False
+
+    def deliver(self, event):
+        """
+        Queue a change, runs in the event loop of the subscriber
+        """
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            # The pending changes are dropped, the client resumes from the
+            # last change it was sent once it is woken up
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class Feed:
+    """
+    Pushes the changes to the reservations to the subscribed clients as they
+    are recorded, so that they can keep their own view up to date instead of
+    polling the reports
+
+    Changes are published by the request handlers, which run in worker
+    threads, in the order of their sequence numbers. They are handed over to
+    the event loop of every subscriber. The latest ones are kept so that a
+    client resuming from a recent sequence number gets the changes it missed,
+    older ones are replayed from the ledgers of transactions
+
+    Attributes:
+        history (collections.deque): The latest changes, oldest first
+        subscribers (set): The connected Subscriber objects
+        max_pending (int): How many changes a client can fall behind before
+            it is disconnected
+        lock (threading.Lock): Protects history and subscribers
+    """
+    def __init__(self, history=1024, max_pending=1024):
+        self.history = collections.deque(maxlen=history)
+        self.subscribers = set()
+        self.max_pending = max_pending
+        self.lock = threading.Lock()
+
+    def publish(self, transaction):
+        """
+        Publish the change made by a transaction to every subscriber, the
+        transactions must be published in the order of their ids
+        """
+        event = delta(transaction)
+        with self.lock:
+            self.history.append(event)
+            for subscriber in list(self.subscribers):
+                try:
+                    subscriber.loop.call_soon_threadsafe(subscriber.deliver, event)
+                except RuntimeError:
+                    # The event loop of the client is closed
+                    self.subscribers.discard(subscriber)
+
+    def subscribe(self, after):
+        """
+        Subscribe to the changes after a sequence number, must be called from
+        the event loop of the client
+
+        Args:
+            after (int): The sequence number of the last change the client
+                has seen, 0 for none
+
+        Returns:
+            (subscriber, missed) where missed lists the changes after the
+            sequence number published before the subscription, or is None
+            when they are no longer all kept in history
+        """
+        subscriber = Subscriber(asyncio.get_running_loop(), self.max_pending)
+        with self.lock:
+            self.subscribers.add(subscriber)
+            history = list(self.history)
+        if len(history) == 0 or history[0]["seq"] > after + 1:
+            return subscriber, None
+        return subscriber, [event for event in history if event["seq"] > after]
+
+    def unsubscribe(self, subscriber):
+        """
+        Stop sending changes to a subscriber
+        """
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    async def stream(self, after, replay, heartbeat=15):
+        """
+        Yield the changes after a sequence number as Server-Sent Events, the
+        changes missed first, then the new ones as they are published. A
+        comment is sent when nothing happened for heartbeat seconds, so that
+        proxies keep the connection open
+
+        Args:
+            after (int): The sequence number to resume from
+            replay (callable): Returns the transactions after a sequence
+                number from the ledgers, in order, for the changes no longer
+                in history. It is called in a worker thread
+            heartbeat (float): Seconds between keep-alive comments
+        """
+        subscriber, missed = self.subscribe(after)
+        try:
+            if missed is None:
+                # The ledgers have all the missed changes, and possibly some
+                # already queued, which are skipped below
+                missed = [delta(transaction) for transaction in await run_in_threadpool(replay, after)]
+            last = after
+            for event in missed:
+                last = event["seq"]
+                yield format_event(event)
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:
+                    # Too far behind, the client reconnects from its last event
+                    return
+                if event["seq"] <= last:
+                    continue
+                last = event["seq"]
+                yield format_event(event)
+        finally:
+            self.unsubscribe(subscriber)
+
+
+# Feed of the server, configured by the FEED_HISTORY (changes kept for
+# resuming clients) and FEED_MAX_PENDING environment variables
+feed = Feed(history=int(os.environ.get('FEED_HISTORY', 1024)),
+            max_pending=int(os.environ.get('FEED_MAX_PENDING', 1024)))
@@ -0,0 +1,129 @@
+# G-01: API-ify the Reservation System
+#
+# Group Name: 404 Team Not Found
+#
+# File Name: export.py
+#
+# Date: October 19, 2026
+
+import os
+import zlib
+import orjson
+
+
+class LedgerExport:
+    """
+    Keeps a newline delimited JSON file of every transaction of the system,
+    one transaction_data object (as in the 'GET transactions' report) per
+    line in the order of the transaction ids, so that local consumers can
+    tail the file rather than pull the reports again and again
+
+    Transactions are appended as they are recorded (see reserve.transaction_listeners).
+    Whenever the file does not end with the transaction before the one recorded,
+    e.g. when the server starts or the data files were reset, it is synced
+    with the ledgers: like a snapshot (see snapshot.py) the file is only kept
+    if the crc32 checksum of its content matches the one of the transactions
+    it should hold, otherwise it is written again
+
+    Attributes:
+        path (str): The file the transactions are exported to
+        ledger (callable): Returns every transaction of the system in the
+            order of their ids
+        last (int): The id of the last transaction in the file, 0 for none,
+            None if the file has to be written again
+        checksum (int): The crc32 checksum of the content of the file
+        file (file): The file opened for appending, None until it is synced
+    """
+    def __init__(self, path, ledger):
+        self.path = path
+        self.ledger = ledger
+        self.last, self.checksum = read_export(path)
+        self.file = None
+
+    def publish(self, transaction):
+        """
+        Export a transaction just recorded, the transactions must be passed
+        in the order of their ids (reserve.ids_lock held)
+        """
+        if self.file is None or transaction.transaction_id != self.last + 1:
+            self.sync()
+            return
+        self.write(transaction)
+        self.file.flush()
+
+    def sync(self):
+        """
+        Bring the file up to date with the ledgers, appending the transactions
+        it misses or writing it again if it does not match them. No
+        transaction may be recorded meanwhile (reserve.ids_lock held)
+        """
+        transactions = list(self.ledger())
+        if self.file is not None:
+            self.file.close()
+        if self.last is None or self.last > len(transactions) or \
+                ledger_checksum(transactions[:self.last]) != self.checksum:
+            # Exported from other data files
+            temp_path = self.path + '.tmp'
+            with open(temp_path, 'wb') as file:
+                for transaction in transactions:
+                    file.write(encode(transaction))
+            os.replace(temp_path, self.path)
+            self.last = transactions[-1].transaction_id if transactions else 0
+            self.checksum = ledger_checksum(transactions)
+            self.file = open(self.path, 'ab')
+            return
+        self.file = open(self.path, 'ab')
+        for transaction in transactions[self.last:]:
+            self.write(transaction)
+        self.file.flush()
+
+    def write(self, transaction):
+        """
+        Append a transaction to the file
+        """
+        line = encode(transaction)
+        self.file.write(line)
+        self.checksum = zlib.crc32(line, self.checksum)
+        self.last = transaction.transaction_id
+
+
+def encode(transaction):
+    """
+    Returns the line of a transaction in the export file
+    """
+    return orjson.dumps(transaction.report_data()) + b'\n'
+
+
+def ledger_checksum(transactions):
+    """
+    Returns the crc32 checksum of the export file of some transactions
+    """
+    checksum = 0
+    for transaction in transactions:
+        checksum = zlib.crc32(encode(transaction), checksum)
+    return checksum
+
+
+def read_export(path):
+    """
+    Returns the id of the last transaction of an export file (0 if there is
+    none) and the crc32 checksum of the file. The id is None if the file ends
+    with an incomplete line, e.g. after a crash
+    """
+    checksum, data = 0, b''
+    try:
+        with open(path, 'rb') as file:
+            # Only the end of the file is kept to find the last transaction
+            for chunk in iter(lambda: file.read(1 << 20), b''):
+                checksum = zlib.crc32(chunk, checksum)
+                data = (data + chunk)[-4096:]
+    except FileNotFoundError:
+        return 0, 0
+    if len(data) > 0 and not data.endswith(b'\n'):
+        return None, checksum
+    for line in reversed(data.splitlines()):
+        try:
+            return int(orjson.loads(line)["transaction_id"]), checksum
+        except (orjson.JSONDecodeError, KeyError, TypeError, ValueError):
+            continue
+    return 0, checksum
@@ -0,0 +1,97 @@
+# G-01: API-ify the Reservation System
+#
+# Group Name: 404 Team Not Found
+#
+# File Name: facilities.py
+#
+# Date: October 19, 2026
+
+import threading
+import orjson
+import reserve
+
+
+class FacilityMiddleware:
+    """
+    ASGI middleware routing a request to the facility named by its
+    X-Facility-Id header, see reserve.Facility. The reservation system then
+    works on the data partition of that facility while the request is
+    handled. Requests without the header go to the default facility
+
+    A request naming an invalid facility id is rejected with 400, one naming
+    a facility without a data directory with 404
+    """
+    def __init__(self, app, header=b'x-facility-id'):
+        self.app = app
+        self.header = header
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        name = None
+        for header, value in scope['headers']:
+            if header == self.header:
+                name = value.decode('latin-1')
+                break
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+        if name != reserve.default_facility.name and not reserve.FACILITY_NAME.fullmatch(name):
+            await reject(send, 400, f"Invalid facility id: {name}")
+            return
+        facility = reserve.find_facility(name)
+        if facility is None:
+            await reject(send, 404, f"Unknown facility: {name}")
+            return
+
+        token = reserve.current_facility.set(facility)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            reserve.current_facility.reset(token)
+
+
+async def reject(send, status, detail):
+    """
+    Send an error response, as the reservation system would
+    """
+    body = orjson.dumps({"detail": f"Request failed: {detail}"})
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+class PerFacility:
+    """
+    An instance of a service (the feed of changes, the utilization analytics)
+    for every facility, made the first time a request to the facility needs it
+
+    Attributes:
+        default (object): The instance of the default facility
+        factory (callable): Makes the instance of another facility, given the
+            reserve.Facility
+        instances (dict): The instances made so far, by facility name
+        lock (threading.Lock): Protects instances
+    """
+    def __init__(self, default, factory):
+        self.default = default
+        self.factory = factory
+        self.instances = {}
+        self.lock = threading.Lock()
+
+    def get(self):
+        """
+        Returns the instance of the facility of the request being handled
+        """
+        facility = reserve.facility()
+        if facility is reserve.default_facility:
+            return self.default
+        with self.lock:
+            if facility.name not in self.instances:
+                self.instances[facility.name] = self.factory(facility)
+            return self.instances[facility.name]
@@ -0,0 +1,109 @@
+# G-01: API-ify the Reservation System
+#
+# Group Name: 404 Team Not Found
+#
+# File Name: idempotency.py
+#
+# Date: October 19, 2026
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class IdempotencyKeyReused(Exception):
+    """
+    Raised when an idempotency key is sent again with a different request
+    """
+
+
+class IdempotencyStore:
+    """
+    A bounded store of the results of recent requests, by idempotency key, so
+    that a request retried with the same key gets the result of the first one
+    instead of being handled again
+
+    Only successful results are kept: a request that failed can be retried
+    with the same key. A retry arriving while the first request is still being
+    handled waits for it
+
+    Attributes:
+        ttl (float): How long a result is kept, in seconds
+        max_keys (int): The maximum number of results kept, the oldest ones
+            are evicted first
+        results (OrderedDict): Maps a key to (expiry time, fingerprint, result),
+            oldest first
+        in_flight (dict): Maps the key of a request being handled to
+            (fingerprint, threading.Event set once it is handled)
+        lock (threading.Lock): Protects results and in_flight
+    """
+    def __init__(self, ttl=3600, max_keys=10000, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self.clock = clock
+        self.results = OrderedDict()
+        self.in_flight = {}
+        self.lock = threading.Lock()
+
+    def run(self, key, fingerprint, function):
+        """
+        Call function, unless a request with the same key was already handled
+
+        Args:
+            key (hashable): The idempotency key sent by the client (web.py adds its facility)
+            fingerprint (object): Identifies the request, e.g. its path and body
+            function (callable): Handles the request and returns its result
+
+        Raises:
+            IdempotencyKeyReused: if the key was used for a different request
+
+        Returns:
+            (result, replayed) where replayed is True if the result is the one
+            of an earlier request
+        """
+        while True:
+            with self.lock:
+                self.evict()
+                if key in self.results:
+                    _, stored_fingerprint, result = self.results[key]
+                    if stored_fingerprint != fingerprint:
+                        raise IdempotencyKeyReused(key)
+                    return result, True
+                if key not in self.in_flight:
+                    done = threading.Event()
+                    self.in_flight[key] = (fingerprint, done)
+                    break
+                stored_fingerprint, pending = self.in_flight[key]
+                if stored_fingerprint != fingerprint:
+                    raise IdempotencyKeyReused(key)
+            # Wait for the first request, then look again (it may have failed)
+            pending.wait()
+
+        try:
+            result = function()
+            with self.lock:
+                self.results[key] = (self.clock() + self.ttl, fingerprint, result)
+                self.evict()
+            return result, False
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+            done.set()
+
+    def evict(self):
+        """
+        Drop the expired results and the oldest ones over max_keys, the lock must be held
+        """
+        now = self.clock()
+        while self.results:
+            key, (expires, _, _) = next(iter(self.results.items()))
+            if expires > now and len(self.results) <= self.max_keys:
+                break
+            del self.results[key]
+
+
+# Store used by the server, configured by the IDEMPOTENCY_TTL (seconds) and
+# IDEMPOTENCY_MAX_KEYS environment variables
+store = IdempotencyStore(ttl=float(os.environ.get('IDEMPOTENCY_TTL', 3600)),
+                         max_keys=int(os.environ.get('IDEMPOTENCY_MAX_KEYS', 10000)))
@@ -0,0 +1,305 @@
+# G-01: API-ify the Reservation System
+#
+# Group Name: 404 Team Not Found
+#
+# File Name: loadtest.py
+#
+# Date: October 19, 2026
+
+import argparse
+import random
+import re
+import shutil
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import reserve
+
+# Kinds of requests the load generator can send, with their default share of the traffic
+DEFAULT_MIX = {
+    "single": 45,
+    "recurring": 10,
+    "conflicting": 15,
+    "cancel": 10,
+    "report": 20
+}
+
+# Resources booked by the generated reservations, workshops make up most of the volume
+RESOURCE_WEIGHTS = {
+    "workshop": 70,
+    "microvac": 8,
+    "irradiator": 6,
+    "extruder": 8,
+    "hvc": 4,
+    "harvester": 4
+}
+
+
+class TrafficGenerator:
+    """
+    A class generating a random mix of API requests
+
+    Attributes:
+        rng (random.Random): The random generator of the traffic
+        mix (dict): Maps each kind of request to its weight in the traffic
+        customers (int): The number of distinct customers making reservations
+        created (list): The ids of the reservations created so far, which are
+            the candidates for cancellations
+        lock (threading.Lock): Protects the list of created reservations
+    """
+    def __init__(self, mix, customers, seed=None):
+        self.rng = random.Random(seed)
+        self.mix = mix
+        self.customers = customers
+        self.created = []
+        self.lock = threading.Lock()
+        # A few slots that conflicting requests all compete for
+        self.hot_slots = [(self.random_day(), self.random_start()) for _ in range(3)]
+
+    def random_day(self):
+        """
+        Returns a random day (datetime) within the next 30 days, excluding Sundays
+        """
+        while True:
+            day = datetime.today() + timedelta(days=self.rng.randint(1, 29))
+            if day.weekday() != 6:
+                return day
+
+    def random_start(self):
+        """
+        Returns a random start time on the half hour between 10:00 and 15:00
+        """
+        return f'{self.rng.randint(10, 14):02d}:{self.rng.choice([0, 30]):02d}'
+
+    def random_resource(self):
+        """
+        Returns a random resource, picked according to RESOURCE_WEIGHTS
+        """
+        return self.rng.choices(list(RESOURCE_WEIGHTS), weights=RESOURCE_WEIGHTS.values())[0]
+
+    def customer(self):
+        """
+        Returns a random customer id
+        """
+        return f'load{self.rng.randrange(self.customers)}'
+
+    def next_request(self):
+        """
+        Generate the next request of the traffic
+
+        Returns:
+            (kind, method, path, json, params) of the request to send
+        """
+        with self.lock:
+            kind = self.rng.choices(list(self.mix), weights=self.mix.values())[0]
+            if kind == "cancel" and len(self.created) == 0:
+                kind = "single"
+
+            if kind == "single":
+                body = {"customer_id": self.customer(), "resource": self.random_resource(),
+                        "start_date": self.random_day().strftime("%m-%d-%Y"), "start_time": self.random_start()}
+                return kind, "POST", "reservations", body, None
+
+            if kind == "recurring":
+                start = self.random_day()
+                end = start + timedelta(days=self.rng.randint(1, 2))
+                body = {"customer_id": self.customer(), "resource": self.random_resource(),
+                        "start_date": start.strftime("%m-%d-%Y"), "end_date": end.strftime("%m-%d-%Y"),
+                        "start_time": "11:00", "end_time": "12:00"}
+                return kind, "POST", "reservations", body, None
+
+            if kind == "conflicting":
+                day, start = self.rng.choice(self.hot_slots)
+                body = {"customer_id": self.customer(), "resource": self.rng.choice(["hvc", "irradiator", "harvester"]),
+                        "start_date": day.strftime("%m-%d-%Y"), "start_time": start}
+                return kind, "POST", "reservations", body, None
+
+            if kind == "cancel":
+                reservation_id = self.created.pop(self.rng.randrange(len(self.created)))
+                return kind, "DELETE", "reservations", {"reservation_id": str(reservation_id)}, None
+
+            start = self.random_day()
+            params = {"start_date": start.strftime("%m-%d-%Y")}
+            path = self.rng.choice(["reservations", "transactions"])
+            return kind, "GET", path, None, params
+
+    def record_created(self, reservation_id):
+        """
+        Remember a created reservation so that it can be cancelled later
+        """
+        with self.lock:
+            self.created.append(reservation_id)
+
+
+class LoadStats:
+    """
+    A class collecting the results of the load test
+
+    Attributes:
+        latencies (dict): Maps each kind of request to its list of latencies in seconds
+        statuses (Counter): Counts the responses per status code
+        rejections (Counter): Counts the rejected requests per reason
+        lock (threading.Lock): Protects the collected results
+    """
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = Counter()
+        self.rejections = Counter()
+        self.lock = threading.Lock()
+
+    def record(self, kind, status_code, latency, detail):
+        """
+        Record the result of a single request
+        """
+        with self.lock:
+            self.latencies[kind].append(latency)
+            self.statuses[status_code] += 1
+            if status_code >= 400:
+                self.rejections[rejection_reason(detail)] += 1
+
+
+def rejection_reason(detail):
+    """
+    Turn the error message produced by reserve.handle_error into a reason
+    that can be counted, by masking out the numbers, times and dates in it
+
+    Args:
+        detail (str): the detail of an error response
+
+    Returns:
+        The reason of the rejection
+    """
+    return re.sub(r'\d+', '#', str(detail))
+
+
+def percentile(sorted_values, percent):
+    """
+    Returns the given percentile of a sorted list of values (nearest rank)
+    """
+    if len(sorted_values) == 0:
+        return 0
+    index = max(0, int(round(percent / 100 * len(sorted_values))) - 1)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+def make_client(url):
+    """
+    Create the HTTP client used to send requests, either to the application
+    in-process or to a running server
+
+    Args:
+        url (str): base URL of the server (e.g. http://127.0.0.1:8000), or None
+            to run the application in-process
+
+    Returns:
+        A client with the requests/httpx calling convention
+    """
+    if url is None:
+        from fastapi.testclient import TestClient
+        import ratelimit
+        import web
+        # All the traffic comes from a single address and a few customers,
+        # the rate limits would measure themselves rather than the system
+        ratelimit.client_limiter.rate = 0
+        ratelimit.customer_limiter.rate = 0
+        return TestClient(web.app)
+    import httpx
+    return httpx.Client(base_url=url, timeout=30)
+
+
+def run_load(client, generator, stats, requests, workers):
+    """
+    Send the given number of generated requests with a pool of workers
+
+    Returns:
+        The time taken in seconds
+    """
+    def send(_):
+        kind, method, path, body, params = generator.next_request()
+        start = time.perf_counter()
+        response = client.request(method, f'/v1_0/{path}', json=body, params=params)
+        latency = time.perf_counter() - start
+        detail = response.json().get("detail")
+        stats.record(kind, response.status_code, latency, detail)
+        if method == "POST" and response.status_code == 201:
+            generator.record_created(detail["reservation_id"])
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(send, range(requests)))
+    return time.perf_counter() - start
+
+
+def print_report(stats, elapsed):
+    """
+    Print the throughput, latency percentiles and rejection reasons of a load test
+    """
+    total = sum(len(latencies) for latencies in stats.latencies.values())
+    print(f'\n{total} requests in {elapsed:.2f}s, throughput: {total / elapsed:.1f} requests/s')
+
+    print('\nLatency (ms)        count     p50     p90     p95     p99     max')
+    rows = sorted(stats.latencies.items())
+    rows.append(("all", [latency for _, latencies in rows for latency in latencies]))
+    for kind, latencies in rows:
+        values = sorted(latencies)
+        print(f'{kind:<16}{len(values):>9}' + ''.join(
+            f'{percentile(values, p) * 1000:>8.1f}' for p in (50, 90, 95, 99, 100)))
+
+    print('\nStatus codes: ' + ', '.join(f'{code}: {count}' for code, count in sorted(stats.statuses.items())))
+    if stats.rejections:
+        print('\nRejection reasons:')
+        for reason, count in stats.rejections.most_common():
+            print(f'{count:>8}  {reason}')
+
+
+def parse_mix(text):
+    """
+    Parse a traffic mix of the form single=50,cancel=10,... (missing kinds get weight 0)
+    """
+    mix = dict.fromkeys(DEFAULT_MIX, 0)
+    for part in text.split(','):
+        kind, weight = part.split('=')
+        if kind not in mix:
+            raise argparse.ArgumentTypeError(f'Unknown kind of request: {kind}')
+        mix[kind] = float(weight)
+    return mix
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the reservation system API.")
+    parser.add_argument('--requests', type=int, default=500, help="number of requests to send (default: 500)")
+    parser.add_argument('--workers', type=int, default=8, help="number of concurrent clients (default: 8)")
+    parser.add_argument('--customers', type=int, default=500, help="number of distinct customers (default: 500)")
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX,
+                        help="traffic mix, e.g. single=45,recurring=10,conflicting=15,cancel=10,report=20")
+    parser.add_argument('--url', help="base URL of a running server (default: run the application in-process)")
+    parser.add_argument('--seed', type=int, help="seed of the random traffic")
+    parser.add_argument('--keep-data', action='store_true',
+                        help="in-process only, keep the reservations made instead of restoring the data files")
+    args = parser.parse_args(argv)
+
+    # In-process, the load test writes to the real data files of the shards,
+    # they are restored afterwards
+    backups = []
+    if args.url is None and not args.keep_data:
+        reserve.load_shards()
+        for shard in reserve.default_facility.shards:
+            backups.append((shard.data_file + '.loadtest', shard.data_file))
+            shutil.copyfile(shard.data_file, shard.data_file + '.loadtest')
+
+    try:
+        client = make_client(args.url)
+        generator = TrafficGenerator(args.mix, args.customers, args.seed)
+        stats = LoadStats()
+        elapsed = run_load(client, generator, stats, args.requests, args.workers)
+        print_report(stats, elapsed)
+    finally:
+        for backup, data_file in backups:
+            shutil.move(backup, data_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# G-01: API-ify the Reservation System
+#
+# Group Name: 404 Team Not Found
+#
+# File Name: logconfig.py
+#
+# Date: October 19, 2026
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+
+import orjson
+
+# Id of the request being handled, attached to every log record
+request_id = ContextVar('request_id', default='-')
+
+# Number of reservations rejected by each rule since the server started
+rejections = Counter()
+rejections_lock = threading.Lock()
+
+# Attributes every log record has, anything else was passed with extra={...}
+RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'request_id'}
+
+TEXT_FORMAT = '%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s'
+
+listener = None
+
+access_logger = logging.getLogger('access')
+
+
+class RequestIdFilter(logging.Filter):
+    """
+    Attach the id of the current request to log records, this runs in the
+    thread that logs, before the record is handed over to the queue
+    """
+    def filter(self, record):
+        record.request_id = request_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format log records as JSON lines, including any fields given with extra={...}
+    """
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, 'request_id', '-'),
+            "message": record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return orjson.dumps(entry, default=str).decode()
+
+
+def setup_logging(level=None, log_format=None, stream=None):
+    """
+    Configure the logging of the server: records are put on a queue by the
+    request threads and written out by a background thread, so logging never
+    blocks a request on I/O. Calling it again has no effect
+
+    Args:
+        level (str): the log level, defaults to the LOG_LEVEL environment
+            variable, or INFO. Records below the level are dropped before any
+            formatting happens
+        log_format (str): "text" or "json", defaults to the LOG_FORMAT
+            environment variable, or text
+        stream (file): where the records are written, defaults to stderr
+    """
+    global listener
+    if listener is not None:
+        return
+    level = (level or os.environ.get('LOG_LEVEL', 'INFO')).upper()
+    log_format = (log_format or os.environ.get('LOG_FORMAT', 'text')).lower()
+
+    output = logging.StreamHandler(stream)
+    if log_format == 'json':
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    records = queue.SimpleQueue()
+    handler = logging.handlers.QueueHandler(records)
+    handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+    listener.start()
+    # Flush the records still on the queue when the server stops
+    atexit.register(listener.stop)
+
+
+def count_rejection(rule):
+    """
+    Count a reservation rejected by a rule
+    """
+    with rejections_lock:
+        rejections[rule] += 1
+
+
+def rejection_counts():
+    """
+    Returns the number of reservations rejected by each rule, as a dict
+    """
+    with rejections_lock:
+        return dict(rejections)
+
+
+class RequestIdMiddleware:
+    """
+    ASGI middleware giving every request an id, taken from its X-Request-ID
+    header or generated, which is attached to the log records of the request
+    and returned in the X-Request-ID header of the response. Completed
+    requests are logged to the access logger
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        current = None
+        for name, value in scope['headers']:
+            if name == b'x-request-id':
+                current = value.decode('latin-1')[:64]
+                break
+        if not current:
+            current = uuid.uuid4().hex
+        token = request_id.set(current)
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_with_id(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+                message['headers'] = list(message.get('headers', [])) + [(b'x-request-id', current.encode('latin-1'))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            if access_logger.isEnabledFor(logging.INFO):
+                access_logger.info('%s %s %d %.1fms', scope['method'], scope['path'], status[0],
+                                   (time.perf_counter() - start) * 1000,
+                                   extra={'method': scope['method'], 'path': scope['path'], 'status': status[0]})
+            request_id.reset(token)
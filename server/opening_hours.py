@@ -0,0 +1,136 @@
+# G-01: API-ify the Reservation System
+#
+# Group Name: 404 Team Not Found
+#
+# File Name: opening_hours.py
+#
+# Date: October 19, 2026
+
+import logging
+import os
+import threading
+from datetime import datetime
+from functools import lru_cache
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Closures of the workshop (holidays, reduced hours), see Calendar.load
+CLOSURES_FILE = 'data/closures.json'
+
+# Opening hours of every day of the week (monday first), in the integer
+# representation of reserve.split_time, None when the workshop is closed
+WEEKLY_HOURS = [(90, 180)] * 5 + [(100, 160), None]
+
+
+@lru_cache(maxsize=4096)
+def slot_mask(start_slot, end_slot):
+    """
+    Returns the bit mask of the half hour slots from start_slot to end_slot,
+    bit i for the half hour starting at i * 5, empty when end_slot is not
+    after start_slot. Slots are in the integer representation of reserve.split_time
+    """
+    if end_slot <= start_slot:
+        return 0
+    return (1 << (end_slot // 5)) - (1 << (start_slot // 5))
+
+
+def hours_mask(hours):
+    """
+    Returns the bit mask of the slots of opening hours, (open, close) or None
+    """
+    return 0 if hours is None else slot_mask(*hours)
+
+
+class Calendar:
+    """
+    The half hour slots the workshop is open on every day, as bit masks, so
+    that checking the opening hours of a reservation is a mask AND
+
+    Days follow the mask of their day of the week, unless a closure of the
+    closures file overrides it. The file is loaded again when it changes, so
+    closures are added without changing the code
+
+    Attributes:
+        path (str): The closures file
+        weekly (list): The masks of the days of the week, monday first
+        closures (dict): Maps the dates with a closure to their mask
+        stamp (tuple): (mtime_ns, size) of the closures file loaded, None if
+            there was none
+        lock (threading.Lock): Serializes the reloads
+    """
+    def __init__(self, path=CLOSURES_FILE):
+        self.path = path
+        self.weekly = [hours_mask(hours) for hours in WEEKLY_HOURS]
+        self.closures = {}
+        self.stamp = None
+        self.lock = threading.Lock()
+
+    def refresh(self):
+        """
+        Load the closures file again if it changed since it was loaded. A
+        file that cannot be read is logged and the last closures are kept,
+        so that a mistake in it does not stop the reservations
+        """
+        try:
+            stat = os.stat(self.path)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            stamp = None
+        if stamp == self.stamp:
+            return
+        with self.lock:
+            try:
+                closures = self.load() if stamp is not None else {}
+            except (OSError, ValueError, KeyError, TypeError, AttributeError) as error:
+                logger.error("Closures file %s not loaded, keeping the last closures: %r", self.path, error)
+                # Not read again until it changes
+                self.stamp = stamp
+                return
+            # Swapped in at once, the rules read the closures without the lock
+            self.closures, self.stamp = closures, stamp
+
+    def load(self):
+        """
+        Read the closures file, a JSON list of closures such as
+            {"date": "12-25-2026", "reason": "Christmas"}
+            {"date": "12-24-2026", "open": "09:00", "close": "13:00"}
+        where a date without opening hours is closed all day
+
+        Returns:
+            A dict mapping every date of the file to its mask
+        """
+        with open(self.path, 'rb') as file:
+            entries = orjson.loads(file.read())
+        closures = {}
+        for entry in entries:
+            day = datetime.strptime(entry['date'], '%m-%d-%Y').date()
+            hours = None
+            if entry.get('open') and entry.get('close'):
+                hours = (time_slot(entry['open']), time_slot(entry['close']))
+            closures[day] = hours_mask(hours)
+        return closures
+
+    def open_mask(self, day):
+        """
+        Returns the mask of the slots the workshop is open on a day
+        """
+        mask = self.closures.get(day)
+        return self.weekly[day.weekday()] if mask is None else mask
+
+    def is_open(self, start_slot, end_slot, day):
+        """
+        Check that the workshop is open from start_slot to end_slot on a day,
+        i.e. none of the slots of the interval is outside the opening hours
+        """
+        return slot_mask(start_slot, end_slot) & ~self.open_mask(day) == 0
+
+
+def time_slot(text):
+    """
+    Convert a time of the form HH:MM to the integer representation of
+    reserve.split_time, e.g. 13:30 is 135
+    """
+    hour, minute = text.split(':')
+    return int(hour) * 10 + int(minute) // 30 * 5
+
@@ -0,0 +1,307 @@
+# G-01: API-ify the Reservation System
+#
+# Group Name: 404 Team Not Found
+#
+# File Name: ratelimit.py
+#
+# Date: October 19, 2026
+
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from urllib.parse import parse_qs
+import orjson
+
+
+class RateLimiter:
+    """
+    Token buckets by key (client address, customer), refilled at a steady
+    rate up to a burst. A request takes a token from the bucket of its key,
+    or is rejected when the bucket is empty
+
+    Only the buckets of the keys seen most recently are kept, a key whose
+    bucket was dropped starts again with a full one
+
+    Attributes:
+        rate (float): Tokens added to a bucket per second, 0 for no limit
+        burst (int): The size of a bucket
+        max_keys (int): The maximum number of buckets kept
+        buckets (OrderedDict): Maps a key to (tokens, time they were counted),
+            least recently used first
+        lock (threading.Lock): Protects buckets
+    """
+    def __init__(self, rate, burst, max_keys=10000, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.clock = clock
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def acquire(self, key):
+        """
+        Take a token from the bucket of a key
+
+        Returns:
+            0 if a token was taken, otherwise the number of seconds until
+            the bucket has one again
+        """
+        if self.rate <= 0:
+            return 0
+        with self.lock:
+            now = self.clock()
+            bucket = self.buckets.pop(key, None)
+            tokens = self.burst if bucket is None else min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            wait = 0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+            self.buckets[key] = (tokens, now)
+            if len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+            return wait
+
+
+class ConcurrencyLimit:
+    """
+    Caps the number of requests handled at once. Requests over the cap wait
+    in a bounded queue, first come first served, and are rejected at once
+    when the queue is full or after waiting too long
+
+    Waiting requests may come from different event loops, a freed slot is
+    handed over to the first of them in its own loop
+
+    Attributes:
+        limit (int): The maximum number of requests handled at once, 0 for no limit
+        max_queued (int): The maximum number of requests waiting
+        timeout (float): How long a request waits for a slot, in seconds
+        active (int): The number of requests being handled
+        waiters (deque): The futures of the waiting requests,
+            set when they are handed a slot
+        lock (threading.Lock): Protects active and waiters
+    """
+    def __init__(self, limit, max_queued, timeout):
+        self.limit = limit
+        self.max_queued = max_queued
+        self.timeout = timeout
+        self.active = 0
+        self.waiters = deque()
+        self.lock = threading.Lock()
+
+    async def acquire(self):
+        """
+        Wait for a slot, release must be called once the request is handled
+
+        Returns:
+            True if the request got a slot, False if it is rejected
+        """
+        with self.lock:
+            if self.limit <= 0 or (self.active < self.limit and not self.waiters):
+                self.active += 1
+                return True
+            if len(self.waiters) >= self.max_queued:
+                return False
+            future = asyncio.get_running_loop().create_future()
+            self.waiters.append(future)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            return not self.withdraw(future)
+        except asyncio.CancelledError:
+            # The client went away, the slot it may have been handed is given back
+            if not self.withdraw(future):
+                self.release()
+            raise
+        return True
+
+    def withdraw(self, future):
+        """
+        Take a request out of the queue
+
+        Returns:
+            False if the request was handed a slot in the meantime
+        """
+        with self.lock:
+            if future in self.waiters:
+                self.waiters.remove(future)
+                return True
+            return False
+
+    def release(self):
+        """
+        Free the slot of a handled request, handing it over to the first waiting one
+        """
+        with self.lock:
+            if self.waiters:
+                future = self.waiters.popleft()
+                future.get_loop().call_soon_threadsafe(future.set_result, None)
+                return
+            self.active -= 1
+
+    def state(self):
+        """
+        Returns the number of requests being handled and waiting
+        """
+        with self.lock:
+            return {"active": self.active, "waiting": len(self.waiters)}
+
+
+class Counters:
+    """
+    Counters of the admission decisions since the server started
+    """
+    def __init__(self):
+        self.counts = Counter()
+        self.lock = threading.Lock()
+
+    def add(self, name):
+        """
+        Count a decision
+        """
+        with self.lock:
+            self.counts[name] += 1
+
+    def snapshot(self):
+        """
+        Returns the counts by decision
+        """
+        with self.lock:
+            return dict(self.counts)
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware admitting requests before they reach the reservation
+    system, so that a misbehaving client cannot saturate it
+
+    A request is rejected with 429 (and a Retry-After header) when the token
+    bucket of its client address, or of the customer it names, is empty. The
+    customer is taken from the customer_id query parameter or JSON body, or
+    from the /customers/{customer_id}/ path. Admitted requests then wait for
+    a slot of the concurrency limit, and are rejected with 503 when there is
+    no room left in its queue or they waited too long
+
+    Paths in exempt (the event stream, whose connections stay open, and the
+    metrics) are rate limited but do not take a slot
+    """
+    def __init__(self, app, clients=None, customers=None, concurrency=None,
+                 exempt=('/v1_0/events', '/v1_0/metrics')):
+        self.app = app
+        self.clients = clients or client_limiter
+        self.customers = customers or customer_limiter
+        self.concurrency = concurrency or concurrency_limit
+        self.exempt = exempt
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get('client')
+        wait = self.clients.acquire(client[0] if client else '-')
+        if wait:
+            counters.add("rejected_client")
+            await reject(send, 429, "Too many requests from this client", wait)
+            return
+
+        if self.customers.rate > 0:
+            receive, customer_id = await find_customer(scope, receive)
+            if customer_id is not None:
+                wait = self.customers.acquire(customer_id)
+                if wait:
+                    counters.add("rejected_customer")
+                    await reject(send, 429, f"Too many requests for customer {customer_id}", wait)
+                    return
+
+        if scope['path'] in self.exempt:
+            counters.add("admitted")
+            await self.app(scope, receive, send)
+            return
+        if not await self.concurrency.acquire():
+            counters.add("rejected_busy")
+            await reject(send, 503, "Server busy", 1)
+            return
+        counters.add("admitted")
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.concurrency.release()
+
+
+async def find_customer(scope, receive):
+    """
+    Find the customer a request is for, reading its body if it may name one
+
+    Returns:
+        (receive, customer_id) where receive replays the body that was read,
+        and customer_id is None if the request names no customer
+    """
+    path = scope['path'].split('/')
+    if len(path) > 3 and path[2] == 'customers':
+        return receive, path[3]
+    query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    if 'customer_id' in query:
+        return receive, query['customer_id'][0]
+    if scope['method'] not in ('POST', 'DELETE'):
+        return receive, None
+
+    messages = []
+    while True:
+        message = await receive()
+        messages.append(message)
+        if message['type'] != 'http.request' or not message.get('more_body', False):
+            break
+
+    async def replay():
+        if messages:
+            return messages.pop(0)
+        return await receive()
+
+    try:
+        body = orjson.loads(b''.join(message.get('body', b'') for message in messages))
+    except orjson.JSONDecodeError:
+        return replay, None
+    customer_id = body.get('customer_id') if isinstance(body, dict) else None
+    return replay, customer_id if isinstance(customer_id, str) else None
+
+
+async def reject(send, status, detail, retry_after):
+    """
+    Send an error response, as the reservation system would, telling the
+    client when to try again
+    """
+    body = orjson.dumps({"detail": f"Request failed: {detail}"})
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode()),
+                    (b'retry-after', str(max(1, math.ceil(retry_after))).encode())]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def metrics():
+    """
+    Returns the admission counters, along with the requests being handled and waiting
+    """
+    return {**counters.snapshot(), **concurrency_limit.state()}
+
+
+# Limits of the server, configured by the environment variables:
+#   RATE_LIMIT_CLIENT, RATE_LIMIT_CLIENT_BURST: requests per second (0 for no
+#       limit) and burst of a client address
+#   RATE_LIMIT_CUSTOMER, RATE_LIMIT_CUSTOMER_BURST: the same for a customer
+#   MAX_CONCURRENT_REQUESTS (0 for no limit), MAX_QUEUED_REQUESTS and
+#       QUEUE_TIMEOUT (seconds): the concurrency limit
+client_limiter = RateLimiter(float(os.environ.get('RATE_LIMIT_CLIENT', 100)),
+                             int(os.environ.get('RATE_LIMIT_CLIENT_BURST', 200)))
+customer_limiter = RateLimiter(float(os.environ.get('RATE_LIMIT_CUSTOMER', 10)),
+                               int(os.environ.get('RATE_LIMIT_CUSTOMER_BURST', 20)))
+concurrency_limit = ConcurrencyLimit(int(os.environ.get('MAX_CONCURRENT_REQUESTS', 64)),
+                                     int(os.environ.get('MAX_QUEUED_REQUESTS', 256)),
+                                     float(os.environ.get('QUEUE_TIMEOUT', 5)))
+counters = Counters()
@@ -6,8 +6,169 @@
 #
 # Date: April 30, 2022
 
-from datetime import datetime, timedelta
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import lru_cache
+from sys import intern
+import bisect
+import contextlib
+import heapq
+import itertools
+import logging
+import os
+import re
+import threading
 from fastapi import HTTPException
+import logconfig
+import opening_hours
+import snapshot
+
+logger = logging.getLogger(__name__)
+
+# Text data file of the system before it was split into shards, the data files
+# of the shards are seeded from it when they do not exist yet
+DATA_FILE = 'data/data.txt'
+DATA_DIRECTORY = 'data'
+
+# Facilities other than the default one keep their data in a directory of
+# their own, data/facilities/<name>, see Facility
+FACILITIES_DIRECTORY = os.path.join(DATA_DIRECTORY, 'facilities')
+FACILITY_NAME = re.compile(r'[a-z0-9][a-z0-9_-]{0,62}')
+
+# The system is split into shards by group of resources, each with its own
+# data file, snapshot and lock. Workshop bookings, most of the volume, never
+# wait for the bookings of the special machines (and the other way around)
+SHARD_RESOURCES = {
+    'workshop': ['workshop'],
+    'machines': ['microvac', 'irradiator', 'extruder', 'hvc', 'harvester']
+}
+
+# A shard writes the snapshot of its state after this many saves of its data
+# file, and when the server shuts down (see write_snapshots), rather than on
+# every save. In between the shard has no snapshot, requests use the state in
+# memory and a restart parses the data file
+SNAPSHOT_EVERY = 100
+
+# Resources owned by the workshop
+RESOURCES = ['workshop', 'microvac', 'irradiator', 'extruder', 'hvc', 'harvester']
+
+# Price in dollars of a half hour block of each resource (the hvc is priced
+# by the hour, 20000 an hour, hence the integer)
+RATES = {'workshop': 99 / 2, 'microvac': 1000 / 2, 'irradiator': 2220 / 2,
+         'extruder': 600 / 2, 'hvc': 10000, 'harvester': 8800 / 2}
+
+# Reservations starting this many days after they are made get the discount (in %)
+EARLY_BOOKING_DAYS = 14
+EARLY_BOOKING_DISCOUNT = 25
+
+# Days of the week a recurring reservation can be restricted to, as bit masks
+# of date.weekday() (bit 0 is monday)
+WEEKDAY_NAMES = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+DAY_PATTERNS = {'daily': 0b1111111, 'weekdays': 0b0011111, 'weekends': 0b1100000}
+EVERY_DAY = DAY_PATTERNS['daily']
+
+@lru_cache(maxsize=256)
+def parse_days(text):
+    """
+    Parse a days pattern: daily, weekdays, weekends or a comma separated list
+    of days of the week (e.g. mon,wed,fri)
+
+    Args:
+        text (str): The days pattern to parse
+
+    Returns:
+        The bit mask of the days of the week of the pattern, None if it is not
+        a valid (non empty) pattern
+    """
+    text = text.strip().lower()
+    if text in DAY_PATTERNS:
+        return DAY_PATTERNS[text]
+    weekdays = 0
+    for name in text.split(','):
+        name = name.strip()[:3]
+        if name not in WEEKDAY_NAMES:
+            return None
+        weekdays |= 1 << WEEKDAY_NAMES.index(name)
+    return weekdays
+
+def format_days(weekdays):
+    """
+    Format the bit mask of a days pattern as text, e.g. weekdays or mon,wed,fri
+    """
+    for name, pattern in DAY_PATTERNS.items():
+        if pattern == weekdays:
+            return name
+    return ','.join(name for i, name in enumerate(WEEKDAY_NAMES) if weekdays >> i & 1)
+
+class Series:
+    """
+    The days of a (recurring) reservation: every day between two dates that
+    falls on one of the days of the week of a pattern. A series is never
+    expanded to a list of days, membership is tested in constant time and the
+    number of days in each week (see week_key) is counted once, when the
+    series is created
+
+    Attributes:
+        start_day (date): The first day of the date range
+        end_day (date): The last day of the date range
+        weekdays (int): Bit mask of the days of the week of the series, bit 0
+            being monday
+        week_counts (dict): Maps the week_key of every week with days of the
+            series to the number of its days, in the order of the weeks
+    """
+    def __init__(self, start_day, end_day, weekdays=EVERY_DAY):
+        self.start_day = start_day
+        self.end_day = end_day
+        self.weekdays = weekdays
+        week_counts = {}
+        monday = week_start(start_day)
+        while monday <= end_day:
+            first = max((start_day - monday).days, 0)
+            last = min((end_day - monday).days, 6)
+            count = sum(weekdays >> i & 1 for i in range(first, last + 1))
+            if count > 0 and monday.year == (monday + timedelta(days=last)).year:
+                key = week_key(monday)
+                week_counts[key] = week_counts.get(key, 0) + count
+            elif count > 0:
+                # The week spans two years, its days are counted per year
+                for offset in range(first, last + 1):
+                    if weekdays >> offset & 1:
+                        key = week_key(monday + timedelta(days=offset))
+                        week_counts[key] = week_counts.get(key, 0) + 1
+            monday += timedelta(days=7)
+        self.week_counts = week_counts
+
+    def __contains__(self, day):
+        return self.start_day <= day <= self.end_day and self.weekdays >> day.weekday() & 1 == 1
+
+    def __len__(self):
+        return sum(self.week_counts.values())
+
+    def __iter__(self):
+        return self.days()
+
+    def days(self, first_day=None):
+        """
+        Yield the days of the series, from first_day on if given
+        """
+        day = self.start_day if first_day is None else max(first_day, self.start_day)
+        while day <= self.end_day:
+            if self.weekdays >> day.weekday() & 1:
+                yield day
+            day += timedelta(days=1)
+
+    def weeks(self):
+        """
+        Returns (week_key, number of days) for every week with days of the series
+        """
+        return self.week_counts.items()
+
+    def pattern(self):
+        """
+        Returns the days pattern of the series as text, see format_days
+        """
+        return format_days(self.weekdays)
 
 class Reservation:
     """
@@ -22,25 +183,45 @@ class Reservation:
         start_date (str): The starting date of the reservation 
         end_date (str): The ending date of the reservation
         date_of_reservation (str): The date on which the reservation is made
+        start_day (date): The parsed starting date of the reservation
+        end_day (date): The parsed ending date of the reservation
+        start_slot (int): The start time in the integer representation of split_time
+        end_slot (int): The end time in the integer representation of split_time
+        series (Series): The days of the reservation, every day from start_day
+            to end_day unless it is restricted to a days pattern (an optional
+            11th field of the record, see parse_days)
         total (float): A float representing the total cost of this reservation
         down_payment (float): A float representing the amount required for a down payment
         reservation_string (str): A string representation of the reservation object
     """
-    def __init__(self, _reserve):
+    def __init__(self, _reserve, days=None):
+        # Customers, resources, dates and times repeat across many records,
+        # interning them shares a single string object between the records
         self.reservation_id = int(_reserve[0])
-        self.customer_id = _reserve[1]
-        self.reservation_type = _reserve[2]
-        self.start_date = _reserve[3]
-        self.end_date = _reserve[4]
-        self.start_time = _reserve[5]
-        self.end_time = _reserve[6]
-        self.date_of_reservation = _reserve[7]
+        self.customer_id = intern(_reserve[1])
+        self.reservation_type = intern(_reserve[2])
+        self.start_date = intern(_reserve[3])
+        self.end_date = intern(_reserve[4])
+        self.start_time = intern(_reserve[5])
+        self.end_time = intern(_reserve[6])
+        self.date_of_reservation = intern(_reserve[7])
+        # Dates and times are parsed once here, rather than by every rule
+        # that looks at this reservation
+        self.start_day = to_date(self.start_date)
+        self.end_day = to_date(self.end_date)
+        self.start_slot, self.end_slot = split_time(self.start_time, self.end_time)
+        if days is None:
+            days = _reserve[10] if len(_reserve) > 10 else 'daily'
+        self.series = Series(self.start_day, self.end_day, parse_days(days))
         self.discount = 0
         self.total_cost = float(_reserve[8]) if len(_reserve) > 8 else self.calculate_total_cost()
         self.down_payment = float(_reserve[9]) if len(_reserve) > 9 else self.calculate_down_payment()
         self.reservation_string = ' '.join(_reserve)
         if len(_reserve) <= 8:
             self.reservation_string += f' {self.total_cost} {self.down_payment}'
+        # Records of reservations on every day keep their original 10 fields
+        if len(_reserve) <= 10 and self.series.weekdays != EVERY_DAY:
+            self.reservation_string += f' {self.series.pattern()}'
 
     def calculate_total_cost(self):
         """
@@ -50,43 +231,26 @@ class Reservation:
             A float amount in dollars
         """
         
-        start_date = datetime.strptime(self.start_date, "%m-%d-%Y")
-        end_date = datetime.strptime(self.end_date, "%m-%d-%Y")
-        date_of_reservation = datetime.strptime(self.date_of_reservation, "%m-%d-%Y")
+        start_date = self.start_day
+        end_date = self.end_day
+        date_of_reservation = to_date(self.date_of_reservation)
         
         # Note that if the reservation start date and end date are different days
         # It is considered to be multiple appointments from start_time to end_time
-        # for each of those days, not from start_day start_time to end_day end_time
-        days = (end_date - start_date).days + 1
-        start_hour, start_minute = map(int, self.start_time.split(':'))
-        end_hour, end_minute = map(int, self.end_time.split(':'))
+        # for each of the days of its series, not from start_day start_time to
+        # end_day end_time
+        days = len(self.series)
+        start_hour, start_minute = parse_time(self.start_time)
+        end_hour, end_minute = parse_time(self.end_time)
 
         # Number of half hour blocks for this reservation
         half_hours = (end_hour - start_hour) * 2
         half_hours += -start_minute // 30 + end_minute // 30
         half_hours *= days
 
-        # Base price
-        total_cost = 0
-        if self.reservation_type == 'workshop':
-            total_cost = half_hours * 99 / 2
-        elif self.reservation_type == 'microvac':
-            total_cost = half_hours * 1000 / 2
-        elif self.reservation_type == 'irradiator':
-            total_cost = half_hours * 2220 / 2
-        elif self.reservation_type == 'extruder':
-            total_cost = half_hours * 600 / 2
-        elif self.reservation_type == 'hvc':
-            total_cost = half_hours * 10000
-        elif self.reservation_type == 'harvester':
-            total_cost = half_hours * 8800 / 2
-        else:
-            print(f"Unsupported resource: {self.reservation_type}.")
-
-        # Discount by 75% if reservation is made 14 days in advance
-        if (start_date - date_of_reservation).days >= 14:
-            total_cost *= 0.75
-            self.discount = 25
+        if self.reservation_type not in RATES:
+            logger.debug("Unsupported resource: %s", self.reservation_type)
+        total_cost, self.discount = price(self.reservation_type, half_hours, (start_date - date_of_reservation).days)
         
         return total_cost
 
@@ -109,21 +273,98 @@ class Reservation:
         Returns:
             A string that includes all information about the Reservation object
         """
-        return [str(self.reservation_id), self.customer_id, self.reservation_type,
+        fields = [str(self.reservation_id), self.customer_id, self.reservation_type,
                     self.start_date, self.end_date, self.start_time, self.end_time,
                     self.date_of_reservation, str(self.total_cost), str(self.down_payment)]
+        if self.series.weekdays != EVERY_DAY:
+            fields.append(self.series.pattern())
+        return fields
+
+    def report_row(self):
+        """
+        Returns the reservation_data entry of the reservation in the 'GET
+        reservations' report as a ReservationRow, which orjson encodes
+        straight from its slots
+        """
+        if self.series.weekdays != EVERY_DAY:
+            return PatternReservationRow(self.reservation_id, self.customer_id, self.reservation_type,
+                                         self.start_date, self.end_date, self.start_time, self.end_time,
+                                         self.total_cost, self.down_payment, self.series.pattern())
+        return ReservationRow(self.reservation_id, self.customer_id, self.reservation_type, self.start_date,
+                              self.end_date, self.start_time, self.end_time, self.total_cost, self.down_payment)
+
+    def report_data(self):
+        """
+        Convert the Reservation object to a reservation_data entry of the
+        'GET reservations' report, as described in the API design document
+
+        Returns:
+            A dict object containing the reported fields of the reservation,
+            the days pattern only for reservations restricted to some days
+        """
+        data = {
+            "reservation_id": self.reservation_id,
+            "customer_id": self.customer_id,
+            "resource": self.reservation_type,
+            "start_date": self.start_date,
+            "end_date": self.end_date,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "total_cost": self.total_cost,
+            "down_payment": self.down_payment
+        }
+        if self.series.weekdays != EVERY_DAY:
+            data["days"] = self.series.pattern()
+        return data
+
+@dataclass(slots=True)
+class ReservationRow:
+    """
+    A reservation_data entry of the 'GET reservations' report, with the fields
+    of Reservation.report_data in the same order
+    """
+    reservation_id: int
+    customer_id: str
+    resource: str
+    start_date: str
+    end_date: str
+    start_time: str
+    end_time: str
+    total_cost: float
+    down_payment: float
+
+@dataclass(slots=True)
+class PatternReservationRow(ReservationRow):
+    """
+    A reservation_data entry of a reservation restricted to a days pattern
+    """
+    days: str
 
 class ReservationManager:
     """
     A class to manage all the reservations within the system
 
+    The reservation rules look at the days being reserved, which are never in
+    the past, so they work on reservations partitioned by day. Days before the
+    current week are rolled out of the partitions, but their reservations stay
+    in the list the reports and the data file are built from, and in the
+    reservations of their customer, all of which the 3 days per week rule counts
+
     Attributes:
         reservations (Reservation): A list that tracks all existing
-            Reservation objects in the system
+            Reservation objects in the system, past ones included
+        by_day (dict): Maps every day from horizon on to the list of
+            reservations taking place on that day
+        by_customer (dict): Maps every customer to the list of their
+            reservations, in the order of the list of reservations
+        horizon (date): The first day kept in by_day, the monday of the current week
     """
 
     def __init__(self):
         self.reservations = []
+        self.by_day = {}
+        self.by_customer = {}
+        self.horizon = week_start(date.today())
 
     def add_reservation(self, reservation: Reservation):
         """
@@ -132,9 +373,99 @@ class ReservationManager:
         # If the reservation is a list, convert it to a Reservation object
         # Otherwise append it straight to the list of reservations
         if type(reservation) == type([]):
-            self.reservations.append(Reservation(reservation))
+            reservation = Reservation(reservation)
+        self.reservations.append(reservation)
+        for day in self.partition_days(reservation):
+            self.by_day.setdefault(day, []).append(reservation)
+        self.by_customer.setdefault(reservation.customer_id, []).append(reservation)
+
+    def remove_reservation(self, index):
+        """
+        Remove the reservation at the given index of the list of reservations
+
+        Returns:
+            The removed Reservation object
+        """
+        reservation = self.reservations.pop(index)
+        for day in self.partition_days(reservation):
+            # The partition is replaced rather than changed in place, the
+            # rules of other shards may be reading it at the same time
+            remaining = [other for other in self.by_day[day] if other is not reservation]
+            if len(remaining) == 0:
+                del self.by_day[day]
+            else:
+                self.by_day[day] = remaining
+        self.unindex_customer(reservation.customer_id, {reservation.reservation_id})
+        return reservation
+
+    def remove_reservations(self, reservation_ids):
+        """
+        Remove the reservations with the given ids, in a single pass over the
+        list of reservations
+
+        Args:
+            reservation_ids (set): The ids of the reservations to remove
+
+        Returns:
+            The removed Reservation objects, in the order of the list
+        """
+        removed = [reservation for reservation in self.reservations if reservation.reservation_id in reservation_ids]
+        if len(removed) == 0:
+            return removed
+        self.reservations = [reservation for reservation in self.reservations if reservation.reservation_id not in reservation_ids]
+        days = set(day for reservation in removed for day in self.partition_days(reservation))
+        for day in days:
+            # Replaced rather than changed in place, as in remove_reservation
+            remaining = [other for other in self.by_day[day] if other.reservation_id not in reservation_ids]
+            if len(remaining) == 0:
+                del self.by_day[day]
+            else:
+                self.by_day[day] = remaining
+        for customer_id in set(reservation.customer_id for reservation in removed):
+            self.unindex_customer(customer_id, reservation_ids)
+        return removed
+
+    def unindex_customer(self, customer_id, reservation_ids):
+        """
+        Remove the reservations with the given ids from the reservations of a customer
+        """
+        # Replaced rather than changed in place, as the partitions of by_day
+        remaining = [other for other in self.by_customer[customer_id] if other.reservation_id not in reservation_ids]
+        if len(remaining) == 0:
+            del self.by_customer[customer_id]
         else:
-            self.reservations.append(reservation)
+            self.by_customer[customer_id] = remaining
+
+    def partition_days(self, reservation):
+        """
+        Returns the days of a reservation that are kept in by_day
+        """
+        return reservation.series.days(self.horizon)
+
+    def active_on(self, day):
+        """
+        Returns the reservations taking place on a day, the day must not be
+        before horizon
+        """
+        return self.by_day.get(day, ())
+
+    def of_customer(self, customer_id):
+        """
+        Returns the reservations of a customer, past ones included
+        """
+        return self.by_customer.get(customer_id, ())
+
+    def expire(self, today):
+        """
+        Roll the days before the week of today out of by_day, e.g. when the
+        partitions are loaded back from a snapshot taken in an earlier week
+        """
+        horizon = week_start(today)
+        if horizon <= self.horizon:
+            return
+        for day in [day for day in self.by_day if day < horizon]:
+            del self.by_day[day]
+        self.horizon = horizon
 
     def new_id(self):
         """
@@ -166,26 +497,18 @@ class ReservationManager:
             customer_id (str): OPTIONAL, the customer ID to generate report on
 
         Returns:
-            A JSON formatted report in accordance with API design document for
-            the 'GET reservations' API endpoint
+            A report in accordance with API design document for the
+            'GET reservations' API endpoint, with Reservation objects as rows
         """
+        # Rows are kept as Reservation objects, they are serialized straight
+        # from the objects when the report is encoded (see Reservation.report_data)
         list_reservation_data = []
-        for reservation in self.reservations:
-            # If customer id matches or not specified
-            if (customer_id == "" or reservation.customer_id == customer_id):
-                # Print all reservations between this date
-                if between(reservation.start_date, start_date, end_date):
-                    list_reservation_data.append({
-                        "reservation_id":reservation.reservation_id,
-                        "customer_id": reservation.customer_id,
-                        "resource": reservation.reservation_type,
-                        "start_date": reservation.start_date,
-                        "end_date": reservation.end_date,
-                        "start_time": reservation.start_time,
-                        "end_time": reservation.end_time,
-                        "total_cost": reservation.total_cost, 
-                        "down_payment": reservation.down_payment
-                    })
+        # Only the reservations of the customer if one is specified
+        reservations = self.reservations if customer_id == "" else self.by_customer.get(customer_id, ())
+        for reservation in reservations:
+            # Print all reservations between this date
+            if between(reservation.start_date, start_date, end_date):
+                list_reservation_data.append(reservation)
         return {"reservations": list_reservation_data}
 
     
@@ -203,10 +526,66 @@ class Transaction:
     """
     def __init__(self, transaction):
         self.transaction_id = int(transaction[0])
-        self.type = transaction[1]
-        self.transaction_date = transaction[2]
+        self.type = intern(transaction[1])
+        self.transaction_date = intern(transaction[2])
         self.detail = Reservation(transaction[3:])
-        self.reservation_string = f'{self.transaction_id} {self.type} {self.transaction_date} {self.detail.reservation_string}'
+
+    @property
+    def reservation_string(self):
+        # Derived from the other attributes when saving, rather than kept in
+        # memory (and in snapshots) for every transaction
+        return f'{self.transaction_id} {self.type} {self.transaction_date} {self.detail.reservation_string}'
+
+    def report_row(self):
+        """
+        Returns the transaction_data entry of the transaction in the 'GET
+        transactions' report as a TransactionRow, which orjson encodes
+        straight from its slots
+        """
+        reservation = self.detail
+        transaction_type, separator, amount = self.type.partition("$")
+        return TransactionRow(self.transaction_id, transaction_type, self.transaction_date,
+                              reservation.reservation_id, reservation.customer_id, reservation.reservation_type,
+                              reservation.total_cost, amount if separator else reservation.down_payment)
+
+    def report_data(self):
+        """
+        Convert the Transaction object to a transaction_data entry of the
+        'GET transactions' report, as described in the API design document
+
+        Returns:
+            A dict object containing the reported fields of the transaction
+        """
+        reservation = self.detail
+        transaction_type = self.type.split("$")
+        transaction_amount = reservation.down_payment
+        if len(transaction_type) == 2:
+            transaction_amount = transaction_type[1]
+        return {
+            "transaction_id": self.transaction_id,
+            "transaction_type": transaction_type[0],
+            "transaction_date": self.transaction_date,
+            "reservation_id": reservation.reservation_id,
+            "customer_id": reservation.customer_id,
+            "resource": reservation.reservation_type,
+            "total_cost": reservation.total_cost,
+            "transaction_amount": transaction_amount
+        }
+
+@dataclass(slots=True)
+class TransactionRow:
+    """
+    A transaction_data entry of the 'GET transactions' report, with the fields
+    of Transaction.report_data in the same order
+    """
+    transaction_id: int
+    transaction_type: str
+    transaction_date: str
+    reservation_id: int
+    customer_id: str
+    resource: str
+    total_cost: float
+    transaction_amount: object
 
 class Transaction_Manager:
     """
@@ -215,15 +594,44 @@ class Transaction_Manager:
     Attributes:
         transactions ([Transaction]): A list that tracks all existing
             Transaction objects in the system
+        daily_totals (dict): Running financial aggregates, maps the date of a
+            transaction to a dict of resource -> [revenue, deposits, refunds]
+        by_customer (dict): Maps every customer to the list of the transactions
+            of their reservations, in the order of their ids
     """
     def __init__(self):
         self.transactions = []
+        self.daily_totals = {}
+        self.by_customer = {}
 
     def add_transaction(self, transaction):
         """
         Add a new transaction to the list kept by the Transaction Manager
+        and update the running financial aggregates with it
+        """
+        transaction = Transaction(transaction)
+        self.transactions.append(transaction)
+        self.update_daily_totals(transaction)
+        self.by_customer.setdefault(transaction.detail.customer_id, []).append(transaction)
+
+    def update_daily_totals(self, transaction):
         """
-        self.transactions.append(Transaction(transaction))
+        Add the amounts of a transaction to the aggregates of its day and resource.
+        A RESERVATION adds its total cost to the revenue and its down payment
+        to the deposits, a CANCELLATION adds its refund to the refunds
+
+        Args:
+            transaction (Transaction): The transaction that was recorded
+        """
+        day = to_date(transaction.transaction_date)
+        resource = transaction.detail.reservation_type
+        totals = self.daily_totals.setdefault(day, {}).setdefault(resource, [0, 0, 0])
+        transaction_type = transaction.type.split("$")
+        if transaction_type[0] == 'RESERVATION':
+            totals[0] += transaction.detail.total_cost
+            totals[1] += transaction.detail.down_payment
+        elif len(transaction_type) == 2:
+            totals[2] += float(transaction_type[1])
     
     def new_id(self):
         """
@@ -242,7 +650,7 @@ class Transaction_Manager:
             file.write(transaction.reservation_string)
             file.write('\n')
 
-    def create_refund(self, cancelled_reservation, cancel_date):
+    def create_refund(self, cancelled_reservation, cancel_date, transaction_id=None):
         """
         Given a cancelled reservation and the date on which the cancellation ismade
         Calculate the amount that should be refunded and make the refund by
@@ -251,10 +659,11 @@ class Transaction_Manager:
         Args:
             cancelled_reservation (Reservation): The reservation to refund
             cancel_date (str): the date on which the cancellation is requested
+            transaction_id (int): OPTIONAL, the id of the cancellation transaction
+                (default: new_id)
         """
-        # print refund
-        start_date = datetime.strptime(cancelled_reservation.start_date, "%m-%d-%Y")
-        cancel_datetime = datetime.strptime(cancel_date, "%m-%d-%Y")
+        start_date = cancelled_reservation.start_day
+        cancel_datetime = to_date(cancel_date)
         refund = 0
         days_before_reservation = (start_date - cancel_datetime).days
 
@@ -266,10 +675,13 @@ class Transaction_Manager:
         elif days_before_reservation >= 2:
             percent_returned = 50
             refund = 0.5 * cancelled_reservation.down_payment
-        print(f"Cancellation succeeded! Refund: ${refund}")
+        logger.info("Cancellation succeeded, reservation id: %s, refund: $%s",
+                    cancelled_reservation.reservation_id, refund)
 
         # add a cancellation transaction
-        transaction_info = [self.new_id(), f'CANCELLATION${refund}', cancel_date] + cancelled_reservation.tolist()
+        if transaction_id is None:
+            transaction_id = self.new_id()
+        transaction_info = [transaction_id, f'CANCELLATION${refund}', cancel_date] + cancelled_reservation.tolist()
         self.add_transaction(transaction_info)
         return percent_returned, refund
 
@@ -284,45 +696,476 @@ class Transaction_Manager:
             end_date (str): The ending date of transactions to report on
 
         Returns:
-            A JSON formatted report in accordance with API design document for
-            the 'GET transactions' API endpoint
+            A report in accordance with API design document for the
+            'GET transactions' API endpoint, with Transaction objects as rows
         """
         list_transaction_data = []
         for transaction in self.transactions:
             if between(transaction.transaction_date, start_date, end_date):
-                reservation = transaction.detail
-                transaction_type = transaction.type.split("$")
-                transaction_amount = reservation.down_payment
-                if len(transaction_type) == 2:
-                    transaction_amount = transaction_type[1]
-                transaction_type = transaction_type[0]
-
-                list_transaction_data.append({
-                    "transaction_id": transaction.transaction_id,
-                    "transaction_type": transaction_type,
-                    "transaction_date": transaction.transaction_date,
-                    "reservation_id": reservation.reservation_id,
-                    "customer_id": reservation.customer_id,
-                    "resource": reservation.reservation_type,
-                    "total_cost": reservation.total_cost,
-                    "transaction_amount": transaction_amount
-                })
+                list_transaction_data.append(transaction)
         return {"transactions": list_transaction_data}
 
+    def generate_summary_report(self, start_date, end_date, resource):
+        """
+        Generate a JSON report of the revenue, deposits and refunds per day
+        and resource between two dates, see summary_report
+
+        Args:
+            start_date (str): The starting date of the summary 
+            end_date (str): The ending date of the summary
+            resource (str): OPTIONAL, the resource to summarize ('' for all)
+
+        Returns:
+            A JSON formatted report in accordance with API design document for
+            the 'GET transactions/summary' API endpoint
+        """
+        return summary_report(self.daily_totals, start_date, end_date, resource)
+
+    def daily_totals_between(self, start_day, last_day):
+        """
+        Returns a copy of the running aggregates of the days between two dates
+        (date objects), in the format of daily_totals
+        """
+        totals = {}
+        day = start_day
+        while day <= last_day:
+            if day in self.daily_totals:
+                totals[day] = {resource: list(amounts) for resource, amounts in self.daily_totals[day].items()}
+            day += timedelta(days=1)
+        return totals
+
+# Rules that only a lack of free capacity breaks, a request rejected by them
+# alone can wait for a cancellation on the waitlist
+WAITLIST_RULES = {'capacity', 'harvester_limit'}
+
+class WaitlistEntry:
+    """
+    A reservation request waiting for capacity to free up
+
+    Attributes:
+        waitlist_id (int): A unique integer for each waiting request
+        reservation_id (int): The id of the reservation made for the request
+            once it is promoted, None while it is waiting
+        request (list): The customer_id, resource, start_date, end_date,
+            start_time, end_time, date_of_reservation and days pattern of the request
+        customer_id (str): The customer who made the request
+        reservation_type (str): The resource requested
+        start_day (date): The parsed starting date of the request
+        series (Series): The days requested
+        start_slot (int): The start time in the integer representation of split_time
+        end_slot (int): The end time in the integer representation of split_time
+    """
+    def __init__(self, entry):
+        self.waitlist_id = int(entry[0])
+        self.reservation_id = None if entry[1] == '-' else int(entry[1])
+        self.request = [intern(field) for field in entry[2:10]]
+        self.customer_id = self.request[0]
+        self.reservation_type = self.request[1]
+        self.start_day = to_date(self.request[2])
+        self.series = Series(self.start_day, to_date(self.request[3]), parse_days(self.request[7]))
+        self.start_slot, self.end_slot = split_time(self.request[4], self.request[5])
+
+    def keys(self):
+        """
+        Yield the (resource, day, slot) the request is waiting for
+        """
+        for day in self.series:
+            for slot in range(self.start_slot, self.end_slot, 5):
+                yield self.reservation_type, day, slot
+
+    def reservation(self, reservation_id, date_of_reservation):
+        """
+        Returns the Reservation object of the request, made on the given date
+        """
+        return Reservation([str(reservation_id)] + self.request[:6] + [date_of_reservation], self.request[7])
+
+    def tolist(self):
+        """
+        Convert the entry to the list of fields of its record
+        """
+        reservation_id = '-' if self.reservation_id is None else str(self.reservation_id)
+        return [str(self.waitlist_id), reservation_id] + self.request
+
+    def report_data(self):
+        """
+        Returns the status of the entry, as described in the API design document
+        """
+        data = {"waitlist_id": str(self.waitlist_id), "status": "waiting"}
+        if self.reservation_id is not None:
+            data["status"] = "promoted"
+            data["reservation_id"] = str(self.reservation_id)
+        return data
+
+class Waitlist:
+    """
+    The reservation requests of a shard waiting for capacity to free up. They
+    are indexed by the (resource, day, slot) they need, so that a cancellation
+    only looks at the requests waiting for what it frees
+
+    Attributes:
+        entries (dict): Maps a waitlist id to its WaitlistEntry, in order of
+            arrival, promoted entries are kept until their first day has passed
+        index (dict): Maps (resource, day, slot) to the set of the ids of the
+            entries waiting for it
+        next_id (int): The id of the next entry, ids are not reused once
+            their entries are dropped
+    """
+    def __init__(self):
+        self.entries = {}
+        self.index = {}
+        self.next_id = 1
+
+    def add_entry(self, entry):
+        """
+        Add a request to the waitlist, given as a WaitlistEntry or the list of
+        fields of its record
+
+        Returns:
+            The added WaitlistEntry
+        """
+        if type(entry) == type([]):
+            entry = WaitlistEntry(entry)
+        self.entries[entry.waitlist_id] = entry
+        self.next_id = max(self.next_id, entry.waitlist_id + 1)
+        if entry.reservation_id is None:
+            for key in entry.keys():
+                self.index.setdefault(key, set()).add(entry.waitlist_id)
+        return entry
+
+    def promote(self, entry, reservation_id):
+        """
+        Record the reservation made for a waiting entry, which stops waiting
+        """
+        entry.reservation_id = reservation_id
+        self.unindex(entry)
+
+    def unindex(self, entry):
+        """
+        Remove a waiting entry from the index
+        """
+        for key in entry.keys():
+            waiting = self.index[key]
+            waiting.discard(entry.waitlist_id)
+            if len(waiting) == 0:
+                del self.index[key]
+
+    def waiting_for(self, reservation, first_day):
+        """
+        Returns the ids of the entries that may fit in the slots freed by a
+        cancelled reservation from first_day on. Any special machine frees
+        room for the others while the harvester runs, so they all are looked up
+        """
+        if reservation.reservation_type == 'workshop':
+            resources = ['workshop']
+        else:
+            resources = [resource for resource in RESOURCES if resource != 'workshop']
+        waiting = set()
+        for day in reservation.series.days(first_day):
+            for slot in range(reservation.start_slot, reservation.end_slot, 5):
+                for resource in resources:
+                    waiting.update(self.index.get((resource, day, slot), ()))
+        return waiting
+
+    def expire(self, today):
+        """
+        Drop the entries whose first day has passed, they can no longer be made
+        """
+        for entry in [entry for entry in self.entries.values() if entry.start_day < today]:
+            if entry.reservation_id is None:
+                self.unindex(entry)
+            del self.entries[entry.waitlist_id]
+
+    def save_to_file(self, file):
+        """
+        Write the next id and all current entries to the designated file descriptor
+        """
+        file.write(f'{self.next_id}\n')
+        for entry in self.entries.values():
+            file.write(' '.join(entry.tolist()))
+            file.write('\n')
+
+    def load_from_file(self, file):
+        """
+        Read the next id and the entries written by save_to_file
+        """
+        lines = file.readlines()
+        if len(lines) == 0:
+            return
+        for line in lines[1:]:
+            self.add_entry(line.split())
+        self.next_id = max(self.next_id, int(lines[0]))
+
+# The stamp of a shard loaded from its seed file without writing its data
+# file, see Shard.load
+SEEDED = ('seeded',)
+
+class Shard:
+    """
+    A part of the reservation system holding the reservations and transactions
+    of a group of resources, with its own data file, snapshot and lock
+
+    The state of a shard stays in memory between requests, it is only loaded
+    again when its data file was changed by something else (e.g. tests/reset.py)
+
+    Attributes:
+        name (str): The name of the shard
+        resources (list): The resources whose reservations are kept in the shard
+        data_file (str): The text data file of the shard
+        seed_file (str): The data file the shard is seeded from when it has none
+        snapshot_file (str): The binary snapshot of the parsed data file
+        waitlist_file (str): The text file of the waitlist of the shard
+        lock (threading.Lock): Held while the state of the shard is loaded,
+            changed or reported on
+        reservation_manager (ReservationManager): The reservations of the shard
+        transactions_manager (Transaction_Manager): The transactions of the shard
+        waitlist (Waitlist): The requests waiting for the resources of the shard
+        stamp (tuple): The stamp of the data file the state was loaded from or
+            saved to, see snapshot.text_file_stamp, or SEEDED when the state
+            was read from seed_file without writing the data file
+        unsnapshotted (int): The saves of the data file since the state was
+            last loaded from or written to the snapshot (1 when it was parsed
+            from the data file)
+    """
+    def __init__(self, name, resources, directory=DATA_DIRECTORY, seed_file=DATA_FILE):
+        self.name = name
+        self.resources = resources
+        self.seed_file = seed_file
+        self.data_file = os.path.join(directory, f'{name}.txt')
+        self.snapshot_file = os.path.join(directory, f'{name}.snapshot')
+        self.waitlist_file = os.path.join(directory, f'{name}.waitlist')
+        self.lock = threading.Lock()
+        self.reservation_manager = ReservationManager()
+        self.transactions_manager = Transaction_Manager()
+        self.waitlist = Waitlist()
+        self.stamp = None
+        self.unsnapshotted = 0
+
+    def load(self, read_only=False):
+        """
+        Bring the state of the shard up to date with its data file, which is
+        seeded from seed_file if it does not exist. The lock must be held
+
+        Args:
+            read_only (bool): optional, never write a file: a missing data file
+                is not seeded, the state is read from seed_file instead
+        """
+        stamp = snapshot.text_file_stamp(self.data_file)
+        if stamp is None and read_only:
+            if self.stamp != SEEDED:
+                reservations, transactions = self.seed_records()
+                reservation_manager = ReservationManager()
+                transactions_manager = Transaction_Manager()
+                for line in reservations:
+                    reservation_manager.add_reservation(line.split())
+                for line in transactions:
+                    transactions_manager.add_transaction(line.split())
+                self.reservation_manager, self.transactions_manager = reservation_manager, transactions_manager
+                self.waitlist = Waitlist()
+                self.stamp = SEEDED
+            self.reservation_manager.expire(date.today())
+            return
+        if stamp is None:
+            self.seed()
+            stamp = snapshot.text_file_stamp(self.data_file)
+        if stamp != self.stamp:
+            reservation_manager = ReservationManager()
+            transactions_manager = Transaction_Manager()
+            from_snapshot = load_data_from_file(reservation_manager, transactions_manager, self.data_file, self.snapshot_file)
+            waitlist = Waitlist()
+            if os.path.exists(self.waitlist_file):
+                with open(self.waitlist_file, 'r') as file:
+                    waitlist.load_from_file(file)
+            # Swapped in at once, the rules of other shards read the
+            # reservations without holding the lock
+            self.reservation_manager, self.transactions_manager = reservation_manager, transactions_manager
+            self.waitlist = waitlist
+            self.stamp = stamp
+            self.unsnapshotted = 0 if from_snapshot else 1
+        self.reservation_manager.expire(date.today())
+        self.waitlist.expire(date.today())
+
+    def seed(self):
+        """
+        Create the data file of the shard from the reservations and transactions
+        of its resources in seed_file (an empty one if there is no seed_file)
+        """
+        reservations, transactions = self.seed_records()
+        temp_path = self.data_file + '.tmp'
+        with open(temp_path, 'w') as file:
+            for line in reservations + ['#'] + transactions:
+                file.write(line)
+                file.write('\n')
+        os.replace(temp_path, self.data_file)
+
+    def seed_records(self):
+        """
+        Returns the lines of the reservations and of the transactions of the
+        resources of the shard in seed_file
+        """
+        reservations, transactions = [], []
+        if os.path.exists(self.seed_file):
+            with open(self.seed_file, 'r') as file:
+                records = reservations
+                for line in file:
+                    fields = line.split()
+                    if len(fields) == 0:
+                        continue
+                    if fields[0] == '#':
+                        records = transactions
+                        continue
+                    # The resource of a transaction follows its id, type, date,
+                    # and the id and customer of its reservation
+                    resource = fields[2] if records is reservations else fields[5]
+                    if resource in self.resources:
+                        records.append(line.strip())
+        return reservations, transactions
+
+    def save(self):
+        """
+        Save the state of the shard to its data file, and to its snapshot every
+        SNAPSHOT_EVERY saves. The lock must be held
+        """
+        if self.unsnapshotted == 0:
+            # The snapshot is about to be out of date, it is removed rather
+            # than trusting the stamp of the data file to tell them apart
+            try:
+                os.remove(self.snapshot_file)
+            except FileNotFoundError:
+                pass
+        save_date_to_file(self.reservation_manager, self.transactions_manager, self.data_file)
+        self.stamp = snapshot.text_file_stamp(self.data_file)
+        self.unsnapshotted += 1
+        if self.unsnapshotted >= SNAPSHOT_EVERY:
+            self.write_snapshot()
+
+    def write_snapshot(self):
+        """
+        Write the snapshot of the state of the shard if it is not in the
+        snapshot yet, and is still the content of the data file (which was not
+        changed by something else since). The lock must be held
+        """
+        if self.unsnapshotted == 0 or self.stamp != snapshot.text_file_stamp(self.data_file):
+            return
+        snapshot.write_snapshot(self.snapshot_file, self.data_file, (self.reservation_manager, self.transactions_manager))
+        self.unsnapshotted = 0
+
+    def save_waitlist(self):
+        """
+        Save the waitlist of the shard to its file. The lock must be held
+        """
+        temp_path = self.waitlist_file + '.tmp'
+        with open(temp_path, 'w') as file:
+            self.waitlist.save_to_file(file)
+        os.replace(temp_path, self.waitlist_file)
+
+class ShardView:
+    """
+    The reservations of all the shards seen as a single ReservationManager by
+    the reservation rules, which only look up reservations with active_on and
+    of_customer
+
+    Attributes:
+        reservation_managers (list): The reservation managers of the shards
+    """
+    def __init__(self, reservation_managers):
+        self.reservation_managers = reservation_managers
+
+    def active_on(self, day):
+        """
+        Returns the reservations of every shard taking place on a day
+        """
+        reservations = []
+        for reservation_manager in self.reservation_managers:
+            reservations.extend(reservation_manager.active_on(day))
+        return reservations
+
+    def of_customer(self, customer_id):
+        """
+        Returns the reservations of a customer in every shard
+        """
+        reservations = []
+        for reservation_manager in self.reservation_managers:
+            reservations.extend(reservation_manager.of_customer(customer_id))
+        return reservations
+
+def summary_report(daily_totals, start_date, end_date, resource):
+    """
+    Generate a JSON report of the revenue, deposits and refunds per day
+    and resource between two dates, from running aggregates. The cost
+    of the report depends on the number of days, not on the number of
+    transactions
+
+    Args:
+        daily_totals (dict): The running aggregates, in the format of
+            Transaction_Manager.daily_totals
+        start_date (str): The starting date of the summary 
+        end_date (str): The ending date of the summary
+        resource (str): OPTIONAL, the resource to summarize ('' for all)
+
+    Returns:
+        A JSON formatted report in accordance with API design document for
+        the 'GET transactions/summary' API endpoint
+    """
+    list_summary_data = []
+    total_revenue = total_deposits = total_refunds = 0
+    day = to_date(start_date)
+    last_day = to_date(end_date)
+    while day <= last_day:
+        for day_resource, totals in daily_totals.get(day, {}).items():
+            if resource != "" and day_resource != resource:
+                continue
+            revenue, deposits, refunds = totals
+            list_summary_data.append({
+                "date": day.strftime("%m-%d-%Y"),
+                "resource": day_resource,
+                "revenue": round(revenue, 2),
+                "deposits": round(deposits, 2),
+                "refunds": round(refunds, 2)
+            })
+            total_revenue += revenue
+            total_deposits += deposits
+            total_refunds += refunds
+        day += timedelta(days=1)
+    return {
+        "summary": list_summary_data,
+        "totals": {
+            "revenue": round(total_revenue, 2),
+            "deposits": round(total_deposits, 2),
+            "refunds": round(total_refunds, 2)
+        }
+    }
+
+@lru_cache(maxsize=4096)
+def price(reservation_type, half_hours, days_in_advance):
+    """
+    Price a number of half hour blocks of a resource from RATES, discounted
+    if they are booked EARLY_BOOKING_DAYS in advance
+
+    Args:
+        reservation_type (str): The resource (unknown ones cost nothing)
+        half_hours (int): The number of half hour blocks, over all the days
+        days_in_advance (int): Days from the booking to the first day
+
+    Returns:
+        (total_cost, discount) the cost in dollars and the discount in %
+    """
+    total_cost = half_hours * RATES.get(reservation_type, 0)
+    if days_in_advance >= EARLY_BOOKING_DAYS:
+        return total_cost * (100 - EARLY_BOOKING_DISCOUNT) / 100, EARLY_BOOKING_DISCOUNT
+    return total_cost, 0
+
 def workshop_is_closed(start_time, end_time, date):
     """
     Given the date, start and end time of a reservation, determine if the
-    workshop is going to be open for the duration of the reservation
+    workshop is going to be closed for some of the reservation, see
+    opening_hours.Calendar
 
     Returns: 
-        (bool) True if workshop is open, False otherwise
+        (bool) True if workshop is closed, False otherwise
     """
-    if date.weekday() == 6:
-        return True
-    if date.weekday() == 5 and (start_time < 100 or end_time > 160):
-        return True
-    return start_time < 90 or end_time > 180
+    return not facility().calendar.is_open(start_time, end_time, date)
         
+@lru_cache(maxsize=4096)
 def split_time(start, end):
     """
     Split the start and end time into an integer representation
@@ -336,12 +1179,19 @@ def split_time(start, end):
     Returns:
         Integer representation of the start time and end time
     """
-    start_hour, start_minute = map(int, start.split(':'))
-    end_hour, end_minute = map(int, end.split(':'))
+    start_hour, start_minute = parse_time(start)
+    end_hour, end_minute = parse_time(end)
     start_time = start_hour * 10 + start_minute // 30 * 5
     end_time = end_hour * 10 + end_minute // 30 * 5
     return start_time, end_time
 
+def format_slot(slot):
+    """
+    Format a time in the integer representation of split_time as HH:MM,
+    E.g. 105 is formatted as 10:30
+    """
+    return f'{slot // 10:02d}:{slot % 10 * 6:02d}'
+
 def is_available(reservation_type, count):
     """
     Given the type of reservation and the number of bookings already made for
@@ -366,9 +1216,82 @@ def is_available(reservation_type, count):
         return count <= 1
     elif reservation_type == 'harvester':
         return count <= 1
-    print(f"Unsupported resource: {reservation_type}.")
+    logger.debug("Unsupported resource: %s", reservation_type)
     return False
 
+@lru_cache(maxsize=4096)
+def parse_date(text):
+    """
+    Parse a date string of the format MM-DD-YYYY, without raising an exception
+    for invalid dates. Results are cached since the same few dates are parsed
+    over and over again
+
+    Args:
+        text (str): The date string to parse
+
+    Returns:
+        A datetime.date object for the given date, None if it is not a valid date
+    """
+    parts = text.split('-')
+    if len(parts) != 3 or not all(part.isdecimal() for part in parts):
+        return None
+    month, day, year = parts
+    if len(month) > 2 or len(day) > 2 or len(year) != 4:
+        return None
+    try:
+        return date(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
+def to_date(text):
+    """
+    Convert a date string of the format MM-DD-YYYY to a date object
+
+    Args:
+        text (str): A date of the format MM-DD-YYYY
+
+    Raises:
+        ValueError: if the date is not valid
+
+    Returns:
+        A datetime.date object for the given date
+    """
+    parsed = parse_date(text)
+    if parsed is None:
+        raise ValueError(f"Invalid date: {text}")
+    return parsed
+
+def week_key(day):
+    """
+    Returns the week of a day counted by the 3 days per week rule, the year
+    of the day and its ISO week number (so the days of a week spanning two
+    years are counted apart)
+    """
+    return day.year, day.isocalendar()[1]
+
+def week_start(day):
+    """
+    Returns the monday of the week of the given date object
+    """
+    return day - timedelta(days=day.weekday())
+
+@lru_cache(maxsize=4096)
+def parse_time(text):
+    """
+    Parse a time string of the format HH:MM, without raising an exception
+    for invalid times
+
+    Args:
+        text (str): The time string to parse
+
+    Returns:
+        (hour, minute) integers, None if the string is not of the format HH:MM
+    """
+    parts = text.split(':')
+    if len(parts) != 2 or not parts[0].isdecimal() or not parts[1].isdecimal():
+        return None
+    return int(parts[0]), int(parts[1])
+
 def between(date, start, end):
     """
     Given three date strings, determine if the first date is between the
@@ -383,101 +1306,99 @@ def between(date, start, end):
     Returns:
         True if it is between the start and end date, False otherwise
     """
-    start_date = datetime.strptime(start, "%m-%d-%Y")
-    end_date = datetime.strptime(end, "%m-%d-%Y")
-    ddate = datetime.strptime(date, "%m-%d-%Y")
-    return (ddate - start_date).days >= 0 and (end_date - ddate).days >=0
+    return to_date(start) <= to_date(date) <= to_date(end)
 
-def reservation_is_not_in_date_range(reservation_datetime, start_datetime, end_datetime):
+def reservation_is_not_in_date_range(reservation_datetime, start_datetime, end_datetime, violations=None):
     """
     Given all dates of a reservation to be made, check if it is within the
     allowed date range (0 to 30 days in advance)
 
     Args:
-        Contraint: All inputs are datetime objects
-        reservation_datetime (datetime): The date on which the reservation is made
-        start_datetime (datetime): The first day of the reservation
-        end_datetime (datetime): The last day day of the reservation
+        Contraint: All inputs are date objects
+        reservation_datetime (date): The date on which the reservation is made
+        start_datetime (date): The first day of the reservation
+        end_datetime (date): The last day day of the reservation
+        violations (list): optional, collects the violations instead of
+            raising the first one (see reject)
 
     Returns:
         (bool) False if it is between the allowed date range, True otherwise
     """
     # Check if reservation is in the future
     if (reservation_datetime - start_datetime).days > 0:
-        print('Reservation Failed: cannot reserve time already passed.')
-        handle_error(400, "Reservation", 'Cannot reserve time already passed.')
+        reject(violations, 'date_range', 'Cannot reserve time already passed.')
     
     # Check if reservation is within 30 days
     if (end_datetime - reservation_datetime).days > 30:
         # "Clients expect to be able to make reservations up to 30 days in advance"
-        print('Reservation Failed: cannot reserve time more than 30 days away.')
-        handle_error(400, "Reservation", 'Cannot reserve time more than 30 days away.')
+        reject(violations, 'date_range', 'Cannot reserve time more than 30 days away.')
     
     return False
 
-def reservation_type_is_not_known(reservation_type):
+def reservation_type_is_not_known(reservation_type, violations=None):
     """
     Check if the reservation type is valid
 
     Args:
         reservation_type (str):The workshop/resouce type to reserve
+        violations (list): optional, collects the violations instead of
+            raising the first one (see reject)
 
     Returns:
         (bool) True if it is owned by the workshop, False otherwise
     """
-    if reservation_type not in ['workshop', 'microvac', 'irradiator', 'extruder', 'hvc', 'harvester']:
-        print(f"Unsupported resource: {reservation_type}.")
-        handle_error(400, "Reservation", f"Unsupported resource: {reservation_type}")
+    if reservation_type not in RESOURCES:
+        reject(violations, 'resource', f"Unsupported resource: {reservation_type}")
     return False
 
-def reservation_is_not_on_half_hour(minute):
+def reservation_is_not_on_half_hour(minute, violations=None):
     """
     Check if a reservation is made on the half hour
 
     Args:
         reservation_type (int): The minute mark of a reservation
+        violations (list): optional, collects the violations instead of
+            raising the first one (see reject)
 
     Returns:
         True if it is on the half hour, False otherwise
     """
     if minute != 0 and minute != 30:
-        print('Reservation Failed: reservations for all resources are made in 30 minute blocks and always start on the hour or half hour.')
-        handle_error(400, "Reservation", f"Reservations for all resources are made in 30 minute blocks and always start on the hour or half hour")
+        reject(violations, 'half_hour', "Reservations for all resources are made in 30 minute blocks and always start on the hour or half hour")
     return False
 
-def check_only_one_special_machine(reservation_manager, days_to_reserve, reservation):
+def check_only_one_special_machine(reservation_manager, days_to_reserve, reservation, violations=None):
     """
     Check that there is only one special machine reserved by a single client
     at any given time
 
     Args:
         reservation_manager (ResevationManager): the reservation manager of the system
-        days_to_reserve (int): All the days this reservation is trying to make
+        days_to_reserve (Series): All the days this reservation is trying to make
         reservation (Reservation): Reservation Object for this reservation
+        violations (list): optional, collects the violations instead of
+            raising the first one (see reject)
 
     Returns:
         (bool) True if only no special machine has been reserved, False otherwise
     """
     customer_id = reservation.customer_id
     reservation_type = reservation.reservation_type
-    start_time, end_time = split_time(reservation.start_time, reservation.end_time)
+    start_time, end_time = reservation.start_slot, reservation.end_slot
 
     for day in days_to_reserve:
-        for reservation in reservation_manager.reservations:
+        for reservation in reservation_manager.active_on(day):
             if reservation.customer_id != customer_id:
                 continue
             if reservation_type == 'workshop':
                 continue
-            if not between(f'{day.month}-{day.day}-{day.year}', reservation.start_date, reservation.end_date):
-                continue
-            reservation_start, reservation_end = split_time(reservation.start_time, reservation.end_time)
+            reservation_start, reservation_end = reservation.start_slot, reservation.end_slot
             if not (reservation_end <= start_time or end_time <= reservation_start):
                 # "They can only reserve one special machine at a time"
-                print('Reservation Failed: a client can only reserve one special machine at a time')
-                handle_error(400, "Reservation", "A client can only reserve one special machine at a time")
+                reject(violations, 'one_special_machine', "A client can only reserve one special machine at a time")
     return True
 
-def over_three_reservations(reservation_manager, days_to_reserve, customer_id):
+def over_three_reservations(reservation_manager, days_to_reserve, customer_id, violations=None):
     """
     Check if a customer is going to go over the limit of three reservations for
     a single week, given that they are trying to make reservations given by
@@ -485,47 +1406,30 @@ def over_three_reservations(reservation_manager, days_to_reserve, customer_id):
 
     Args:
         reservation_manager (ResevationManager): the reservation manager of the system
-        days_to_reserve (int): All the days this reservation is trying to make
+        days_to_reserve (Series): All the days this reservation is trying to make
         customer_id (str): The customer that is trying to make the reservation
+        violations (list): optional, collects the violations instead of
+            raising the first one (see reject)
 
     Returns:
         (bool) False if the customer is not going to go over the three days
         restriction, True if they are going to go over the restriction
     """
-    weekr = {}
-    # Count up the number of reservations that this customer has already made
-    for reservation in reservation_manager.reservations:
-        if reservation.customer_id != customer_id:
-            continue
-        reservation_start_datetime = datetime.strptime(reservation.start_date, "%m-%d-%Y")
-        reservation_end_datetime = datetime.strptime(reservation.end_date, "%m-%d-%Y")
-        rdays = []
-        rcur = reservation_start_datetime
-        while (reservation_end_datetime - rcur).days >= 0:
-            rdays.append(rcur)
-            rcur += timedelta(days=1)
-        for day in rdays:
-            key = f'{day.year}-{day.isocalendar()[1]}'
-            if key not in weekr:
-                weekr[key] = 1
-            else:
-                weekr[key] += 1
-    # Add the days that are going to be reserved now
-    for day in days_to_reserve:
-        key = f'{day.year}-{day.isocalendar()[1]}'
-        if key not in weekr:
-            weekr[key] = 1
-        else:
-            weekr[key] += 1
+    # Count up the days that this customer has already reserved in every
+    # week, past ones included, then the days that are going to be reserved
+    # now, from the precomputed week counts of the series (see week_key)
+    weeks = {}
+    for series in itertools.chain((reservation.series for reservation in reservation_manager.of_customer(customer_id)),
+                                  (days_to_reserve,)):
+        for key, count in series.weeks():
+            weeks[key] = weeks.get(key, 0) + count
     # Check if it is going to go over three
-    for k in weekr:
-        if weekr[k] > 3:
-            print(f'Reservation Failed: A client can only make reservations for 3 different days in a given week.')
-            handle_error(400, "Reservation", "A client can only make reservations for 3 different days in a given week")
+    if any(count > 3 for count in weeks.values()):
+        reject(violations, 'three_days_per_week', "A client can only make reservations for 3 different days in a given week")
             
     return False
 
-def check_non_cooldown_requirements(reservation_manager, day, reservation_type, start_time, end_time):
+def check_non_cooldown_requirements(reservation_manager, day, reservation_type, start_time, end_time, violations=None):
     """
     Given the day of reservation, type of reservation and the start and end time, check all
     the non-cooldown related rules that must be applied to the reservation, if the rules
@@ -534,10 +1438,12 @@ def check_non_cooldown_requirements(reservation_manager, day, reservation_type,
 
     Args:
         reservation_manager (ReservationManager): The reservation manager of the system
-        day (datetime): the datetime object of the day that is being checked
+        day (date): the date object of the day that is being checked
         reservation_type (str): the machine/workshop to make reservation for
         start_time (str): the start time of this reservation
         end_time (str): the finish time of this reservation
+        violations (list): optional, collects the violations instead of
+            raising the first one (see reject)
 
     Returns:
         (bool) False if the reservation violates some requirement, True otherwise
@@ -546,12 +1452,10 @@ def check_non_cooldown_requirements(reservation_manager, day, reservation_type,
         count = 0
         s_cnt = 0
         h_run = False
-        for reservation in reservation_manager.reservations:
-            reservation_start, reservation_end = split_time(reservation.start_time, reservation.end_time)
+        for reservation in reservation_manager.active_on(day):
+            reservation_start, reservation_end = reservation.start_slot, reservation.end_slot
             if not (t >= reservation_start and t < reservation_end):
                 continue
-            if not between(f'{day.month}-{day.day}-{day.year}', reservation.start_date, reservation.end_date):
-                continue
             if reservation.reservation_type == 'harvester':
                 h_run = True
             if reservation.reservation_type != 'workshop':
@@ -561,58 +1465,56 @@ def check_non_cooldown_requirements(reservation_manager, day, reservation_type,
                 # increament count by 1
                 count += 1
         if not is_available(reservation_type, count+1):
-            print(f'Reservation Failed: not enough available {reservation_type}, {count} already reserved.')
-            handle_error(400, "Reservation", f'Not enough available {reservation_type}, {count} already reserved')
+            reject(violations, 'capacity', f'Not enough available {reservation_type}, {count} already reserved')
             
         if reservation_type == 'irradiator' and count == 1:
-            print('Reservation Failed: only 1 irradiator can be used at a time.')
-            handle_error(400, "Reservation", 'Only 1 irradiator can be used at a time')
+            reject(violations, 'capacity', 'Only 1 irradiator can be used at a time')
             
         if reservation_type != 'workshop':
             s_cnt += 1
         if h_run and s_cnt > 4:
-            print('Reservation Failed: only 3 other machines can run while the 1.21 gigawatt lightning harvester is operating.')
-            handle_error(400, "Reservation", 'Only 3 other machines can run while the 1.21 gigawatt lightning harvester is operating')
+            reject(violations, 'harvester_limit', 'Only 3 other machines can run while the 1.21 gigawatt lightning harvester is operating')
             
     return True
 
-def check_hvc_requirements(reservation_manager, day, start_time, end_time):
+def check_hvc_requirements(reservation_manager, day, start_time, end_time, violations=None):
     """
     Given a start time and an end time, check that on a given day, the hvc machine
     is used in accordance with the cooldown rules
 
     Args:
         reservation_manager (ReservationManager): The reservation manager of the system
-        day (datetime): the datetime object of the day that is being checked
+        day (date): the date object of the day that is being checked
         start_time (str): the start time of this reservation
         end_time (str): the finish time of this reservation
+        violations (list): optional, collects the violations instead of
+            raising the first one (see reject)
 
     Returns:
         (bool) True if the hvc is being operated within requirements, False otherwise
     """
     hvc_start = start_time - 60
     hvc_end = end_time + 60
-    for reservation in reservation_manager.reservations:
+    for reservation in reservation_manager.active_on(day):
         if reservation.reservation_type == 'hvc':
-            if not between(f'{day.month}-{day.day}-{day.year}', reservation.start_date, reservation.end_date):
-                continue
-            reservation_start, reservation_end = split_time(reservation.start_time, reservation.end_time)
+            reservation_start, reservation_end = reservation.start_slot, reservation.end_slot
             if not (hvc_end <= reservation_start or reservation_end <= hvc_start):
-                print(f'Reservation Failed: high velocity crusher needs to cool down for 6 hours between uses, hvc currently reserved for {reservation.start_time}-{reservation.end_time}.')
-                handle_error(400, "Reservation", f'High velocity crusher needs to cool down for 6 hours between uses, hvc currently reserved for {reservation.start_time}-{reservation.end_time}.')
+                reject(violations, 'hvc_cooldown', f'High velocity crusher needs to cool down for 6 hours between uses, hvc currently reserved for {reservation.start_time}-{reservation.end_time}.')
                 
     return True
 
-def check_irradiator_requirements(reservation_manager, day, start_time, end_time):
+def check_irradiator_requirements(reservation_manager, day, start_time, end_time, violations=None):
     """
     Given a start time and an end time, check that on a given day, the irradiator
     is used in accordance with the cooldown rules
 
     Args:
         reservation_manager (ReservationManager): The reservation manager of the system
-        day (datetime): the datetime object of the day that is being checked
+        day (date): the date object of the day that is being checked
         start_time (str): the start time of this reservation
         end_time (str): the finish time of this reservation
+        violations (list): optional, collects the violations instead of
+            raising the first one (see reject)
 
     Returns:
         (bool) True if the irradiator is being operated within requirements, False otherwise
@@ -620,20 +1522,38 @@ def check_irradiator_requirements(reservation_manager, day, start_time, end_time
     irradiator_start = start_time - 10
     irradiator_end = end_time + 10
     count = 0
-    for reservation in reservation_manager.reservations:
+    for reservation in reservation_manager.active_on(day):
         if reservation.reservation_type == 'irradiator':
-            if not between(f'{day.month}-{day.day}-{day.year}', reservation.start_date, reservation.end_date):
-                continue
-            reservation_start, reservation_end = split_time(reservation.start_time, reservation.end_time)
+            reservation_start, reservation_end = reservation.start_slot, reservation.end_slot
             if not (irradiator_end <= reservation_start or reservation_end <= irradiator_start):
                 count += 1
     if count == 2:
-        print(f'Reservation Failed: irradiators need to cool down for 1 hour between uses.')
-        handle_error(400, "Reservation","Irradiators need to cool down for 1 hour between uses")
+        reject(violations, 'irradiator_cooldown', "Irradiators need to cool down for 1 hour between uses")
         
     return True
 
-def handle_reservation(reservation_manager, reservation):
+def reject(violations, rule, detail):
+    """
+    Reject a reservation that breaks a rule. By default the error is raised
+    right away, when the violations of a reservation are being collected
+    (see validate_reservation) it is recorded and the checks go on
+
+    Args:
+        violations (list): None to raise the error, otherwise the list of
+            violations found so far, as {"rule", "detail"} dicts
+        rule (str): The name of the broken rule
+        detail (str): The error message
+    """
+    if violations is None:
+        logconfig.count_rejection(rule)
+        logger.info("Reservation rejected by rule %s: %s", rule, detail, extra={"rule": rule})
+        handle_error(400, "Reservation", detail)
+    violation = {"rule": rule, "detail": f"Reservation failed: {detail}"}
+    # The same rule is often broken in the same way on several days or slots
+    if violation not in violations:
+        violations.append(violation)
+
+def handle_reservation(reservation_manager, reservation, violations=None):
     """
     Given a reservation, check all conditions to see if it is a valid reservation
     that does not break any of the reservation rules
@@ -641,6 +1561,8 @@ def handle_reservation(reservation_manager, reservation):
     Args:
         reservation_manager (ReservationManager): The reservation manager of the system
         reservation (Reservation): The reservation to be made
+        violations (list): optional, collects the violations of every rule
+            instead of raising the first one (see reject)
 
     Returns:
         (bool) True if it is the reservation can be made in accordance to all
@@ -649,82 +1571,179 @@ def handle_reservation(reservation_manager, reservation):
     # Unpack all required data from the Reservation object
     customer_id = reservation.customer_id
     reservation_type = reservation.reservation_type
-    start_datetime = datetime.strptime(reservation.start_date, "%m-%d-%Y")
-    end_datetime = datetime.strptime(reservation.end_date, "%m-%d-%Y")
+    start_datetime = reservation.start_day
+    end_datetime = reservation.end_day
     start_time = reservation.start_time
     end_time = reservation.end_time
-    reservation_datetime = datetime.strptime(reservation.date_of_reservation, "%m-%d-%Y")
+    reservation_datetime = to_date(reservation.date_of_reservation)
 
-    # Check if the type of machine is known
-    if reservation_type_is_not_known(reservation_type):
+    # Check if the type of machine is known, none of the other rules apply to
+    # an unknown one
+    reservation_type_is_not_known(reservation_type, violations)
+    if violations:
         return False
 
-    if reservation_is_not_in_date_range(reservation_datetime, start_datetime, end_datetime):
-        return False
+    reservation_is_not_in_date_range(reservation_datetime, start_datetime, end_datetime, violations)
     
     # Convert hour and minue to form 105 for 10:30, 160 for 16:00
     original_start_time = start_time
     original_end_time = end_time
-    start_hour, start_minute = map(int, start_time.split(':'))
-    end_hour, end_minute = map(int, end_time.split(':'))
-    start_time = start_hour * 10 + start_minute // 30 * 5
-    end_time = end_hour * 10 + end_minute // 30 * 5
-
-    if reservation_is_not_on_half_hour(start_minute) or reservation_is_not_on_half_hour(end_minute):
-        return False
-
-    # A list of days to make reservations for, based on start date and end date
-    days_to_reserve = []
-    cur = start_datetime
-    while (end_datetime - cur).days >= 0:
-        days_to_reserve.append(cur)
-        cur += timedelta(days=1)
+    start_minute = parse_time(start_time)[1]
+    end_minute = parse_time(end_time)[1]
+    start_time = reservation.start_slot
+    end_time = reservation.end_slot
+
+    reservation_is_not_on_half_hour(start_minute, violations)
+    reservation_is_not_on_half_hour(end_minute, violations)
+
+    # The days to make reservations for, based on start date, end date and
+    # days pattern, they are iterated over without being listed
+    days_to_reserve = reservation.series
+    if len(days_to_reserve) == 0:
+        reject(violations, 'days', f'No day from {reservation.start_date} to {reservation.end_date} matches the days pattern {days_to_reserve.pattern()}')
     
     # Check if the workshop is open for each of the reservation days
     for day in days_to_reserve:
         if workshop_is_closed(start_time, end_time, day):
-            print(f'Reservation Failed: cannot reserve time interval from {original_start_time} to {original_end_time} on {str(day).split()[0]}')
-            handle_error(400, "Reservation", f'Cannot reserve time interval from {original_start_time} to {original_end_time} on {str(day).split()[0]}')
+            reject(violations, 'opening_hours', f'Cannot reserve time interval from {original_start_time} to {original_end_time} on {str(day).split()[0]}')
     
     # Make sure that one client only makes one special machine reservation at any time
-    if not check_only_one_special_machine(reservation_manager, days_to_reserve, reservation):
-        return False
+    check_only_one_special_machine(reservation_manager, days_to_reserve, reservation, violations)
     
     # For each day in the attempted reservation, check that it does not violate some
     # requirement for booking to be successful
     for day in days_to_reserve:
         # Check that all non-cooldown rules for a reservation
-        if not check_non_cooldown_requirements(reservation_manager, day, reservation_type, start_time, end_time):
-            return False
+        check_non_cooldown_requirements(reservation_manager, day, reservation_type, start_time, end_time, violations)
         
         # check that the high velocity crusher has 6 hours cooldown between uses
         if reservation_type == 'hvc':
-            if not check_hvc_requirements(reservation_manager, day, start_time, end_time):
-                return False
+            check_hvc_requirements(reservation_manager, day, start_time, end_time, violations)
     
         # check that irradiators have a 60 minutes cooldown period after use
         if reservation_type == 'irradiator':
-            if not check_irradiator_requirements(reservation_manager, day, start_time, end_time):
-                return False
+            check_irradiator_requirements(reservation_manager, day, start_time, end_time, violations)
     
     # Check if A customer is going to go over 3 reservations in a given week
-    if over_three_reservations(reservation_manager, days_to_reserve, customer_id):
-        return False
+    over_three_reservations(reservation_manager, days_to_reserve, customer_id, violations)
     
-    return True
+    return not violations
+
+def validate_reservation(reservation_manager, reservation, alternatives=3):
+    """
+    Check a reservation against every rule at once, without making it, so
+    that a client learns about all the rules it breaks in a single request
+
+    Args:
+        reservation_manager (ReservationManager): The reservation manager of the system
+        reservation (Reservation): The reservation to check
+        alternatives (int): The maximum number of alternatives to suggest
+
+    Returns:
+        A dict with whether the reservation can be made, the list of
+        violations and, if it cannot, the nearest reservations that can
+    """
+    violations = []
+    handle_reservation(reservation_manager, reservation, violations)
+    return {
+        "valid": len(violations) == 0,
+        "violations": violations,
+        "alternatives": find_alternatives(reservation_manager, reservation, alternatives) if violations else []
+    }
+
+def find_alternatives(reservation_manager, reservation, limit, max_day_shift=7):
+    """
+    Find the reservations closest in time to a rejected one that can be made:
+    same customer, resource, length and number of days, moved by as few half
+    hours as possible (up to max_day_shift days earlier or later), on the same
+    days pattern
 
-def load_data_from_file(reservation_manager, transactions_manager):
+    Args:
+        reservation_manager (ReservationManager): The reservation manager of the system
+        reservation (Reservation): The rejected reservation
+        limit (int): The maximum number of alternatives to return
+        max_day_shift (int): How many days the reservation can be moved by
+
+    Returns:
+        A list of dicts with the start_date, end_date, start_time and end_time
+        of every alternative, nearest first
+    """
+    if reservation.reservation_type not in RESOURCES:
+        return []
+    # Round the length and start to whole half hours
+    length = -(-(reservation.end_slot - reservation.start_slot) // 5) * 5
+    start = reservation.start_slot - reservation.start_slot % 5
+    span = reservation.end_day - reservation.start_day
+    weekdays = reservation.series.weekdays
+    if length <= 0 or span.days < 0:
+        return []
+
+    # Candidates are ordered by how far they move the reservation, 240 units
+    # being a whole day, only slots within the longest opening hours are tried
+    candidates = []
+    for day_shift in range(-max_day_shift, max_day_shift + 1):
+        for slot in range(90, 180 - length + 1, 5):
+            distance = abs(day_shift * 240 + slot - start)
+            if distance > 0:
+                candidates.append((distance, day_shift, slot))
+    candidates.sort()
+
+    alternatives = []
+    for _, day_shift, slot in candidates:
+        start_day = reservation.start_day + timedelta(days=day_shift)
+        end_day = start_day + span
+        series = Series(start_day, end_day, weekdays)
+        if len(series) == 0 or any(workshop_is_closed(slot, slot + length, day) for day in series):
+            continue
+        candidate = Reservation([str(reservation.reservation_id), reservation.customer_id,
+                                 reservation.reservation_type, start_day.strftime('%m-%d-%Y'),
+                                 end_day.strftime('%m-%d-%Y'), format_slot(slot),
+                                 format_slot(slot + length), reservation.date_of_reservation],
+                                days=series.pattern())
+        # Candidates are checked in collect mode, so that they are not counted
+        # and logged as rejected reservations
+        if not handle_reservation(reservation_manager, candidate, []):
+            continue
+        alternative = {
+            "start_date": candidate.start_date,
+            "end_date": candidate.end_date,
+            "start_time": candidate.start_time,
+            "end_time": candidate.end_time
+        }
+        if weekdays != EVERY_DAY:
+            alternative["days"] = series.pattern()
+        alternatives.append(alternative)
+        if len(alternatives) == limit:
+            break
+    return alternatives
+
+def load_data_from_file(reservation_manager, transactions_manager, data_file, snapshot_file):
     """
-    Given empty reservation manager and transaction manager, load from data.txt
-    file all of the reservations and transactions saved in the system
+    Given empty reservation manager and transaction manager, load from a data
+    file all of the reservations and transactions saved in it
+
+    The parsed state is loaded from the snapshot file instead when the snapshot
+    was taken from the current content of the data file
 
     Args:
         reservation_manager (ReservationManager): the reservation manager of
             the system to load reservations into
         transactions_manager (TransactionManager): the transactions manager of
             the system to load transactions into
+        data_file (str): the text data file
+        snapshot_file (str): the binary snapshot of the data file
+
+    Returns:
+        True if the state was loaded from the snapshot file
     """
-    file = open("data/data.txt", 'r')
+    state = snapshot.read_snapshot(snapshot_file, data_file)
+    if state is not None:
+        reservation_manager.__dict__.update(state[0].__dict__)
+        transactions_manager.__dict__.update(state[1].__dict__)
+        reservation_manager.expire(date.today())
+        return True
+
+    file = open(data_file, 'r')
     lines = file.readlines()
     # Read every line from data file, with a hash # seperating the reservations
     # from the transactions
@@ -739,40 +1758,276 @@ def load_data_from_file(reservation_manager, transactions_manager):
         else:
             transactions_manager.add_transaction(line)
     file.close()
+    return False
 
-def save_date_to_file(reservation_manager, transactions_manager):
+def save_date_to_file(reservation_manager, transactions_manager, data_file):
     """
     Given the current reservation manager and transaction manager, save all
-    data in the system to data.txt
+    their data to a data file (see Shard.write_snapshot for the snapshot)
 
     Args:
         reservation_manager (ReservationManager): the reservation manager of
             the system to load reservations into
         transactions_manager (TransactionManager): the transactions manager of
             the system to load transactions into
+        data_file (str): the text data file
     """
     # save_to_file reservation and transaction data, seperated by a hash #
-    file = open('data/data.txt', 'w')
+    file = open(data_file, 'w')
     reservation_manager.save_to_file(file)
     file.write('#\n')
     transactions_manager.save_to_file(file)
     file.close()
 
 
+class Facility:
+    """
+    A facility (site) served by the system, with a data partition of its own:
+    its shards, the locks of its ids and customers, and its closures. The
+    facilities of a process share nothing, requests to different facilities
+    never wait for each other
+
+    The functions below work on the facility of the request being handled,
+    see facility
+
+    Attributes:
+        name (str): The name of the facility
+        directory (str): The directory of the data files of the facility
+        shards (list): The shards of the facility, see SHARD_RESOURCES
+        ids_lock (threading.Lock): Reservation and transaction ids are numbered
+            across all the shards, an id is picked and used (its reservation
+            or transaction added) while holding this lock
+        customer_locks (list): The rules about a customer (one special machine
+            at a time, 3 days per week) look at their reservations in every
+            shard, so the bookings of a customer are made one at a time.
+            Customers are spread over a fixed number of locks, which are
+            always taken before the lock of a shard
+        calendar (opening_hours.Calendar): The opening hours, with the
+            closures of closures.json in the directory
+        transaction_listeners (list): Called with every transaction recorded
+            by a request, in the order of their ids, while ids_lock is held
+    """
+    def __init__(self, name, directory, data_file=None, transaction_listeners=None):
+        self.name = name
+        self.directory = directory
+        data_file = data_file or os.path.join(directory, 'data.txt')
+        self.shards = [Shard(shard_name, resources, directory, data_file) for shard_name, resources in SHARD_RESOURCES.items()]
+        self.ids_lock = threading.Lock()
+        self.customer_locks = [threading.Lock() for _ in range(64)]
+        self.calendar = opening_hours.Calendar(os.path.join(directory, 'closures.json'))
+        self.transaction_listeners = transaction_listeners if transaction_listeners is not None else []
+
+    def customer_lock(self, customer_id):
+        """
+        Returns the lock of a customer
+        """
+        return self.customer_locks[hash(customer_id) % len(self.customer_locks)]
+
+    def write_snapshots(self):
+        """
+        Write the snapshots of the shards not written since their last saves,
+        taking their locks one at a time
+        """
+        for shard in self.shards:
+            with shard.lock:
+                shard.write_snapshot()
+
+
+# Called with every transaction recorded by a request to the default facility
+# (web.py registers the feed of changes, see events.py, and the ledger export)
+transaction_listeners = []
+
+# The facility of the data directory, requests are made to it unless they name another one
+default_facility = Facility('default', DATA_DIRECTORY, DATA_FILE, transaction_listeners)
+
+# The other facilities loaded so far, by name
+facilities = {}
+facilities_lock = threading.Lock()
+
+# The facility of the request being handled, None for the default one
+current_facility = ContextVar('current_facility', default=None)
+
+def facility():
+    """
+    Returns the Facility of the request being handled
+    """
+    return current_facility.get() or default_facility
+
+def find_facility(name):
+    """
+    Returns the facility with a name, loading it the first time, or None if
+    the name is not valid or there is no directory for it in FACILITIES_DIRECTORY
+    """
+    if name == default_facility.name:
+        return default_facility
+    if not FACILITY_NAME.fullmatch(name):
+        return None
+    with facilities_lock:
+        if name not in facilities:
+            directory = os.path.join(FACILITIES_DIRECTORY, name)
+            if not os.path.isdir(directory):
+                return None
+            facilities[name] = Facility(name, directory)
+        return facilities[name]
+
+def write_snapshots():
+    """
+    Write the pending snapshots of every facility loaded so far, called when
+    the server shuts down so that it starts from the snapshots
+    """
+    with facilities_lock:
+        sites = [default_facility] + list(facilities.values())
+    for site in sites:
+        site.write_snapshots()
+
+def shard_of(resource):
+    """
+    Returns the shard keeping the reservations of a resource (the first shard
+    for unknown resources, which the rules reject anyway)
+    """
+    site = facility()
+    for shard in site.shards:
+        if resource in shard.resources:
+            return shard
+    return site.shards[0]
+
+def load_shards(read_only=False):
+    """
+    Bring every shard up to date with its data file, taking their locks one
+    at a time, and the opening hours with the closures file. Nothing is
+    written when read_only is set (see Shard.load)
+    """
+    site = facility()
+    site.calendar.refresh()
+    for shard in site.shards:
+        with shard.lock:
+            shard.load(read_only)
+
+def shard_view():
+    """
+    Returns a ShardView of the reservations of all the shards
+    """
+    return ShardView([shard.reservation_manager for shard in facility().shards])
+
+def new_reservation_id():
+    """
+    Returns the id of the next reservation, ids_lock must be held for the id to stay free
+    """
+    return max(shard.reservation_manager.new_id() for shard in facility().shards)
+
+def new_waitlist_id():
+    """
+    Returns the id of the next waitlisted request, ids_lock must be held for the id to stay free
+    """
+    return max(shard.waitlist.next_id for shard in facility().shards)
+
+def new_transaction_id():
+    """
+    Returns the id of the next transaction, ids_lock must be held for the id to stay free
+    """
+    return sum(len(shard.transactions_manager.transactions) for shard in facility().shards) + 1
+
+def publish(transactions_manager):
+    """
+    Pass the transaction just recorded by a transactions manager on to the
+    transaction listeners, ids_lock must be held for them to be passed in order
+    """
+    for listener in facility().transaction_listeners:
+        listener(transactions_manager.transactions[-1])
+
+def transactions_after(transaction_id, limit=None):
+    """
+    Returns the transactions of every shard recorded after a transaction, in
+    the order of their ids, taking the locks of the shards one at a time
+
+    Args:
+        transaction_id (int): The id of the transaction to start after, 0 for all
+        limit (int): optional, the maximum number of transactions to return
+    """
+    ledgers = []
+    for shard in facility().shards:
+        with shard.lock:
+            shard.load()
+            transactions = shard.transactions_manager.transactions
+            # The ledger of a shard is in the order of the ids
+            first = bisect.bisect_right(transactions, transaction_id, key=lambda transaction: transaction.transaction_id)
+            ledgers.append(transactions[first:] if limit is None else transactions[first:first + limit])
+    merged = heapq.merge(*ledgers, key=lambda transaction: transaction.transaction_id)
+    return list(merged) if limit is None else list(itertools.islice(merged, limit))
+
+def customer_history(customer_id, transaction_id, limit):
+    """
+    Returns the history of a customer, the transactions of their reservations
+    (made and cancelled) recorded after a transaction, in the order of their
+    ids. Only the indexes of the customer are looked at, the locks of the
+    shards are taken one at a time
+
+    Args:
+        customer_id (str): The customer
+        transaction_id (int): The id of the transaction to start after, 0 for all
+        limit (int): The maximum number of transactions to return
+
+    Returns:
+        A list of transaction_data (see Transaction.report_data), with the
+        reservation of the transaction and whether it is still booked
+    """
+    ledgers = []
+    # Reservation ids are reused once cancelled, a reservation is still booked
+    # if its id is active and it is the latest transaction of that id
+    booked = set()
+    for shard in facility().shards:
+        with shard.lock:
+            shard.load()
+            transactions = shard.transactions_manager.by_customer.get(customer_id, [])
+            first = bisect.bisect_right(transactions, transaction_id, key=lambda transaction: transaction.transaction_id)
+            ledgers.append(transactions[first:first + limit])
+            latest = {transaction.detail.reservation_id: transaction for transaction in transactions}
+            for reservation in shard.reservation_manager.by_customer.get(customer_id, ()):
+                transaction = latest.get(reservation.reservation_id)
+                if transaction is not None and transaction.type == 'RESERVATION':
+                    booked.add(transaction.transaction_id)
+    history = []
+    for transaction in itertools.islice(heapq.merge(*ledgers, key=lambda transaction: transaction.transaction_id), limit):
+        entry = transaction.report_data()
+        entry["reservation"] = transaction.detail.report_data()
+        entry["booked"] = transaction.transaction_id in booked
+        history.append(entry)
+    return history
+
+def recorded_transactions():
+    """
+    Returns the transactions of every shard in the order of their ids, without
+    loading the shards. ids_lock must be held for none to be recorded meanwhile
+    """
+    return heapq.merge(*[shard.transactions_manager.transactions for shard in facility().shards],
+                       key=lambda transaction: transaction.transaction_id)
+
+
 def handle_request(request):
     """
     Main function of this reservation program, the format of commands are as follows:
-    reserve.py reserve <customer_id> <resource> <start_date> <end_date> <start_time> <end_time> <reserve_date>
+    reserve.py reserve <customer_id> <resource> <start_date> <end_date> <start_time> <end_time> <reserve_date> [<days>]
+    reserve.py waitlist <customer_id> <resource> <start_date> <end_date> <start_time> <end_time> <reserve_date> [<days>]
+    reserve.py waitlist_status <waitlist_id>
+    reserve.py validate <customer_id> <resource> <start_date> <end_date> <start_time> <end_time> <reserve_date> [<days>]
+    reserve.py quote <customer_id> <resource> <start_date> <end_date> <start_time> <end_time> <reserve_date> [<days>]
     reserve.py cancel <reservation_id> <cancel_date>
+    reserve.py cancel_batch <cancel_date> ids <reservation_id> <reservation_id> ...
+    reserve.py cancel_batch <cancel_date> customer <customer_id> <start_date> <end_date>
     reserve.py reservations <start_date> <end_date>
     reserve.py financial <start_date> <end_date>
+    reserve.py summary <start_date> <end_date> <resource>
+    reserve.py changes <transaction_id> <limit>
+    reserve.py history <customer_id> <transaction_id> <limit>
     reserve.py reservations <start_date> <end_date> <customer_id>
     
     Any date is of the form mm-dd-yyyy
     Any time is of the form hh:mm in 24 hour format
+    The days pattern of a recurring reservation is optional, see parse_days
 
-    Handle the above requests by loading the data from data.txt, performing request
-    and then saving updated data back into data.txt
+    Handle the above requests on the shards of the system, reservations and
+    cancellations save the shard they change to its data file (reports do not
+    change any data, so nothing is saved for them)
 
     Args:
         request (list): A list of comand and arugments
@@ -780,76 +2035,346 @@ def handle_request(request):
     Returns:
         response (JSON): A JSON formatted API response
     """
-
-    # Initialize the Reservation and transaction managers by loading all 
-    # existing reservations and transactions from the data file
-    reservation_manager = ReservationManager()
-    transactions_manager = Transaction_Manager()
-    
-    load_data_from_file(reservation_manager, transactions_manager)
-
     response = None
 
     # handle request
     command = request[0]
     if command == 'reserve':
-        # Get all the required arguments from the command line
-        date_of_reservation = request[7]
-        reservation_info = [str(reservation_manager.new_id())] + request[1:]
-        new_reservation = Reservation(reservation_info)
-        # check if the reservation is possible
-        if handle_reservation(reservation_manager, new_reservation):
-            # make the reservation
-            reservation_manager.add_reservation(new_reservation)
-            # add a transaction for this reservation
-            transaction_info = [transactions_manager.new_id(), 'RESERVATION', date_of_reservation] + reservation_info
-            transactions_manager.add_transaction(transaction_info)
-            # print reservation successful message (including total cost and down payment)
-            print(f"Reservation succeeded! Reservation id: {new_reservation.reservation_id}, Total cost: ${new_reservation.total_cost}, down payment: ${new_reservation.down_payment}.")
-            response = reservation_detail(new_reservation)
-        else:
-            return
-    
+        response = make_reservation(request)
+
+    elif command == 'waitlist':
+        # reserve, or wait for capacity to free up
+        response = make_reservation(request, waitlist=True)
+
+    elif command == 'waitlist_status':
+        response = waitlist_status(int(request[1]))
+
     elif command == 'cancel':
-        reservation_id = int(request[1])
-        cancel_date = request[2]
-        found = False
-        # cancel the reservation by removing it from the reservation manager
-        for i in range(len(reservation_manager.reservations)):
-            if reservation_manager.reservations[i].reservation_id == reservation_id:
-                found = True
-                break
-        
-        if not found:
-            handle_error(400, "Cancellation", f"Invalid reservation id: {reservation_id}")
-        
-        cancelled_reservation = reservation_manager.reservations[i]
-        del reservation_manager.reservations[i]
+        response = cancel_reservation(int(request[1]), request[2])
 
-        # Ask the transaction manager to manage refund and record refund
-        percent_returned, refund = transactions_manager.create_refund(cancelled_reservation, cancel_date)
+    elif command == 'cancel_batch':
+        if request[2] == 'ids':
+            response = cancel_reservations(request[1], reservation_ids=[int(i) for i in request[3:]])
+        else:
+            response = cancel_reservations(request[1], customer_id=request[3], start_date=request[4], end_date=request[5])
+
+    elif command == 'validate':
+        # check a reservation against every rule, without making it
+        shard = shard_of(request[2])
+        load_shards()
+        with shard.lock:
+            reservation_info = [str(new_reservation_id())] + request[1:8]
+            response = validate_reservation(shard_view(), Reservation(reservation_info, days_of(request)))
+
+    elif command == 'quote':
+        # price a reservation and check whether it can be made, without making it
+        response = quote_reservation(request)
 
-        response = cancellation_detail(percent_returned, refund)
-    
     elif command == 'reservations':
         customer_id = ""
         # If a specific customer is indicated
         if len(request) == 4:
             customer_id = request[3]
-        response = reservation_manager.generate_reservations_report(request[1], request[2], customer_id)
+        reports = []
+        for shard in facility().shards:
+            with shard.lock:
+                shard.load()
+                reports.append(shard.reservation_manager.generate_reservations_report(request[1], request[2], customer_id)["reservations"])
+        response = {"reservations": list(heapq.merge(*reports, key=lambda reservation: reservation.reservation_id))}
     
     elif command == 'financial':
         # list transactions between the two dates
-        response = transactions_manager.generate_transactions_report(request[1], request[2])
+        reports = []
+        for shard in facility().shards:
+            with shard.lock:
+                shard.load()
+                reports.append(shard.transactions_manager.generate_transactions_report(request[1], request[2])["transactions"])
+        response = {"transactions": list(heapq.merge(*reports, key=lambda transaction: transaction.transaction_id))}
+
+    elif command == 'summary':
+        # revenue, deposits and refunds per day and resource between the two dates
+        resource = request[3] if len(request) == 4 else ""
+        daily_totals = {}
+        for shard in facility().shards:
+            with shard.lock:
+                shard.load()
+                totals = shard.transactions_manager.daily_totals_between(to_date(request[1]), to_date(request[2]))
+            for day, resources in totals.items():
+                daily_totals.setdefault(day, {}).update(resources)
+        response = summary_report(daily_totals, request[1], request[2], resource)
     
+    elif command == 'changes':
+        # the transactions recorded after a transaction, for consumers syncing the ledger
+        transactions = transactions_after(int(request[1]), int(request[2]))
+        last = transactions[-1].transaction_id if transactions else int(request[1])
+        response = {"changes": transactions, "last_seq": last}
+
+    elif command == 'history':
+        # the reservations and cancellations of a customer, from the indexes of the customer
+        history = customer_history(request[1], int(request[2]), int(request[3]))
+        last = history[-1]["transaction_id"] if history else int(request[2])
+        response = {"customer_id": request[1], "history": history, "last_seq": last}
+
     else:
-        print(f"Unsupported command: {command}")
+        logger.warning("Unsupported command: %s", command)
         handle_error(400, "Cancellation", f"Invalid request: {command}")
     
-    save_date_to_file(reservation_manager, transactions_manager)
     return response
 
 
+def make_reservation(request, waitlist=False):
+    """
+    Make a reservation in the shard of its resource, if it does not break any
+    of the reservation rules (see handle_request for the format of request)
+
+    Args:
+        request (list): A list of comand and arugments
+        waitlist (bool): If the reservation only breaks rules that a
+            cancellation can lift (WAITLIST_RULES), queue the request on the
+            waitlist of the shard instead of rejecting it
+
+    Returns:
+        response (JSON): A JSON formatted API response
+    """
+    # Get all the required arguments from the command line
+    customer_id = request[1]
+    date_of_reservation = request[7]
+    shard = shard_of(request[2])
+    load_shards()
+    days = days_of(request)
+    with facility().customer_lock(customer_id), shard.lock:
+        reservation_info = [str(new_reservation_id())] + request[1:8]
+        new_reservation = Reservation(reservation_info, days)
+        # check if the reservation is possible
+        violations = [] if waitlist else None
+        handle_reservation(shard_view(), new_reservation, violations)
+        if violations:
+            if all(violation['rule'] in WAITLIST_RULES for violation in violations):
+                with facility().ids_lock:
+                    entry = shard.waitlist.add_entry([str(new_waitlist_id()), '-'] + request[1:8] + [days])
+                logger.info("Reservation waitlisted, waitlist id: %s", entry.waitlist_id)
+                shard.save_waitlist()
+                return entry.report_data()
+            # Rejected with the first broken rule, as without the waitlist
+            handle_reservation(shard_view(), new_reservation)
+        with facility().ids_lock:
+            # Another shard may have used the id in the meantime
+            if new_reservation.reservation_id != new_reservation_id():
+                reservation_info = [str(new_reservation_id())] + request[1:8]
+                new_reservation = Reservation(reservation_info, days)
+            # make the reservation
+            shard.reservation_manager.add_reservation(new_reservation)
+            # add a transaction for this reservation
+            transaction_info = [new_transaction_id(), 'RESERVATION', date_of_reservation] + new_reservation.tolist()
+            shard.transactions_manager.add_transaction(transaction_info)
+            publish(shard.transactions_manager)
+        # log reservation successful message (including total cost and down payment)
+        logger.info("Reservation succeeded, reservation id: %s, total cost: $%s, down payment: $%s",
+                    new_reservation.reservation_id, new_reservation.total_cost, new_reservation.down_payment)
+        shard.save()
+    return reservation_detail(new_reservation)
+
+
+def quote_reservation(request):
+    """
+    Price a prospective reservation and check it against the reservation
+    rules (see handle_request for the format of request). Nothing is
+    recorded or saved, and the nearest alternatives are not searched for
+    (see validate_reservation)
+
+    Args:
+        request (list): A list of comand and arugments
+
+    Returns:
+        A dict with the price of the reservation as in reservation_detail,
+        whether it can be made now and the rules it breaks
+    """
+    shard = shard_of(request[2])
+    load_shards(read_only=True)
+    quote = Reservation(['0'] + request[1:8], days_of(request))
+    violations = []
+    with shard.lock:
+        handle_reservation(shard_view(), quote, violations)
+    return {
+        'discount': str(quote.discount),
+        'total_cost': str(quote.total_cost),
+        'down_payment': str(quote.down_payment),
+        'available': len(violations) == 0,
+        'violations': violations
+    }
+
+
+def promote_waitlist(shard, cancelled_reservations, cancel_date):
+    """
+    Make the reservations of the waiting requests of a shard that fit in the
+    capacity freed by cancelled reservations, first come first served. Only
+    the requests waiting for the freed resources, days and slots are checked.
+    The lock of the shard and ids_lock must be held
+
+    Args:
+        shard (Shard): The shard the reservations were cancelled from
+        cancelled_reservations (list): The cancelled Reservation objects
+        cancel_date (str): the date of the cancellation, on which the
+            promoted reservations are made
+
+    Returns:
+        The promoted WaitlistEntry objects
+    """
+    waiting = set()
+    for cancelled_reservation in cancelled_reservations:
+        waiting.update(shard.waitlist.waiting_for(cancelled_reservation, to_date(cancel_date)))
+    promoted = []
+    for waitlist_id in sorted(waiting):
+        entry = shard.waitlist.entries[waitlist_id]
+        # Customer locks are taken before shard locks, here one is only tried:
+        # a customer who is booking right now waits for the next cancellation
+        customer_lock = facility().customer_lock(entry.customer_id)
+        if not customer_lock.acquire(blocking=False):
+            continue
+        try:
+            new_reservation = entry.reservation(new_reservation_id(), cancel_date)
+            if not handle_reservation(shard_view(), new_reservation, []):
+                continue
+            shard.reservation_manager.add_reservation(new_reservation)
+            transaction_info = [new_transaction_id(), 'RESERVATION', cancel_date] + new_reservation.tolist()
+            shard.transactions_manager.add_transaction(transaction_info)
+            publish(shard.transactions_manager)
+            shard.waitlist.promote(entry, new_reservation.reservation_id)
+        finally:
+            customer_lock.release()
+        logger.info("Waitlist promoted, waitlist id: %s, reservation id: %s",
+                    entry.waitlist_id, entry.reservation_id)
+        promoted.append(entry)
+    return promoted
+
+
+def waitlist_status(waitlist_id):
+    """
+    Returns the status of a waitlisted request, in whichever shard it is
+
+    Args:
+        waitlist_id (int): The id of the waitlisted request
+
+    Returns:
+        response (JSON): A JSON formatted API response
+    """
+    load_shards()
+    for shard in facility().shards:
+        with shard.lock:
+            if waitlist_id in shard.waitlist.entries:
+                return shard.waitlist.entries[waitlist_id].report_data()
+    handle_error(404, "Waitlist", f"Unknown waitlist id: {waitlist_id}")
+
+
+def days_of(request):
+    """
+    Returns the days pattern of a reserve or validate request, 'daily' if it has none
+    """
+    return request[8] if len(request) > 8 else 'daily'
+
+
+def cancel_reservation(reservation_id, cancel_date):
+    """
+    Cancel a reservation, in whichever shard it is, and refund it
+
+    Args:
+        reservation_id (int): The id of the reservation to cancel
+        cancel_date (str): the date on which the cancellation is requested
+
+    Returns:
+        response (JSON): A JSON formatted API response
+    """
+    load_shards()
+    for shard in facility().shards:
+        with shard.lock:
+            reservations = shard.reservation_manager.reservations
+            for i in range(len(reservations)):
+                if reservations[i].reservation_id != reservation_id:
+                    continue
+                with facility().ids_lock:
+                    # cancel the reservation by removing it from the reservation manager
+                    cancelled_reservation = shard.reservation_manager.remove_reservation(i)
+                    # Ask the transaction manager to manage refund and record refund
+                    percent_returned, refund = shard.transactions_manager.create_refund(
+                        cancelled_reservation, cancel_date, new_transaction_id())
+                    publish(shard.transactions_manager)
+                    # The freed capacity goes to the requests waiting for it
+                    promoted = promote_waitlist(shard, [cancelled_reservation], cancel_date)
+                shard.save()
+                if promoted:
+                    shard.save_waitlist()
+                return cancellation_detail(percent_returned, refund)
+
+    handle_error(400, "Cancellation", f"Invalid reservation id: {reservation_id}")
+
+
+def cancel_reservations(cancel_date, reservation_ids=None, customer_id=None, start_date=None, end_date=None):
+    """
+    Cancel several reservations at once and refund them: either the
+    reservations with the given ids, or all the reservations of a customer
+    starting between two dates. Either all the given ids are cancelled or
+    none of them, and every shard changed is saved once
+
+    Args:
+        cancel_date (str): the date on which the cancellation is requested
+        reservation_ids (list): The ids (int) of the reservations to cancel
+        customer_id (str): The customer whose reservations to cancel, when
+            no ids are given
+        start_date (str): The first start date of the reservations to cancel
+        end_date (str): The last start date of the reservations to cancel
+
+    Returns:
+        response (JSON): A JSON formatted API response
+    """
+    load_shards()
+    # Every shard is locked (in order) for the batch to be cancelled at once
+    with contextlib.ExitStack() as stack:
+        for shard in facility().shards:
+            stack.enter_context(shard.lock)
+
+        selected = []
+        if reservation_ids is not None:
+            wanted = set(reservation_ids)
+            for shard in facility().shards:
+                selected.append(set(reservation.reservation_id for reservation in shard.reservation_manager.reservations
+                                    if reservation.reservation_id in wanted))
+            missing = wanted.difference(*selected)
+            if missing:
+                handle_error(400, "Cancellation", f"Invalid reservation id: {min(missing)}")
+        else:
+            first_day, last_day = to_date(start_date), to_date(end_date)
+            for shard in facility().shards:
+                selected.append(set(reservation.reservation_id for reservation in shard.reservation_manager.reservations
+                                    if reservation.customer_id == customer_id and first_day <= reservation.start_day <= last_day))
+
+        cancellations = []
+        total_refund = 0
+        promoted = []
+        with facility().ids_lock:
+            for shard, shard_ids in zip(facility().shards, selected):
+                cancelled_reservations = shard.reservation_manager.remove_reservations(shard_ids)
+                for cancelled_reservation in cancelled_reservations:
+                    percent_returned, refund = shard.transactions_manager.create_refund(
+                        cancelled_reservation, cancel_date, new_transaction_id())
+                    publish(shard.transactions_manager)
+                    detail = {'reservation_id': str(cancelled_reservation.reservation_id)}
+                    detail.update(cancellation_detail(percent_returned, refund))
+                    cancellations.append(detail)
+                    total_refund += refund
+                promoted.append(promote_waitlist(shard, cancelled_reservations, cancel_date))
+        for shard, shard_ids, shard_promoted in zip(facility().shards, selected, promoted):
+            if shard_ids:
+                shard.save()
+            if shard_promoted:
+                shard.save_waitlist()
+
+    cancellations.sort(key=lambda detail: int(detail['reservation_id']))
+    return {
+        'cancellations': cancellations,
+        'total_refund': str(round(total_refund, 2))
+    }
+
+
 def handle_error(code, operation_name, detail):
     """
     Raise a HTTPException
@@ -0,0 +1,104 @@
+# G-01: API-ify the Reservation System
+#
+# Group Name: 404 Team Not Found
+#
+# File Name: snapshot.py
+#
+# Date: October 19, 2026
+
+import gc
+import os
+import pickle
+import struct
+import zlib
+
+# A snapshot file starts with a fixed size header followed by the pickled state
+#   magic (4 bytes), format version (2 bytes),
+#   mtime_ns and size of the text data file the snapshot was taken from (8 bytes each),
+#   crc32 checksum of the payload (4 bytes)
+MAGIC = b'WFRS'
+VERSION = 6
+HEADER = struct.Struct('>4sHQQI')
+
+
+def text_file_stamp(text_path):
+    """
+    Get the modification time and size of the text data file
+
+    Args:
+        text_path (str): path of the text data file
+
+    Returns:
+        (mtime_ns, size) of the file, or None if it does not exist
+    """
+    try:
+        stat = os.stat(text_path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def write_snapshot(snapshot_path, text_path, state):
+    """
+    Write a binary snapshot of the parsed state next to the text data file.
+    The snapshot records the stamp of the text file it was taken from, so it
+    is only used as long as the text file is not modified afterwards
+
+    Args:
+        snapshot_path (str): path of the snapshot file to write
+        text_path (str): path of the text data file the state was saved to
+        state (object): the state to snapshot, must be picklable
+    """
+    stamp = text_file_stamp(text_path)
+    if stamp is None:
+        return
+    payload = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+    header = HEADER.pack(MAGIC, VERSION, stamp[0], stamp[1], zlib.crc32(payload))
+    # Write to a temporary file first so a crash never leaves a torn snapshot
+    temp_path = snapshot_path + '.tmp'
+    with open(temp_path, 'wb') as file:
+        file.write(header)
+        file.write(payload)
+    os.replace(temp_path, snapshot_path)
+
+
+def read_snapshot(snapshot_path, text_path):
+    """
+    Load the state from a snapshot file if it is still valid, that is if it
+    has the current format version, its checksum matches and the text data
+    file has not changed since the snapshot was taken
+
+    Args:
+        snapshot_path (str): path of the snapshot file to read
+        text_path (str): path of the text data file
+
+    Returns:
+        The state stored in the snapshot, None if the snapshot cannot be used
+    """
+    stamp = text_file_stamp(text_path)
+    if stamp is None:
+        return None
+    try:
+        with open(snapshot_path, 'rb') as file:
+            data = file.read()
+    except FileNotFoundError:
+        return None
+    if len(data) < HEADER.size:
+        return None
+    magic, version, mtime_ns, size, checksum = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION or (mtime_ns, size) != stamp:
+        return None
+    payload = memoryview(data)[HEADER.size:]
+    if zlib.crc32(payload) != checksum:
+        return None
+    # Unpickling allocates one object per record, pausing the garbage collector
+    # avoids it repeatedly traversing the (acyclic) records while they are loaded
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return pickle.loads(payload)
+    except Exception:
+        return None
+    finally:
+        if gc_was_enabled:
+            gc.enable()
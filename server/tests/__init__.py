@@ -0,0 +1,10 @@
+import reserve
+
+
+def make_transaction(transaction_id, transaction_type='RESERVATION', reservation_id=None, resource='workshop',
+                     start_date='04-30-2022', end_date='04-30-2022', start_time='11:00', end_time='11:30'):
+    # A transaction of hayder made on 4-30-2022, of the reservation with the
+    # same id as the transaction unless another one is given
+    reservation_id = transaction_id if reservation_id is None else reservation_id
+    return reserve.Transaction([str(transaction_id), transaction_type, '4-30-2022', str(reservation_id), 'hayder',
+                                resource, start_date, end_date, start_time, end_time, '4-30-2022'])
@@ -1,3 +1,5 @@
+import os
+
 #clear preexisting data file.
 file = open("data/data.txt","w")
 file.close()
@@ -6,4 +8,14 @@ with open('tests/testingdata.txt','r') as firstfile, open('data/data.txt','a') a
     # read content from first file
     for line in firstfile:  
         # append content to second file
-        secondfile.write(line)
\ No newline at end of file
+        secondfile.write(line)
+
+#remove the data files of the shards, they are seeded again from data.txt.
+for name in ["workshop", "machines"]:
+    for extension in [".txt", ".snapshot", ".waitlist"]:
+        if os.path.exists("data/" + name + extension):
+            os.remove("data/" + name + extension)
+
+#remove the export of the ledger, it is written again from the data files.
+if os.path.exists("data/ledger.ndjson"):
+    os.remove("data/ledger.ndjson")
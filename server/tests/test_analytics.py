@@ -0,0 +1,54 @@
+from datetime import date
+import analytics
+from tests import make_transaction
+
+
+class TestOccupancy:
+    '''
+    Test the resource x day x slot tensor of reservations
+    '''
+    def test_add_and_window(self):
+        #Reservations count in the slots of their days, the tensor grows both ways to cover new days.
+        occupancy = analytics.Occupancy()
+        occupancy.add(make_transaction(1, 'RESERVATION', 1, 'hvc', '05-04-2026', '05-05-2026', '10:00', '11:00').detail)
+        occupancy.add(make_transaction(2, 'RESERVATION', 2, 'hvc', '04-20-2026', '04-20-2026', '10:30', '11:00').detail)
+        window = occupancy.window(date(2026, 4, 19), date(2026, 5, 5))
+        hvc = analytics.RESOURCE_INDEX['hvc']
+        assert window.shape == (6, 17, 48)
+        assert window[hvc, 1, 20:22].tolist() == [0, 1]
+        assert window[hvc, 15:17, 20:22].tolist() == [[1, 1], [1, 1]]
+        assert window.sum() == 5
+
+
+class TestUtilization:
+    '''
+    Test utilization reports, brought up to date with the ledger
+    '''
+    def test_report(self):
+        #Cancelled reservations no longer count, and new transactions are applied to the cached reports.
+        ledger = [make_transaction(1, 'RESERVATION', 1, 'harvester', '05-04-2026', '05-04-2026', '10:00', '11:00'),
+                  make_transaction(2, 'RESERVATION', 2, 'harvester', '05-11-2026', '05-11-2026', '10:00', '10:30'),
+                  make_transaction(3, 'CANCELLATION$0', 1, 'harvester', '05-04-2026', '05-04-2026', '10:00', '11:00')]
+        recorded = []
+        utilization = analytics.Utilization(lambda after: [transaction for transaction in recorded if transaction.transaction_id > after])
+        recorded.extend(ledger[:2])
+        report = utilization.report(date(2026, 5, 4), date(2026, 5, 17), ['harvester'])
+        harvester = report["resources"]["harvester"]
+        assert harvester["capacity"] == 1
+        assert harvester["heatmap"]["mon"][2:4] == [1.0, 0.5]
+        assert harvester["peak_hours"] == [{"day": "mon", "time": "10:00", "utilization": 1.0},
+                                           {"day": "mon", "time": "10:30", "utilization": 0.5}]
+        assert harvester["max_reserved"] == {"count": 1, "date": "05-04-2026", "time": "10:00"}
+        recorded.append(ledger[2])
+        report = utilization.report(date(2026, 5, 4), date(2026, 5, 17), ['harvester'])
+        assert report["resources"]["harvester"]["heatmap"]["mon"][2:4] == [0.5, 0.0]
+
+    def test_ledger_reset(self):
+        #The occupancy is built again when the ledger no longer holds the last transaction applied.
+        recorded = [make_transaction(1, 'RESERVATION', 1, 'workshop', '05-04-2026', '05-04-2026', '10:00', '11:00')]
+        utilization = analytics.Utilization(lambda after: [transaction for transaction in recorded if transaction.transaction_id > after])
+        utilization.report(date(2026, 5, 4), date(2026, 5, 4))
+        recorded[0] = make_transaction(1, 'RESERVATION', 1, 'extruder', '05-04-2026', '05-04-2026', '10:00', '11:00')
+        report = utilization.report(date(2026, 5, 4), date(2026, 5, 4))
+        assert report["resources"]["workshop"]["max_reserved"] is None
+        assert report["resources"]["extruder"]["max_reserved"]["count"] == 1
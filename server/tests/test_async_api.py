@@ -0,0 +1,74 @@
+import asyncio
+import httpx
+import web
+import async_api
+
+
+class RecordingTransport(httpx.ASGITransport):
+    '''
+    Runs the requests against the application in-process, recording their
+    query parameters in the order they are sent. The n-th request sets the
+    event returned by sent_event(n)
+    '''
+    def __init__(self):
+        super().__init__(app=web.app)
+        self.sent = []
+        self.events = {}
+
+    def sent_event(self, count):
+        return self.events.setdefault(count, asyncio.Event())
+
+    async def handle_async_request(self, request):
+        self.sent.append((request.url.path, dict(request.url.params)))
+        self.sent_event(len(self.sent)).set()
+        return await super().handle_async_request(request)
+
+
+def make_client(transport):
+    return async_api.AsyncReservationClient(url="http://testserver/v1_0/", transport=transport)
+
+
+class TestAsyncReservationClient:
+    '''
+    Test the asynchronous API client against the application
+    '''
+    def test_report_pages(self):
+        #Pages come in date order, the next window being requested while the current one is processed.
+        transport = RecordingTransport()
+
+        async def run():
+            pages, requested = [], []
+            async with make_client(transport) as client:
+                async for page in client.report_pages("reservations", "04-27-2022", "05-03-2022", window_days=3):
+                    if len(pages) < 2:
+                        await asyncio.wait_for(transport.sent_event(len(pages) + 2).wait(), timeout=5)
+                    requested.append(len(transport.sent))
+                    pages.append([reservation['reservation_id'] for reservation in page])
+            return pages, requested
+
+        pages, requested = asyncio.run(run())
+        assert pages == [[], [2], []]
+        assert requested == [2, 3, 3]
+        assert [params for _, params in transport.sent] == [
+            {'start_date': '04-27-2022', 'end_date': '04-29-2022'},
+            {'start_date': '04-30-2022', 'end_date': '05-02-2022'},
+            {'start_date': '05-03-2022', 'end_date': '05-03-2022'}]
+
+    def test_dashboard(self):
+        #The dashboard combines the reservations, transactions and summary views.
+        transport = RecordingTransport()
+
+        async def run():
+            async with make_client(transport) as client:
+                dashboard = await client.dashboard("04-25-2022", "05-08-2022")
+                reservations = (await client.get_reservations("04-25-2022", "05-08-2022")).json()['detail']
+                transactions = (await client.get_transactions("04-25-2022", "05-08-2022")).json()['detail']
+                summary = (await client.get_transactions_summary("04-25-2022", "05-08-2022")).json()['detail']
+            return dashboard, reservations, transactions, summary
+
+        dashboard, reservations, transactions, summary = asyncio.run(run())
+        assert sorted(path for path, _ in transport.sent[:3]) == ['/v1_0/reservations', '/v1_0/transactions', '/v1_0/transactions/summary']
+        assert dashboard == {"reservations": reservations["reservations"],
+                             "transactions": transactions["transactions"],
+                             "summary": summary}
+        assert [reservation['reservation_id'] for reservation in dashboard["reservations"]] == [2]
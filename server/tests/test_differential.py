@@ -0,0 +1,111 @@
+import datetime
+import random
+import pytest
+from fastapi import HTTPException
+import reserve
+from tests import reference_reserve
+
+# Mondays the generated requests are made around, in the middle of a year,
+# and before the week spanning 2026 and 2027 (the reference counts the days of
+# that week per calendar year)
+TODAY = datetime.date(2026, 5, 4)
+YEAR_END = datetime.date(2026, 12, 21)
+CUSTOMERS = ['hayder', 'hayder2', 'hayder3', 'hayder4', 'hayder5']
+RESOURCES = reserve.RESOURCES + ['laser']
+
+
+class FrozenDate(datetime.date):
+    '''
+    The date of the engine, frozen to a day
+    '''
+    frozen = TODAY
+
+    @classmethod
+    def today(cls):
+        return cls(cls.frozen.year, cls.frozen.month, cls.frozen.day)
+
+
+def random_request(rng, reservation_ids, today=TODAY):
+    '''
+    A random reserve or cancel request, mostly valid ones around a few busy slots
+    '''
+    if reservation_ids and rng.random() < 0.25:
+        reservation_id = rng.choice(reservation_ids) if rng.random() < 0.9 else max(reservation_ids) + rng.randint(1, 3)
+        cancel_date = today + datetime.timedelta(days=rng.randint(0, 10))
+        return ['cancel', str(reservation_id), cancel_date.strftime('%m-%d-%Y')]
+    start_day = today + datetime.timedelta(days=rng.choice([-1, 0, 1, 2, 3, 4, 5, 6, 7, 9, 15, 29, 31]))
+    end_day = start_day + datetime.timedelta(days=rng.choice([0, 0, 0, 0, 1, 2, 5]))
+    start_hour = rng.randint(8, 17)
+    start_minute = rng.choice([0, 30, 30, 0, 15])
+    half_hours = rng.randint(1, 6)
+    end_minutes = start_hour * 60 + start_minute + half_hours * 30
+    return ['reserve', rng.choice(CUSTOMERS), rng.choice(RESOURCES), start_day.strftime('%m-%d-%Y'),
+            end_day.strftime('%m-%d-%Y'), f'{start_hour:02d}:{start_minute:02d}',
+            f'{end_minutes // 60:02d}:{end_minutes % 60:02d}', today.strftime('%m-%d-%Y')]
+
+
+def reference_request(reservation_manager, transactions_manager, request):
+    '''
+    Handle a request with the reference implementation, kept in memory
+    '''
+    module = reference_reserve
+    if request[0] == 'reserve':
+        reservation_info = [str(reservation_manager.new_id())] + request[1:]
+        new_reservation = module.Reservation(reservation_info)
+        if not module.handle_reservation(reservation_manager, new_reservation):
+            return None
+        reservation_manager.add_reservation(new_reservation)
+        transactions_manager.add_transaction([transactions_manager.new_id(), 'RESERVATION', request[7]] + reservation_info)
+        return module.reservation_detail(new_reservation)
+    for i, reservation in enumerate(reservation_manager.reservations):
+        if reservation.reservation_id == int(request[1]):
+            del reservation_manager.reservations[i]
+            return module.cancellation_detail(*transactions_manager.create_refund(reservation, request[2]))
+    module.handle_error(400, "Cancellation", f"Invalid reservation id: {request[1]}")
+
+
+def outcome(handle, *args):
+    '''
+    The response of a request, or the status and detail of its error
+    '''
+    try:
+        return handle(*args)
+    except HTTPException as error:
+        return error.status_code, error.detail
+
+
+class TestDifferential:
+    '''
+    Run random sequences of reservations and cancellations through the
+    reference implementation and the engine, which must make the same
+    decisions, with the same errors, costs and refunds
+    '''
+    @pytest.fixture(params=[TODAY, YEAR_END], ids=["mid_year", "year_end"])
+    def today(self, request):
+        return request.param
+
+    @pytest.fixture
+    def engine(self, tmp_path, monkeypatch, today):
+        monkeypatch.setattr(FrozenDate, "frozen", today)
+        monkeypatch.setattr(reserve, "date", FrozenDate)
+        monkeypatch.setattr(reserve, "default_facility", reserve.Facility("default", str(tmp_path)))
+        return reserve
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_random_sequence(self, engine, today, seed):
+        rng = random.Random(seed)
+        reservation_manager = reference_reserve.ReservationManager()
+        transactions_manager = reference_reserve.Transaction_Manager()
+        for _ in range(150):
+            request = random_request(rng, [reservation.reservation_id for reservation in reservation_manager.reservations], today)
+            expected = outcome(reference_request, reservation_manager, transactions_manager, request)
+            assert outcome(engine.handle_request, request) == expected, request
+
+        # The same reservations and transactions are recorded
+        reservations = sorted((reservation for shard in engine.facility().shards for reservation in shard.reservation_manager.reservations),
+                              key=lambda reservation: reservation.reservation_id)
+        assert [reservation.reservation_string for reservation in reservations] == \
+            [reservation.reservation_string for reservation in reservation_manager.reservations]
+        transactions = list(engine.recorded_transactions())
+        assert [transaction.reservation_string for transaction in transactions] == \
+            [transaction.reservation_string for transaction in transactions_manager.transactions]
@@ -0,0 +1,52 @@
+import asyncio
+import threading
+import events
+from tests import make_transaction
+
+
+async def next_events(stream, count):
+    return [await asyncio.wait_for(stream.__anext__(), 1) for _ in range(count)]
+
+
+class TestFeed:
+    '''
+    Test publishing changes from worker threads, and resuming from a sequence number
+    '''
+    def test_resume_from_history(self):
+        #Changes after the sequence number are sent from history, those no longer kept are replayed.
+        feed = events.Feed(history=2)
+        for transaction_id in [1, 2, 3]:
+            feed.publish(make_transaction(transaction_id))
+        async def subscribe(after):
+            subscriber, missed = feed.subscribe(after)
+            feed.unsubscribe(subscriber)
+            return missed
+        assert [event["seq"] for event in asyncio.run(subscribe(1))] == [2, 3]
+        assert asyncio.run(subscribe(0)) is None
+
+    def test_stream(self):
+        #Missed changes are replayed, then the ones published by other threads follow in order.
+        feed = events.Feed(history=1)
+        feed.publish(make_transaction(2))
+        async def run():
+            stream = feed.stream(0, lambda after: [make_transaction(1), make_transaction(2)])
+            received = await next_events(stream, 2)
+            thread = threading.Thread(target=feed.publish, args=(make_transaction(3, 'CANCELLATION$0'),))
+            thread.start()
+            received += await next_events(stream, 1)
+            thread.join()
+            await stream.aclose()
+            return received
+        received = asyncio.run(run())
+        assert [event.split("\n")[0] for event in received] == ["id: 1", "id: 2", "id: 3"]
+        assert received[2].split("\n")[1] == "event: cancel"
+        assert feed.subscribers == set()
+
+    def test_overflow(self):
+        #A client too far behind is woken up to be disconnected, and resumes from its last change.
+        async def run():
+            subscriber = events.Subscriber(asyncio.get_running_loop(), 2)
+            for seq in [1, 2, 3, 4]:
+                subscriber.deliver({"seq": seq})
+            return subscriber.overflowed, [subscriber.queue.get_nowait() for _ in range(subscriber.queue.qsize())]
+        assert asyncio.run(run()) == (True, [None])
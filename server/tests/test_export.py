@@ -0,0 +1,45 @@
+import orjson
+import export
+from tests import make_transaction
+
+
+def exported_ids(path):
+    return [orjson.loads(line)["transaction_id"] for line in path.read_bytes().splitlines()]
+
+
+class TestLedgerExport:
+    '''
+    Test appending the transactions to the export file, and syncing it with the ledgers
+    '''
+    def test_append_and_catch_up(self, tmp_path):
+        #The missing transactions are exported first, then the new ones are appended.
+        path = tmp_path / "ledger.ndjson"
+        ledger = [make_transaction(1), make_transaction(2)]
+        ledger_export = export.LedgerExport(str(path), lambda: ledger)
+        ledger_export.publish(ledger[1])
+        ledger.append(make_transaction(3))
+        ledger_export.publish(ledger[2])
+        assert exported_ids(path) == [1, 2, 3]
+        assert export.read_export(str(path)) == (3, export.ledger_checksum(ledger))
+
+    def test_rewritten_when_ahead_or_torn(self, tmp_path):
+        #A file exported from other data files, or ending with an incomplete line, is written again.
+        path = tmp_path / "ledger.ndjson"
+        path.write_bytes(b'{"transaction_id": 1}\n{"transaction_id": 2}\n{"transaction_id": 3}\n')
+        ledger = [make_transaction(1)]
+        export.LedgerExport(str(path), lambda: ledger).publish(ledger[0])
+        assert exported_ids(path) == [1]
+        path.write_bytes(path.read_bytes() + b'{"transaction_')
+        assert export.read_export(str(path))[0] is None
+        export.LedgerExport(str(path), lambda: ledger).publish(ledger[0])
+        assert exported_ids(path) == [1]
+
+    def test_rewritten_when_diverged(self, tmp_path):
+        #A file with the same ids as the ledgers but other transactions is written again.
+        path = tmp_path / "ledger.ndjson"
+        ledger = [make_transaction(1), make_transaction(2)]
+        export.LedgerExport(str(path), lambda: ledger).sync()
+        ledger = [make_transaction(1, resource='microvac'), make_transaction(2), make_transaction(3)]
+        export.LedgerExport(str(path), lambda: ledger).publish(ledger[2])
+        assert exported_ids(path) == [1, 2, 3]
+        assert orjson.loads(path.read_bytes().splitlines()[0])["resource"] == "microvac"
@@ -0,0 +1,62 @@
+import threading
+import pytest
+import idempotency
+
+
+class TestIdempotencyStore:
+    '''
+    Test replaying, expiring and evicting the results kept by idempotency key
+    '''
+    def test_replay(self):
+        #A retry with the same key gets the first result without calling the function again.
+        store = idempotency.IdempotencyStore()
+        calls = []
+        assert store.run("key", "request", lambda: calls.append(1) or "result") == ("result", False)
+        assert store.run("key", "request", lambda: calls.append(1) or "other") == ("result", True)
+        assert calls == [1]
+
+    def test_key_reused_for_different_request(self):
+        #A key cannot be used again for a different request.
+        store = idempotency.IdempotencyStore()
+        store.run("key", "request", lambda: "result")
+        with pytest.raises(idempotency.IdempotencyKeyReused):
+            store.run("key", "other request", lambda: "result")
+
+    def test_failure_not_kept(self):
+        #A failed request can be retried with the same key.
+        store = idempotency.IdempotencyStore()
+        def fail():
+            raise ValueError("failed")
+        with pytest.raises(ValueError):
+            store.run("key", "request", fail)
+        assert store.run("key", "request", lambda: "result") == ("result", False)
+
+    def test_expiry_and_eviction(self):
+        #Results expire after the ttl, and the oldest ones are evicted over max_keys.
+        now = [0]
+        store = idempotency.IdempotencyStore(ttl=10, max_keys=2, clock=lambda: now[0])
+        for key in ["a", "b", "c"]:
+            store.run(key, "request", lambda: key)
+        assert list(store.results) == ["b", "c"]
+        now[0] = 11
+        assert store.run("b", "request", lambda: "again") == ("again", False)
+        assert list(store.results) == ["b"]
+
+    def test_concurrent_retry_waits(self):
+        #A retry sent while the first request is being handled waits for its result.
+        store = idempotency.IdempotencyStore()
+        started, release = threading.Event(), threading.Event()
+        def slow():
+            started.set()
+            release.wait()
+            return "result"
+        results = []
+        first = threading.Thread(target=lambda: results.append(store.run("key", "request", slow)))
+        first.start()
+        started.wait()
+        second = threading.Thread(target=lambda: results.append(store.run("key", "request", lambda: "other")))
+        second.start()
+        release.set()
+        first.join()
+        second.join()
+        assert sorted(results) == [("result", False), ("result", True)]
@@ -0,0 +1,62 @@
+from datetime import date, timedelta
+import opening_hours
+
+MONDAY = date(2026, 5, 4)
+
+
+def fixed_hours_closed(start_time, end_time, day):
+    # The opening hours rule before the calendar
+    if day.weekday() == 6:
+        return True
+    if day.weekday() == 5 and (start_time < 100 or end_time > 160):
+        return True
+    return start_time < 90 or end_time > 180
+
+
+class TestCalendar:
+    '''
+    Test the opening hours masks and the closures file
+    '''
+    def test_weekly_hours(self):
+        #Every interval of every day of the week is open as with the fixed hours, empty ones have no slot to be closed in.
+        calendar = opening_hours.Calendar('missing.json')
+        for offset in range(7):
+            day = MONDAY + timedelta(days=offset)
+            for start in range(0, 240, 5):
+                for end in range(start + 5, 245, 5):
+                    assert calendar.is_open(start, end, day) != fixed_hours_closed(start, end, day)
+                assert calendar.is_open(start, start, day)
+
+    def test_closures(self, tmp_path):
+        #Closures override the days they are on, and are loaded again when the file changes.
+        path = tmp_path / "closures.json"
+        path.write_text('[{"date": "05-04-2026", "reason": "Holiday"}, {"date": "05-09-2026", "open": "12:00", "close": "14:00"}]')
+        calendar = opening_hours.Calendar(str(path))
+        calendar.refresh()
+        assert not calendar.is_open(100, 110, MONDAY)
+        assert calendar.is_open(100, 110, MONDAY + timedelta(days=1))
+        assert calendar.is_open(120, 140, MONDAY + timedelta(days=5))
+        assert not calendar.is_open(110, 130, MONDAY + timedelta(days=5))
+        path.write_text('[{"date": "05-05-2026"}]')
+        calendar.refresh()
+        assert calendar.is_open(100, 110, MONDAY)
+        assert not calendar.is_open(100, 110, MONDAY + timedelta(days=1))
+        path.unlink()
+        calendar.refresh()
+        assert calendar.closures == {}
+
+    def test_invalid_closures(self, tmp_path):
+        #A closures file that cannot be read keeps the last closures, until it is fixed.
+        path = tmp_path / "closures.json"
+        path.write_text('[{"date": "05-04-2026"}]')
+        calendar = opening_hours.Calendar(str(path))
+        calendar.refresh()
+        for invalid in ('[{"date": "05-05-2026"},]', '[{"date": "2026-05-05"}]', '[{"reason": "Holiday"}]', '[1]'):
+            path.write_text(invalid)
+            calendar.refresh()
+            assert not calendar.is_open(100, 110, MONDAY)
+            assert calendar.is_open(100, 110, MONDAY + timedelta(days=1))
+        path.write_text('[{"date": "05-05-2026", "reason": "Fixed"}]')
+        calendar.refresh()
+        assert calendar.is_open(100, 110, MONDAY)
+        assert not calendar.is_open(100, 110, MONDAY + timedelta(days=1))
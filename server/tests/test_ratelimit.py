@@ -0,0 +1,149 @@
+import asyncio
+import socket
+import threading
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+import batch
+import ratelimit
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_client(clients, customers, concurrency=None):
+    app = FastAPI()
+
+    @app.post("/v1_0/reservations")
+    def create_reservation():
+        return {"detail": "created"}
+
+    @app.get("/v1_0/reservations")
+    def get_reservations():
+        return {"detail": "report"}
+
+    app.add_middleware(ratelimit.AdmissionMiddleware, clients=clients, customers=customers,
+                       concurrency=concurrency or ratelimit.ConcurrencyLimit(0, 0, 0))
+    return TestClient(app)
+
+
+class TestRateLimiter:
+    '''
+    Test the token buckets
+    '''
+    def test_burst_and_refill(self):
+        #A key gets its burst at once, then tokens at the rate, keys do not share buckets.
+        clock = FakeClock()
+        limiter = ratelimit.RateLimiter(2, 3, clock=clock)
+        assert [limiter.acquire('hayder') for _ in range(4)] == [0, 0, 0, 0.5]
+        assert limiter.acquire('hayder2') == 0
+        clock.now = 0.5
+        assert limiter.acquire('hayder') == 0
+        assert limiter.acquire('hayder') == 0.5
+
+    def test_max_keys(self):
+        #Only the buckets of the keys seen most recently are kept.
+        limiter = ratelimit.RateLimiter(1, 1, max_keys=2, clock=FakeClock())
+        for key in ['a', 'b', 'a', 'c']:
+            limiter.acquire(key)
+        assert list(limiter.buckets) == ['a', 'c']
+
+
+class TestConcurrencyLimit:
+    '''
+    Test the concurrency cap and its queue
+    '''
+    def test_queue(self):
+        #Requests over the cap wait for a freed slot, are rejected when the queue is full or they wait too long.
+        async def run():
+            limit = ratelimit.ConcurrencyLimit(1, 1, 0.05)
+            assert await limit.acquire()
+            waiting = asyncio.ensure_future(limit.acquire())
+            await asyncio.sleep(0)
+            assert not await limit.acquire()
+            limit.release()
+            assert await waiting
+            assert limit.state() == {"active": 1, "waiting": 0}
+            assert not await limit.acquire()
+            limit.release()
+            return limit.state()
+        assert asyncio.run(run()) == {"active": 0, "waiting": 0}
+
+
+class TestAdmissionMiddleware:
+    '''
+    Test the rejections of the admission middleware
+    '''
+    def test_client_rate_limit(self):
+        #Requests of a client over its rate are rejected with 429 and Retry-After.
+        client = make_client(ratelimit.RateLimiter(1, 2, clock=FakeClock()), ratelimit.RateLimiter(0, 0))
+        assert [client.get("/v1_0/reservations").status_code for _ in range(3)] == [200, 200, 429]
+        response = client.get("/v1_0/reservations")
+        assert response.headers['retry-after'] == '1'
+        assert response.json() == {'detail': 'Request failed: Too many requests from this client'}
+
+    def test_customer_rate_limit(self):
+        #The customer is read from the JSON body, which still reaches the application.
+        client = make_client(ratelimit.RateLimiter(0, 0), ratelimit.RateLimiter(1, 1, clock=FakeClock()))
+        response = client.post("/v1_0/reservations", json = {"customer_id":"hayder"})
+        assert response.status_code == 200
+        response = client.post("/v1_0/reservations", json = {"customer_id":"hayder"})
+        assert response.status_code == 429
+        assert response.json() == {'detail': 'Request failed: Too many requests for customer hayder'}
+        assert client.post("/v1_0/reservations", json = {"customer_id":"hayder2"}).status_code == 200
+        assert client.get("/v1_0/reservations?customer_id=hayder").status_code == 429
+
+    def test_server_busy(self):
+        #Requests are rejected with 503 when no slot frees up.
+        concurrency = ratelimit.ConcurrencyLimit(1, 0, 0)
+        concurrency.active = 1
+        client = make_client(ratelimit.RateLimiter(0, 0), ratelimit.RateLimiter(0, 0), concurrency)
+        response = client.get("/v1_0/reservations")
+        assert response.status_code == 503
+        assert response.json() == {'detail': 'Request failed: Server busy'}
+
+
+class TestBatchThrottling:
+    '''
+    Test a batch pushed through the admission middleware by the batch client
+    '''
+    def test_batch_is_throttled(self):
+        #Rows over the bucket of their customer wait for Retry-After and are retried instead of failing with 429.
+        app = FastAPI()
+        created = []
+
+        @app.post("/v1_0/reservations")
+        async def create_reservation(request: Request):
+            body = await request.json()
+            created.append(body["customer_id"])
+            return {"detail": {"reservation_id": str(len(created)), "total_cost": 100, "down_payment": 25}}
+
+        app.add_middleware(ratelimit.AdmissionMiddleware, clients=ratelimit.RateLimiter(0, 0),
+                           customers=ratelimit.RateLimiter(2, 2),
+                           concurrency=ratelimit.ConcurrencyLimit(0, 0, 0))
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        server = uvicorn.Server(uvicorn.Config(app, log_level="warning"))
+        thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+        thread.start()
+        try:
+            while not server.started:
+                thread.join(0.01)
+            rows = [{"action": "reserve", "customer_id": "hayder", "resource": "workshop",
+                     "start_date": "05-02-2022", "end_date": None, "start_time": "11:00",
+                     "end_time": "11:30", "reservation_id": None} for _ in range(4)]
+            rejected = ratelimit.counters.snapshot().get("rejected_customer", 0)
+            results, _ = batch.run_batch(rows, "http://127.0.0.1:{}/v1_0/".format(sock.getsockname()[1]), workers=4)
+        finally:
+            server.should_exit = True
+            thread.join(5)
+            sock.close()
+
+        assert [(result["status_code"], result["ok"]) for result in results] == [(200, True)] * 4
+        assert created == ["hayder"] * 4
+        assert ratelimit.counters.snapshot().get("rejected_customer", 0) - rejected == 2
@@ -0,0 +1,232 @@
+from datetime import date, timedelta
+import io
+import orjson
+import reserve
+
+
+def make_reservation(reservation_id, customer_id, start_day, end_day):
+    return reserve.Reservation([str(reservation_id), customer_id, 'workshop',
+                                start_day.strftime('%m-%d-%Y'), end_day.strftime('%m-%d-%Y'),
+                                '11:00', '12:00', start_day.strftime('%m-%d-%Y')])
+
+
+class TestSeries:
+    '''
+    Test the days of recurring reservations restricted to a days pattern
+    '''
+    monday = reserve.week_start(date.today())
+
+    def test_parse_days(self):
+        #Patterns are named or listed, invalid ones are None.
+        assert reserve.parse_days('weekdays') == 0b0011111
+        assert reserve.parse_days('Mon,Wed,fri') == 0b0010101
+        assert reserve.parse_days('mon,someday') is None
+        assert reserve.format_days(0b0010101) == 'mon,wed,fri'
+        assert reserve.format_days(0b1111111) == 'daily'
+
+    def test_membership_and_week_counts(self):
+        #Days are tested without being listed, the days of every week are counted once.
+        series = reserve.Series(self.monday + timedelta(days=2), self.monday + timedelta(days=15), reserve.parse_days('mon,wed,sat'))
+        assert self.monday + timedelta(days=5) in series
+        assert self.monday + timedelta(days=6) not in series
+        assert self.monday not in series
+        assert list(series.week_counts.values()) == [2, 3, 1]
+        assert len(series) == 6
+        assert list(series.weeks())[:2] == [(reserve.week_key(self.monday), 2), (reserve.week_key(self.monday + timedelta(days=7)), 3)]
+        assert list(series) == [self.monday + timedelta(days=offset) for offset in [2, 5, 7, 9, 12, 14]]
+
+    def test_week_counts_across_years(self):
+        #The days of a week spanning two years are counted per year, as when counting the days one by one.
+        for pattern in ['daily', 'weekdays', 'weekends', 'mon,thu,sun', 'fri']:
+            series = reserve.Series(date(2026, 12, 20), date(2027, 1, 12), reserve.parse_days(pattern))
+            expanded = {}
+            for day in series:
+                expanded[reserve.week_key(day)] = expanded.get(reserve.week_key(day), 0) + 1
+            assert series.week_counts == expanded
+        assert reserve.Series(date(2026, 12, 28), date(2027, 1, 3)).week_counts == {(2026, 53): 4, (2027, 53): 3}
+
+    def test_reservation_record(self):
+        #The days pattern is the 11th field of a record, and is only partitioned and priced on its days.
+        manager = reserve.ReservationManager()
+        reservation = make_reservation(1, 'hayder', self.monday + timedelta(days=7), self.monday + timedelta(days=13))
+        reservation = reserve.Reservation(reservation.tolist()[:8], 'weekends')
+        assert reservation.total_cost == 2 * 99
+        assert reservation.tolist()[10] == 'weekends'
+        assert reserve.Reservation(reservation.reservation_string.split()).series.weekdays == 0b1100000
+        manager.add_reservation(reservation)
+        assert sorted(manager.by_day) == [self.monday + timedelta(days=12), self.monday + timedelta(days=13)]
+
+
+class TestWaitlist:
+    '''
+    Test the index of the waitlist, and saving it
+    '''
+    monday = reserve.week_start(date.today()) + timedelta(days=7)
+
+    def entry(self, waitlist_id, start_time, end_time):
+        return [str(waitlist_id), '-', 'hayder', 'extruder', self.monday.strftime('%m-%d-%Y'),
+                self.monday.strftime('%m-%d-%Y'), start_time, end_time, '1-1-2026', 'daily']
+
+    def test_waiting_for(self):
+        #A cancellation only finds the entries waiting for the slots it frees.
+        waitlist = reserve.Waitlist()
+        waitlist.add_entry(self.entry(1, '11:00', '12:00'))
+        waitlist.add_entry(self.entry(2, '14:00', '14:30'))
+        cancelled = make_reservation(1, 'hayder2', self.monday, self.monday)
+        assert waitlist.waiting_for(cancelled, self.monday) == set()
+        cancelled.reservation_type = 'microvac'
+        assert waitlist.waiting_for(cancelled, self.monday) == {1}
+        waitlist.promote(waitlist.entries[1], 7)
+        assert waitlist.waiting_for(cancelled, self.monday) == set()
+        assert waitlist.entries[1].report_data() == {'waitlist_id': '1', 'status': 'promoted', 'reservation_id': '7'}
+
+    def test_save_and_expire(self):
+        #Entries are saved with the next id, which is not reused once they expire.
+        waitlist = reserve.Waitlist()
+        waitlist.add_entry(self.entry(4, '11:00', '12:00'))
+        file = io.StringIO()
+        waitlist.save_to_file(file)
+        loaded = reserve.Waitlist()
+        loaded.load_from_file(io.StringIO(file.getvalue()))
+        assert loaded.entries[4].tolist() == self.entry(4, '11:00', '12:00')
+        loaded.expire(self.monday + timedelta(days=1))
+        assert loaded.entries == {} and loaded.index == {}
+        assert loaded.next_id == 5
+
+
+class TestReservationManagerPartitions:
+    '''
+    Test the partitioning of the reservations by day, and the expiry of past days
+    '''
+    monday = reserve.week_start(date.today())
+
+    def test_partitions(self):
+        #A recurring reservation is in the partition of each of its days, past weeks are not partitioned.
+        manager = reserve.ReservationManager()
+        old = make_reservation(1, 'hayder', self.monday - timedelta(days=10), self.monday - timedelta(days=8))
+        current = make_reservation(2, 'hayder', self.monday + timedelta(days=1), self.monday + timedelta(days=2))
+        manager.add_reservation(old)
+        manager.add_reservation(current)
+        assert manager.reservations == [old, current]
+        assert sorted(manager.by_day) == [self.monday + timedelta(days=1), self.monday + timedelta(days=2)]
+        assert list(manager.active_on(self.monday + timedelta(days=2))) == [current]
+        assert list(manager.active_on(self.monday)) == []
+
+    def test_remove_reservation(self):
+        #A cancelled reservation leaves its partitions.
+        manager = reserve.ReservationManager()
+        manager.add_reservation(make_reservation(1, 'hayder', self.monday, self.monday + timedelta(days=1)))
+        manager.add_reservation(make_reservation(2, 'hayder2', self.monday, self.monday))
+        removed = manager.remove_reservation(0)
+        assert removed.reservation_id == 1
+        assert [reservation.reservation_id for reservation in manager.active_on(self.monday)] == [2]
+        assert self.monday + timedelta(days=1) not in manager.by_day
+
+    def test_remove_reservations(self):
+        #Several reservations are removed from the list and their partitions at once.
+        manager = reserve.ReservationManager()
+        for reservation_id in [1, 2, 3]:
+            manager.add_reservation(make_reservation(reservation_id, 'hayder', self.monday, self.monday + timedelta(days=1)))
+        removed = manager.remove_reservations({1, 3})
+        assert [reservation.reservation_id for reservation in removed] == [1, 3]
+        assert [reservation.reservation_id for reservation in manager.reservations] == [2]
+        assert [reservation.reservation_id for reservation in manager.active_on(self.monday + timedelta(days=1))] == [2]
+
+    def test_customer_index(self):
+        #The reservations of every customer are indexed, and removed from the index with the reservation.
+        manager = reserve.ReservationManager()
+        for reservation_id, customer_id in [(1, 'hayder'), (2, 'hayder2'), (3, 'hayder')]:
+            manager.add_reservation(make_reservation(reservation_id, customer_id, self.monday, self.monday))
+        manager.remove_reservation(0)
+        manager.remove_reservations({2})
+        assert [reservation.reservation_id for reservation in manager.by_customer['hayder']] == [3]
+        assert 'hayder2' not in manager.by_customer
+
+    def test_expire(self):
+        #Partitions of the weeks before today are rolled out, the reservations are kept for reports.
+        manager = reserve.ReservationManager()
+        reservation = make_reservation(1, 'hayder', self.monday, self.monday + timedelta(days=8))
+        manager.add_reservation(reservation)
+        manager.expire(self.monday + timedelta(days=7))
+        assert manager.horizon == self.monday + timedelta(days=7)
+        assert sorted(manager.by_day) == [self.monday + timedelta(days=7), self.monday + timedelta(days=8)]
+        assert manager.reservations == [reservation]
+
+
+class TestShards:
+    '''
+    Test seeding, saving and reloading the data files of the shards
+    '''
+    seed = ("1 hayder extruder 04-30-2022 04-30-2022 11:00 11:30 4-30-2022 300.0 150.0\n"
+            "2 hayder2 workshop 04-30-2022 04-30-2022 12:00 12:30 4-30-2022 49.5 0\n"
+            "#\n"
+            "1 RESERVATION 4-30-2022 1 hayder extruder 04-30-2022 04-30-2022 11:00 11:30 4-30-2022 300.0 150.0\n"
+            "2 RESERVATION 4-30-2022 2 hayder2 workshop 04-30-2022 04-30-2022 12:00 12:30 4-30-2022 49.5 0\n")
+
+    def make_shard(self, tmp_path):
+        data_file = tmp_path / "data.txt"
+        data_file.write_text(self.seed)
+        shard = reserve.Shard("machines", reserve.SHARD_RESOURCES["machines"], str(tmp_path), str(data_file))
+        with shard.lock:
+            shard.load()
+        return shard
+
+    def test_seed(self, tmp_path):
+        #A missing shard data file is seeded with the records of its resources.
+        shard = self.make_shard(tmp_path)
+        assert [reservation.reservation_id for reservation in shard.reservation_manager.reservations] == [1]
+        assert [transaction.transaction_id for transaction in shard.transactions_manager.transactions] == [1]
+        assert (tmp_path / "machines.txt").read_text().split("\n")[1] == "#"
+
+    def test_reload_after_external_change(self, tmp_path):
+        #The state stays in memory until the data file is changed by something else.
+        shard = self.make_shard(tmp_path)
+        reservation_manager = shard.reservation_manager
+        with shard.lock:
+            shard.load()
+        assert shard.reservation_manager is reservation_manager
+        (tmp_path / "machines.txt").write_text("#\n")
+        with shard.lock:
+            shard.load()
+        assert shard.reservation_manager.reservations == []
+
+    def test_snapshot_every(self, tmp_path, monkeypatch):
+        #The snapshot is written every SNAPSHOT_EVERY saves or on demand, and removed by the next save.
+        monkeypatch.setattr(reserve, "SNAPSHOT_EVERY", 2)
+        shard = self.make_shard(tmp_path)
+        snapshot_file = tmp_path / "machines.snapshot"
+        assert not snapshot_file.exists()
+        with shard.lock:
+            shard.save()
+        assert snapshot_file.exists()
+        reloaded = self.make_shard(tmp_path)
+        assert reloaded.unsnapshotted == 0
+        assert [reservation.reservation_id for reservation in reloaded.reservation_manager.reservations] == [1]
+        with shard.lock:
+            shard.save()
+        assert not snapshot_file.exists()
+        with shard.lock:
+            shard.write_snapshot()
+        assert snapshot_file.exists()
+
+    def test_no_snapshot_after_external_change(self, tmp_path):
+        #A state that is no longer the content of the data file is not snapshotted.
+        shard = self.make_shard(tmp_path)
+        (tmp_path / "machines.txt").write_text("#\n")
+        with shard.lock:
+            shard.write_snapshot()
+        assert not (tmp_path / "machines.snapshot").exists()
+
+
+class TestReportRows:
+    '''
+    Test encoding the rows of the reports straight from the records
+    '''
+    def test_rows_match_report_data(self):
+        #The rows encode to the same JSON as the report entries, days patterns and refunds included.
+        reservation = reserve.Reservation('1 hayder workshop 04-30-2022 05-06-2022 11:00 11:30 4-30-2022 49.5 0 mon,wed'.split())
+        assert orjson.dumps(reservation.report_row()) == orjson.dumps(reservation.report_data())
+        for record in ['3 CANCELLATION$0 4-30-2022 1 hayder extruder 04-30-2022 04-30-2022 11:00 11:30 4-30-2022 300.0 150.0',
+                       '2 RESERVATION 4-30-2022 2 hayder2 hvc 04-30-2022 04-30-2022 12:00 12:30 4-30-2022 10000 5000.0']:
+            transaction = reserve.Transaction(record.split())
+            assert orjson.dumps(transaction.report_row()) == orjson.dumps(transaction.report_data())
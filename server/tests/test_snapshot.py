@@ -0,0 +1,44 @@
+import os
+import snapshot
+
+
+class TestSnapshot:
+    '''
+    Test writing, reading and invalidating snapshots of the parsed data file
+    '''
+    def write_files(self, tmp_path):
+        text_path = str(tmp_path / "data.txt")
+        snapshot_path = str(tmp_path / "data.snapshot")
+        with open(text_path, "w") as file:
+            file.write("#\n")
+        snapshot.write_snapshot(snapshot_path, text_path, {"reservations": [1, 2, 3]})
+        return text_path, snapshot_path
+
+    def test_read_snapshot(self, tmp_path):
+        #Valid snapshot of an unchanged data file.
+        text_path, snapshot_path = self.write_files(tmp_path)
+        assert snapshot.read_snapshot(snapshot_path, text_path) == {"reservations": [1, 2, 3]}
+
+    def test_read_snapshot_data_file_changed(self, tmp_path):
+        #Snapshot is ignored once the data file has been rewritten.
+        text_path, snapshot_path = self.write_files(tmp_path)
+        with open(text_path, "a") as file:
+            file.write("1 RESERVATION 4-30-2022 1 hayder extruder 04-30-2022 04-30-2022 11:00 11:30 4-30-2022 300.0 150.0\n")
+        assert snapshot.read_snapshot(snapshot_path, text_path) is None
+
+    def test_read_snapshot_corrupted(self, tmp_path):
+        #Snapshot is ignored if its checksum does not match.
+        text_path, snapshot_path = self.write_files(tmp_path)
+        with open(snapshot_path, "r+b") as file:
+            file.seek(-1, os.SEEK_END)
+            last = file.read(1)
+            file.seek(-1, os.SEEK_END)
+            file.write(bytes([last[0] ^ 0xFF]))
+        assert snapshot.read_snapshot(snapshot_path, text_path) is None
+
+    def test_read_snapshot_missing(self, tmp_path):
+        #No snapshot has been written yet.
+        text_path = str(tmp_path / "data.txt")
+        with open(text_path, "w") as file:
+            file.write("#\n")
+        assert snapshot.read_snapshot(str(tmp_path / "data.snapshot"), text_path) is None
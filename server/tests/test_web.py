@@ -1,4 +1,6 @@
 from fastapi.testclient import TestClient
+import pytest
+import reserve
 import web
 import datetime
 from datetime import timedelta
@@ -56,6 +58,32 @@ class TestGetTransactionsAll:
         assert response.json() == {'detail': 'Get Transactions failed: date format incorrect'}
 
 
+class TestGetTransactionsSummary:
+    '''
+    Test both valid and invalid cases for GET /transactions/summary/
+    '''
+    def test_get_transactions_summary(self):
+        #Valid GET transactions summary request.
+        response = client.get("/v1_0/transactions/summary?start_date=4-25-2022")
+        assert response.status_code == 200
+        assert response.json() == {'status_code': 200, \
+                                'detail': {'summary': [{'date': '04-30-2022', 'resource': 'extruder', 'revenue': 300.0, 'deposits': 150.0, 'refunds': 0.0}, \
+                                    {'date': '04-30-2022', 'resource': 'hvc', 'revenue': 10000.0, 'deposits': 5000.0, 'refunds': 0.0}], \
+                                    'totals': {'revenue': 10300.0, 'deposits': 5150.0, 'refunds': 0.0}}}
+
+    def test_get_transactions_summary_for_resource(self):
+        #Valid GET transactions summary request for a single resource.
+        response = client.get("/v1_0/transactions/summary?start_date=4-25-2022&resource=hvc")
+        assert response.status_code == 200
+        assert response.json()['detail']['totals'] == {'revenue': 10000.0, 'deposits': 5000.0, 'refunds': 0.0}
+
+    def test_get_transactions_summary_invalid_start_date(self):
+        #Invalid GET transactions summary request due to invalid start date.
+        response = client.get("/v1_0/transactions/summary?start_date=19-19-2022")
+        assert response.status_code == 400
+        assert response.json() == {'detail': 'Get Transactions Summary failed: date format incorrect'}
+
+
 class TestPostReservationsPasses:
     '''
     Test for passing/valid POST /reservations/ requests
@@ -104,6 +132,18 @@ class TestPostReservationsFails:
         assert response.status_code == 400
         assert response.json() == {'detail': "Reservation failed: Empty customer_id"}
 
+    def test_post_single_reservations_invalid_date_format(self):
+        #Invalid POST reservations request due to a start date not in mm-dd-yyyy format.
+        response = client.post("/v1_0/reservations",json = {"customer_id":"hayder","resource":"workshop","start_date":"13-01-2022","start_time":"11:00"})
+        assert response.status_code == 400
+        assert response.json() == {'detail': "Reservation failed: Invalid date format: 13-01-2022"}
+
+    def test_post_single_reservations_invalid_time_format(self):
+        #Invalid POST reservations request due to an end time not in HH:MM format.
+        response = client.post("/v1_0/reservations",json = {"customer_id":"hayder","resource":"workshop","start_date":self.dt_date,"start_time":"11:00","end_time":"1130"})
+        assert response.status_code == 400
+        assert response.json() == {'detail': "Reservation failed: Invalid time format: 1130"}
+
     def test_post_geq3_per_client_reservations(self):
         #Invalid POST reservations request due to >3 reservations/week by a particular client.
         #Set a end date that is dynamic and should never cause a failure.
@@ -206,6 +246,46 @@ class TestPostReservationsFails:
         assert response.json() == {'detail': f'Reservation failed: Cannot reserve time interval from 11:30 to 12:00 on {dt_date2}'} 
 
 
+class TestValidateReservations:
+    '''
+    Test POST /reservations/validate, which reports every broken rule at once
+    '''
+    if (datetime.datetime.now()+timedelta(days=3)).weekday()==6:
+        start_date=datetime.datetime.now()+timedelta(days=2)
+    else:
+        start_date=datetime.datetime.now()+timedelta(days=3)
+    dt_date=str(start_date.strftime("%m-%d-%Y"))
+
+    def test_validate_valid_reservation(self):
+        #Valid reservation, nothing is reserved by validating it.
+        response = client.post("/v1_0/reservations/validate",json = {"customer_id":"validator","resource":"workshop","start_date":self.dt_date,"start_time":"11:00"})
+        assert response.status_code == 200
+        assert response.json() == {'detail': {'valid': True, 'violations': [], 'alternatives': []}, 'status_code': 200}
+
+    def test_validate_all_violations(self):
+        #Reservation on a sunday and off the half hour, both rules are reported along with open alternatives.
+        if (datetime.datetime.now()).weekday()!=6:
+            start_date=datetime.datetime.now()+timedelta(days=(6-datetime.datetime.now().weekday()))
+        else:
+            start_date=datetime.datetime.now()
+        dt_date=str(start_date.strftime("%m-%d-%Y"))
+        response = client.post("/v1_0/reservations/validate",json = {"customer_id":"validator","resource":"microvac","start_date":dt_date,"start_time":"11:15"})
+        assert response.status_code == 200
+        detail = response.json()['detail']
+        assert detail['valid'] == False
+        assert [violation['rule'] for violation in detail['violations']] == ['half_hour', 'opening_hours']
+        assert len(detail['alternatives']) == 3
+        for alternative in detail['alternatives']:
+            assert datetime.datetime.strptime(alternative['start_date'], "%m-%d-%Y").weekday() != 6
+            assert alternative['start_time'][3:] in ('00', '30')
+
+    def test_validate_unknown_resource(self):
+        #Unknown resource, none of the other rules apply.
+        response = client.post("/v1_0/reservations/validate",json = {"customer_id":"validator","resource":"hammer","start_date":self.dt_date,"start_time":"11:00"})
+        assert response.status_code == 200
+        assert response.json() == {'detail': {'valid': False, 'violations': [{'rule': 'resource', 'detail': 'Reservation failed: Unsupported resource: hammer'}], 'alternatives': []}, 'status_code': 200}
+
+
 class TestDeleteReservations:
     '''
     Test for both valid and invalid DELETE /reservations/ requests
@@ -222,3 +302,348 @@ class TestDeleteReservations:
         assert response.status_code == 400
         assert response.json() == {'detail': 'Cancellation failed: Invalid reservation id: 100'}
 
+
+
+class TestMetrics:
+    '''
+    Test the request ids and GET /metrics
+    '''
+    def test_request_id(self):
+        #The request id given by the client is returned with the response, one is generated otherwise.
+        response = client.get("/v1_0/metrics", headers = {"X-Request-ID":"test-request"})
+        assert response.headers["x-request-id"] == "test-request"
+        response = client.get("/v1_0/metrics")
+        assert len(response.headers["x-request-id"]) > 0
+
+    def test_rejection_counters(self):
+        #Rejected reservations are counted per rule.
+        before = client.get("/v1_0/metrics").json()['detail']['rejections'].get('resource', 0)
+        client.post("/v1_0/reservations",json = {"customer_id":"hayder","resource":"hammer","start_date":"10-10-2030","start_time":"11:00"})
+        response = client.get("/v1_0/metrics")
+        assert response.status_code == 200
+        assert response.json()['detail']['rejections']['resource'] == before + 1
+
+
+class TestIdempotencyKeys:
+    '''
+    Test POST /reservations/ retried with an Idempotency-Key header
+    '''
+    if (datetime.datetime.now()+timedelta(days=3)).weekday()==6:
+        start_date=datetime.datetime.now()+timedelta(days=2)
+    else:
+        start_date=datetime.datetime.now()+timedelta(days=3)
+    dt_date=str(start_date.strftime("%m-%d-%Y"))
+
+    def test_post_reservations_retried(self):
+        #The retry gets the response of the first request, no second reservation is made.
+        body = {"customer_id":"idempotent","resource":"workshop","start_date":self.dt_date,"start_time":"13:00"}
+        first = client.post("/v1_0/reservations",json = body, headers = {"Idempotency-Key":"test-retry"})
+        retry = client.post("/v1_0/reservations",json = body, headers = {"Idempotency-Key":"test-retry"})
+        assert first.status_code == 201
+        assert retry.status_code == 201
+        assert retry.json() == first.json()
+        assert retry.headers["idempotent-replayed"] == "true"
+        reservations = client.get(f"/v1_0/reservations?start_date={self.dt_date}&customer_id=idempotent").json()
+        assert len(reservations['detail']['reservations']) == 1
+
+    def test_post_reservations_key_reused(self):
+        #The same key cannot be used for a different reservation.
+        body = {"customer_id":"idempotent","resource":"workshop","start_date":self.dt_date,"start_time":"14:00"}
+        client.post("/v1_0/reservations",json = body, headers = {"Idempotency-Key":"test-reused"})
+        body["start_time"] = "15:00"
+        response = client.post("/v1_0/reservations",json = body, headers = {"Idempotency-Key":"test-reused"})
+        assert response.status_code == 422
+        assert response.json() == {'detail': 'Reservation failed: Idempotency-Key already used for a different request'}
+
+
+class TestDeleteReservationsBatch:
+    '''
+    Test for both valid and invalid DELETE /reservations/batch requests
+    '''
+    if (datetime.datetime.now()+timedelta(days=3)).weekday()==6:
+        start_date=datetime.datetime.now()+timedelta(days=2)
+    else:
+        start_date=datetime.datetime.now()+timedelta(days=3)
+    dt_date=str(start_date.strftime("%m-%d-%Y"))
+
+    def reserve(self, customer_id, start_time):
+        response = client.post("/v1_0/reservations",json = {"customer_id":customer_id,"resource":"workshop","start_date":self.dt_date,"start_time":start_time})
+        assert response.status_code == 201
+        return response.json()['detail']['reservation_id']
+
+    def test_delete_reservations_batch_ids(self):
+        #Valid batch cancellation of a list of reservations.
+        first = self.reserve("batch1", "09:00")
+        second = self.reserve("batch1", "09:30")
+        response = client.request("DELETE", "/v1_0/reservations/batch", json = {"reservation_ids":[second, first]})
+        assert response.status_code == 200
+        assert response.json() == {'status_code': 200, 'detail': {'cancellations': [
+            {'reservation_id': first, 'percent_returned': '50', 'refund': '0.0'},
+            {'reservation_id': second, 'percent_returned': '50', 'refund': '0.0'}], 'total_refund': '0.0'}}
+
+    def test_delete_reservations_batch_invalid_id(self):
+        #Invalid batch cancellation, nothing is cancelled if one of the ids is invalid.
+        reservation_id = self.reserve("batch2", "10:00")
+        response = client.request("DELETE", "/v1_0/reservations/batch", json = {"reservation_ids":[reservation_id, "100000"]})
+        assert response.status_code == 400
+        assert response.json() == {'detail': 'Cancellation failed: Invalid reservation id: 100000'}
+        reservations = client.get(f"/v1_0/reservations?start_date={self.dt_date}&customer_id=batch2").json()
+        assert len(reservations['detail']['reservations']) == 1
+
+    def test_delete_reservations_batch_customer(self):
+        #Valid cancellation of all the reservations of a customer.
+        self.reserve("batch3", "10:30")
+        self.reserve("batch3", "11:00")
+        response = client.request("DELETE", "/v1_0/reservations/batch", json = {"customer_id":"batch3"})
+        assert response.status_code == 200
+        assert len(response.json()['detail']['cancellations']) == 2
+        reservations = client.get(f"/v1_0/reservations?start_date={self.dt_date}&customer_id=batch3").json()
+        assert reservations['detail']['reservations'] == []
+
+    def test_delete_reservations_batch_no_selector(self):
+        #Invalid batch cancellation without reservation ids or customer.
+        response = client.request("DELETE", "/v1_0/reservations/batch", json = {})
+        assert response.status_code == 400
+        assert response.json() == {'detail': 'Cancellation failed: either reservation_ids or customer_id must be given'}
+
+
+class TestPostReservationsDays:
+    '''
+    Test for recurring POST /reservations/ requests restricted to a days pattern
+    '''
+    #The next monday, and the friday of the week after.
+    start_date=datetime.datetime.now()+timedelta(days=7-datetime.datetime.now().weekday())
+    dt_date=str(start_date.strftime("%m-%d-%Y"))
+    e_date=str((start_date+timedelta(days=11)).strftime("%m-%d-%Y"))
+
+    def test_post_reservations_days(self):
+        #Valid recurring reservation on two days a week, only those days are reserved and paid for.
+        response = client.post("/v1_0/reservations",json = {"customer_id":"series1","resource":"workshop","start_date":self.dt_date,"end_date":self.e_date,"start_time":"11:00","days":"Mon,Wed"})
+        assert response.status_code == 201
+        assert response.json()['detail']['total_cost'] == '198.0'
+        reservations = client.get(f"/v1_0/reservations?start_date={self.dt_date}&customer_id=series1").json()
+        assert reservations['detail']['reservations'][0]['days'] == 'mon,wed'
+
+    def test_post_reservations_days_over_three(self):
+        #Invalid recurring reservation on every weekday, more than 3 days in a week.
+        response = client.post("/v1_0/reservations",json = {"customer_id":"series2","resource":"workshop","start_date":self.dt_date,"end_date":self.e_date,"start_time":"11:00","days":"weekdays"})
+        assert response.status_code == 400
+        assert response.json() == {'detail': 'Reservation failed: A client can only make reservations for 3 different days in a given week'}
+
+    def test_post_reservations_invalid_days(self):
+        #Invalid days pattern.
+        response = client.post("/v1_0/reservations",json = {"customer_id":"series3","resource":"workshop","start_date":self.dt_date,"start_time":"11:00","days":"mon,someday"})
+        assert response.status_code == 400
+        assert response.json() == {'detail': 'Reservation failed: Invalid days pattern: mon,someday'}
+
+
+class TestWaitlist:
+    '''
+    Test for waitlisted POST /reservations/ requests and GET /waitlist/{waitlist_id}
+    '''
+    #The wednesday of the week after next.
+    start_date=datetime.datetime.now()+timedelta(days=9-datetime.datetime.now().weekday())
+    dt_date=str(start_date.strftime("%m-%d-%Y"))
+
+    def test_waitlist_promoted_on_cancellation(self):
+        #A request for a fully booked harvester waits, and gets the reservation once it is cancelled.
+        response = client.post("/v1_0/reservations",json = {"customer_id":"waitlist1","resource":"harvester","start_date":self.dt_date,"start_time":"15:00"})
+        reservation_id = response.json()['detail']['reservation_id']
+        response = client.post("/v1_0/reservations",json = {"customer_id":"waitlist2","resource":"harvester","start_date":self.dt_date,"start_time":"15:00","waitlist":True})
+        assert response.status_code == 202
+        waitlist_id = response.json()['detail']['waitlist_id']
+        assert response.json()['detail']['status'] == 'waiting'
+        client.request("DELETE", "/v1_0/reservations", json = {"reservation_id":reservation_id})
+        response = client.get(f"/v1_0/waitlist/{waitlist_id}")
+        assert response.status_code == 200
+        assert response.json()['detail']['status'] == 'promoted'
+        reservations = client.get(f"/v1_0/reservations?start_date={self.dt_date}&customer_id=waitlist2").json()
+        assert reservations['detail']['reservations'][0]['reservation_id'] == int(response.json()['detail']['reservation_id'])
+
+    def test_waitlist_other_rules_rejected(self):
+        #Only requests rejected for lack of capacity are waitlisted.
+        response = client.post("/v1_0/reservations",json = {"customer_id":"waitlist3","resource":"workshop","start_date":self.dt_date,"start_time":"20:00","waitlist":True})
+        assert response.status_code == 400
+
+    def test_waitlist_unknown_id(self):
+        #Unknown waitlist id.
+        response = client.get("/v1_0/waitlist/100000")
+        assert response.status_code == 404
+        assert response.json() == {'detail': 'Waitlist failed: Unknown waitlist id: 100000'}
+
+
+class TestGetEvents:
+    '''
+    Test for invalid GET /events requests (the feed itself is tested in test_events.py)
+    '''
+    def test_get_events_invalid_sequence_number(self):
+        #Invalid sequence number to resume from.
+        response = client.get("/v1_0/events?after=-1")
+        assert response.status_code == 400
+        assert response.json() == {'detail': 'Get Events failed: Invalid sequence number: -1'}
+
+
+class TestGetTransactionsChanges:
+    '''
+    Test for GET /transactions/changes requests
+    '''
+    def test_get_changes_pages(self):
+        #Changes are returned in order of sequence number, last_seq is where the next page starts.
+        first = client.get("/v1_0/transactions/changes?limit=2").json()['detail']
+        assert [change['transaction_id'] for change in first['changes']] == [1, 2]
+        assert first['last_seq'] == 2
+        second = client.get(f"/v1_0/transactions/changes?after={first['last_seq']}&limit=1").json()['detail']
+        assert [change['transaction_id'] for change in second['changes']] == [3]
+
+    def test_get_changes_none_after(self):
+        #No changes after the latest sequence number.
+        response = client.get("/v1_0/transactions/changes?after=100000")
+        assert response.json() == {'status_code': 200, 'detail': {'changes': [], 'last_seq': 100000}}
+
+    def test_get_changes_invalid_limit(self):
+        #Invalid limit.
+        response = client.get("/v1_0/transactions/changes?limit=0")
+        assert response.status_code == 400
+        assert response.json() == {'detail': 'Get Transactions Changes failed: Invalid limit: 0'}
+
+
+class TestGetQuote:
+    '''
+    Test for GET /quote/, pricing a reservation without making it
+    '''
+    #Three weeks from now, early enough for the discount.
+    dt_date=str((datetime.datetime.now()+timedelta(days=21)).strftime("%m-%d-%Y"))
+
+    def test_get_quote(self):
+        #Valid quote, priced as the reservation would be but nothing is recorded.
+        changes = client.get("/v1_0/transactions/changes").json()['detail']['last_seq']
+        response = client.get(f"/v1_0/quote?customer_id=quote1&resource=microvac&start_date={self.dt_date}&start_time=11:00&end_time=12:00")
+        assert response.status_code == 200
+        assert response.json()['detail'] == {'discount': '25', 'total_cost': '750.0', 'down_payment': '375.0', 'available': True, 'violations': []}
+        assert client.get("/v1_0/transactions/changes").json()['detail']['last_seq'] == changes
+
+    def test_get_quote_unavailable(self):
+        #Quote of a fully booked harvester, priced but not available.
+        client.post("/v1_0/reservations",json = {"customer_id":"quote2","resource":"harvester","start_date":self.dt_date,"start_time":"16:00"})
+        response = client.get(f"/v1_0/quote?customer_id=quote3&resource=harvester&start_date={self.dt_date}&start_time=16:00")
+        assert response.status_code == 200
+        assert response.json()['detail']['total_cost'] == '3300.0'
+        assert response.json()['detail']['available'] is False
+        assert [violation['rule'] for violation in response.json()['detail']['violations']] == ['capacity']
+
+    def test_get_quote_invalid_days(self):
+        #Invalid quote due to invalid days pattern.
+        response = client.get(f"/v1_0/quote?customer_id=quote4&resource=workshop&start_date={self.dt_date}&start_time=11:00&days=someday")
+        assert response.status_code == 400
+        assert response.json() == {'detail': 'Reservation failed: Invalid days pattern: someday'}
+
+
+class TestGetCustomerHistory:
+    '''
+    Test both valid and invalid cases for GET /customers/{customer_id}/history
+    '''
+    dt_date=str((datetime.datetime.now()+timedelta(days=2)).strftime("%m-%d-%Y"))
+
+    def test_get_customer_history(self):
+        #Reservations made and cancelled are listed in order, a page at a time.
+        first = client.post("/v1_0/reservations",json = {"customer_id":"history1","resource":"workshop","start_date":self.dt_date,"start_time":"11:00"}).json()['detail']['reservation_id']
+        second = client.post("/v1_0/reservations",json = {"customer_id":"history1","resource":"workshop","start_date":self.dt_date,"start_time":"13:00"}).json()['detail']['reservation_id']
+        client.request("DELETE", "/v1_0/reservations", json = {"reservation_id":first})
+        response = client.get("/v1_0/customers/history1/history?limit=2")
+        assert response.status_code == 200
+        history = response.json()['detail']['history']
+        assert [(entry['transaction_type'], entry['reservation_id'], entry['booked']) for entry in history] == [('RESERVATION', int(first), False), ('RESERVATION', int(second), True)]
+        assert history[1]['reservation']['start_time'] == '13:00'
+        last_seq = response.json()['detail']['last_seq']
+        response = client.get(f"/v1_0/customers/history1/history?after={last_seq}")
+        assert [(entry['transaction_type'], entry['reservation_id']) for entry in response.json()['detail']['history']] == [('CANCELLATION', int(first))]
+
+    def test_get_customer_history_rebooked(self):
+        #A cancelled reservation whose id is given to a new reservation is not booked.
+        first = client.post("/v1_0/reservations",json = {"customer_id":"history3","resource":"workshop","start_date":self.dt_date,"start_time":"15:00"}).json()['detail']['reservation_id']
+        client.request("DELETE", "/v1_0/reservations", json = {"reservation_id":first})
+        second = client.post("/v1_0/reservations",json = {"customer_id":"history3","resource":"workshop","start_date":self.dt_date,"start_time":"16:00"}).json()['detail']['reservation_id']
+        assert second == first
+        response = client.get("/v1_0/customers/history3/history")
+        history = response.json()['detail']['history']
+        assert [(entry['transaction_type'], entry['reservation']['start_time'], entry['booked']) for entry in history] == [('RESERVATION', '15:00', False), ('CANCELLATION', '15:00', False), ('RESERVATION', '16:00', True)]
+
+    def test_get_customer_history_unknown_customer(self):
+        #A customer without reservations has an empty history.
+        response = client.get("/v1_0/customers/history2/history?after=5")
+        assert response.status_code == 200
+        assert response.json()['detail'] == {'customer_id': 'history2', 'history': [], 'last_seq': 5}
+
+    def test_get_customer_history_invalid_limit(self):
+        #Invalid GET customer history request due to invalid limit.
+        response = client.get("/v1_0/customers/history1/history?limit=0")
+        assert response.status_code == 400
+        assert response.json() == {'detail': 'Get Customer History failed: Invalid limit: 0'}
+
+
+class TestGetUtilization:
+    '''
+    Test both valid and invalid cases for GET /analytics/utilization/
+    '''
+    def test_get_utilization(self):
+        #Valid GET utilization request, the reservations of the seed data are counted.
+        response = client.get("/v1_0/analytics/utilization?start_date=04-25-2022&end_date=05-08-2022&resource=hvc")
+        assert response.status_code == 200
+        hvc = response.json()['detail']['resources']['hvc']
+        assert hvc['capacity'] == 1
+        assert hvc['max_reserved'] == {'count': 1, 'date': '04-30-2022', 'time': '12:00'}
+        assert list(response.json()['detail']['resources']) == ['hvc']
+
+    def test_get_utilization_invalid_range(self):
+        #Invalid GET utilization request due to an end date before the start date.
+        response = client.get("/v1_0/analytics/utilization?start_date=05-08-2022&end_date=04-25-2022")
+        assert response.status_code == 400
+        assert response.json() == {'detail': 'Get Utilization failed: Invalid date range'}
+
+
+class TestFacilities:
+    '''
+    Test routing requests to the facility named by the X-Facility-Id header
+    '''
+    dt_date=str((datetime.datetime.now()+timedelta(days=2)).strftime("%m-%d-%Y"))
+
+    @pytest.fixture
+    def site(self, tmp_path, monkeypatch):
+        (tmp_path / "north").mkdir()
+        monkeypatch.setattr(reserve, "FACILITIES_DIRECTORY", str(tmp_path))
+        monkeypatch.setattr(reserve, "facilities", {})
+        return tmp_path / "north"
+
+    def test_facility_partition(self, site):
+        #A facility has its own reservations, ids and data files.
+        response = client.post("/v1_0/reservations",json = {"customer_id":"north1","resource":"hvc","start_date":self.dt_date,"start_time":"11:00"},headers = {"X-Facility-Id":"north"})
+        assert response.status_code == 201
+        assert response.json()['detail']['reservation_id'] == '1'
+        assert (site / "machines.txt").exists()
+        response = client.get("/v1_0/reservations?customer_id=north1",headers = {"X-Facility-Id":"north"})
+        assert [reservation['resource'] for reservation in response.json()['detail']['reservations']] == ['hvc']
+        response = client.get("/v1_0/reservations?customer_id=north1")
+        assert response.json()['detail']['reservations'] == []
+
+    def test_quote_read_only(self, site):
+        #A quote on a facility whose data files do not exist yet reads the seed file without writing any file.
+        (site / "data.txt").write_text(f"1 north1 hvc {self.dt_date} {self.dt_date} 11:00 11:30 {self.dt_date} 10000 5000.0\n#\n")
+        response = client.get(f"/v1_0/quote?customer_id=north2&resource=hvc&start_date={self.dt_date}&start_time=11:00",headers = {"X-Facility-Id":"north"})
+        assert response.status_code == 200
+        assert response.json()['detail']['available'] is False
+        assert sorted(path.name for path in site.iterdir()) == ["data.txt"]
+        response = client.post("/v1_0/reservations",json = {"customer_id":"north2","resource":"workshop","start_date":self.dt_date,"start_time":"11:00"},headers = {"X-Facility-Id":"north"})
+        assert response.json()['detail']['reservation_id'] == '2'
+        assert (site / "machines.txt").exists()
+
+    def test_unknown_facility(self, site):
+        #Invalid request due to a facility without a data directory.
+        response = client.get("/v1_0/reservations",headers = {"X-Facility-Id":"south"})
+        assert response.status_code == 404
+        assert response.json() == {'detail': 'Request failed: Unknown facility: south'}
+
+    def test_invalid_facility_id(self, site):
+        #Invalid request due to a facility id that is not a directory name.
+        response = client.get("/v1_0/reservations",headers = {"X-Facility-Id":"../data"})
+        assert response.status_code == 400
+        assert response.json() == {'detail': 'Request failed: Invalid facility id: ../data'}
@@ -6,17 +6,52 @@
 #
 # Date: April 30, 2022
 
-from typing import Optional
-from fastapi import Depends, FastAPI
+from typing import List, Optional
+from fastapi import Depends, FastAPI, Header
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from fastapi_versioning import VersionedFastAPI, version
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 from datetime import datetime, timedelta
+import os
+import orjson
+import analytics
+import events
+import export
+import facilities
+import idempotency
+import logconfig
+import ratelimit
 import reserve
 
+logconfig.setup_logging()
+reserve.transaction_listeners.append(events.feed.publish)
 
-class ReservationRequest(BaseModel):
+# Newline delimited JSON file of the ledger for local consumers, see export.py,
+# set LEDGER_EXPORT to another path, or to nothing to turn it off
+LEDGER_EXPORT = os.environ.get('LEDGER_EXPORT', 'data/ledger.ndjson')
+if LEDGER_EXPORT:
+    reserve.transaction_listeners.append(export.LedgerExport(LEDGER_EXPORT, reserve.recorded_transactions).publish)
+
+
+def facility_feed(facility):
     """
-    A class used to parse submitted data for the "create reservation" API
+    Make the feed of changes of a facility other than the default one
+    """
+    feed = events.Feed(history=events.feed.history.maxlen, max_pending=events.feed.max_pending)
+    facility.transaction_listeners.append(feed.publish)
+    return feed
+
+# Feeds of changes and utilization analytics of every facility (see
+# facilities.py), the ledger export is only kept for the default one
+feeds = facilities.PerFacility(events.feed, facility_feed)
+utilization = facilities.PerFacility(analytics.utilization, lambda facility: analytics.Utilization())
+
+
+class QuoteRequest(BaseModel):
+    """
+    A class used to parse submitted data for the "quote" API, a prospective
+    reservation
 
     Attributes:
         customer_id (str): Id of the customer who wants to create a reservation
@@ -25,6 +60,7 @@ class ReservationRequest(BaseModel):
         end_date (str): Optional, the ending date of the reservation
         start_time (str): The starting time of the reservation 
         end_time (str): Optional, the ending time of the reservation
+        days (str): Optional, the days of the week of a recurring reservation
     """
     customer_id: str
     resource: str
@@ -32,6 +68,50 @@ class ReservationRequest(BaseModel):
     end_date: Optional[str] = None
     start_time: str
     end_time: Optional[str] = None
+    days: Optional[str] = None
+
+    @model_validator(mode='after')
+    def check_formats(self):
+        """
+        Check the formats of the submitted data once, while the request is parsed,
+        and fill in the defaults of end_date and end_time
+
+        raise:
+            HTTPException Error: Invalid time format
+            HTTPException Error: Invalid date format
+            HTTPException Error: Empty customer_id
+            HTTPException Error: Invalid days pattern
+        """
+        if self.customer_id == "":
+            reserve.handle_error(400, "Reservation", "Empty customer_id")
+        check_time_format(self.start_time)
+        check_time_format(self.end_time)
+        check_date_format(self.start_date)
+        check_date_format(self.end_date)
+        if not self.end_date:
+            self.end_date = self.start_date
+        if not self.end_time:
+            self.end_time = time_after_30min(self.start_time)
+        self.days = days_pattern(self.days)
+        return self
+
+
+class ReservationRequest(QuoteRequest):
+    """
+    A class used to parse submitted data for the "create reservation" API
+
+    Attributes:
+        customer_id (str): Id of the customer who wants to create a reservation
+        resource (str): Resource the customer wants to reserve
+        start_date (str): The starting date of the reservation 
+        end_date (str): Optional, the ending date of the reservation
+        start_time (str): The starting time of the reservation 
+        end_time (str): Optional, the ending time of the reservation
+        days (str): Optional, the days of the week of a recurring reservation
+        waitlist (bool): Optional, whether to wait for capacity to free up
+            rather than being rejected when the resource is fully booked
+    """
+    waitlist: bool = False
 
 
 class CancellationRequest(BaseModel):
@@ -44,6 +124,25 @@ class CancellationRequest(BaseModel):
     reservation_id: str
 
 
+class BatchCancellationRequest(BaseModel):
+    """
+    A class used to parse submitted data for the "cancel reservations" API,
+    either reservation_ids or customer_id must be given
+
+    Attributes:
+        reservation_ids (List[str]): Optional, ids of the reservations to cancel
+        customer_id (str): Optional, the customer whose reservations to cancel
+        start_date (str): Optional, the first start date of the customer's
+            reservations to cancel
+        end_date (str): Optional, the last start date of the customer's
+            reservations to cancel
+    """
+    reservation_ids: Optional[List[str]] = None
+    customer_id: Optional[str] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+
+
 class GetTransactionRequest(BaseModel):
     """
     A class GET request to the Transactions API endpoint
@@ -57,6 +156,62 @@ class GetTransactionRequest(BaseModel):
     end_date: Optional[str] = None
 
 
+class GetSummaryRequest(BaseModel):
+    """
+    A class GET request to the Transactions Summary API endpoint
+
+    All Attributes are Optional, all dates are in mm-dd-yyyy format
+    Attributes:
+        start_date (str): The starting date of the summary 
+        end_date (str): The ending date of the summary
+        resource (str): The resource to summarize
+    """
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    resource: Optional[str] = None
+
+
+class GetChangesRequest(BaseModel):
+    """
+    A class GET request to the Transactions Changes API endpoint
+
+    All Attributes are Optional
+    Attributes:
+        after (str): The sequence number (transaction id) to start after
+        limit (str): The maximum number of changes to return
+    """
+    after: Optional[str] = None
+    limit: Optional[str] = None
+
+
+class GetHistoryRequest(BaseModel):
+    """
+    A class GET request to the Customer History API endpoint
+
+    All Attributes are Optional
+    Attributes:
+        after (str): The sequence number (transaction id) to start after
+        limit (str): The maximum number of history entries to return
+    """
+    after: Optional[str] = None
+    limit: Optional[str] = None
+
+
+class GetUtilizationRequest(BaseModel):
+    """
+    A class GET request to the Utilization Analytics API endpoint
+
+    All Attributes are Optional, all dates are in mm-dd-yyyy format
+    Attributes:
+        start_date (str): The first day of the report
+        end_date (str): The last day of the report
+        resource (str): The resource to report on
+    """
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    resource: Optional[str] = None
+
+
 class GetReservationsRequest(BaseModel):
     """
     A class GET request to the Reservations API endpoint
@@ -72,17 +227,39 @@ class GetReservationsRequest(BaseModel):
     customer_id: Optional[str] = None
 
 
+class ReportResponse(Response):
+    """
+    A JSON response used by the report endpoints
+
+    The content is encoded with orjson, report rows (Reservation and
+    Transaction objects) are serialized directly from the attributes of the
+    record objects, through slotted dataclasses (see Reservation.report_row),
+    instead of going through dicts and FastAPI's jsonable_encoder
+    """
+    media_type = "application/json"
+
+    def render(self, content):
+        return orjson.dumps(content, default=encode_record)
+
+
 app = FastAPI()
 
 base_url = "vg01"
 
 @app.post("/reservations", status_code = 201)
 @version(1, 0)
-def create_reservation(request: ReservationRequest):
+def create_reservation(request: ReservationRequest, response: Response, idempotency_key: Optional[str] = Header(default = None)):
     """
     Create a (recurring) reservation. A recurring resrvation will
     be created if start_date is prior to end_date
 
+    A request retried with the same Idempotency-Key header gets the response
+    of the first one, without creating the reservation again
+
+    With waitlist set, a reservation rejected only because the resource is
+    fully booked is queued instead (status 202), and made as soon as a
+    cancellation frees the capacity it needs, see GET /waitlist/{waitlist_id}
+
     - **customer_id**: Id of the customer who wants to create a reservation
     - **resource**: Resource the customer wants to reserve
     - **start_date**: The starting date of the reservation 
@@ -91,6 +268,11 @@ def create_reservation(request: ReservationRequest):
     - **start_time**: The starting time of the reservation 
     - **end_time**: Optional, the ending time of the reservation 
         (default: start_time + 30min)
+    - **days**: Optional, the days of the week a recurring reservation takes
+        place on: daily, weekdays, weekends or a list such as mon,wed,fri
+        (default: daily)
+    - **waitlist**: Optional, whether to wait for a fully booked resource
+        (default: false)
 
     Returns:
     
@@ -108,20 +290,97 @@ def create_reservation(request: ReservationRequest):
     		}
 	    }
 
+        On waitlist:
+        {   'status_code': '202', 
+		    'detail':{
+        		    'waitlist_id': '3',
+        		    'status': 'waiting'
+    		}
+	    }
+
         On error:
         {
             'detail': 'error message'
         }
     """
-    return handle_request(reserve_args(request), 201)
+    command = "waitlist" if request.waitlist else "reserve"
+    result = idempotent_request(idempotency_key, "Reservation", request, response,
+                                lambda: reservation_response(reserve_args(request, command)))
+    response.status_code = result["status_code"]
+    return result
+
+
+@app.post("/reservations/validate", status_code = 200)
+@version(1, 0)
+def validate_reservation(request: ReservationRequest):
+    """
+    Check a (recurring) reservation against every reservation rule without
+    making it. All the rules it breaks are reported at once, along with the
+    nearest reservations (same resource and length) that could be made instead
+
+    Takes the same fields as POST /reservations
+
+    Returns:
+    
+        dict object
+
+    Example returns:
+
+        {   'status_code': '200', 
+            'detail':{
+                'valid': False,
+                'violations': [
+                    {'rule': 'opening_hours', 'detail': 'Reservation failed: Cannot reserve ...'},
+                    {'rule': 'three_days_per_week', 'detail': 'Reservation failed: A client ...'}
+                ],
+                'alternatives': [
+                    {'start_date': '05-02-2022', 'end_date': '05-02-2022',
+                     'start_time': '17:00', 'end_time': '18:00'}
+                ]
+            }
+        }
+    """
+    return handle_request(reserve_args(request, "validate"))
+
+
+@app.get("/quote", status_code = 200)
+@version(1, 0)
+def get_quote(request: QuoteRequest = Depends()):
+    """
+    Price a (recurring) reservation without making it, and check whether it
+    could be made now. Nothing is recorded, so a client can compare prices
+    without booking and cancelling
+
+    Takes the same fields as POST /reservations, as query parameters
+
+    Returns:
+    
+        dict object
+
+    Example returns:
+
+        {   'status_code': '200', 
+            'detail':{
+                'discount': '25', // means 25% off
+                'total_cost': '13.2', 
+                'down_payment': '6.6',
+                'available': True,
+                'violations': []
+            }
+        }
+    """
+    return handle_request(reserve_args(request, "quote"))
 
 
 @app.delete("/reservations", status_code = 200)
 @version(1, 0)
-def cancel_resrevation(request: CancellationRequest):
+def cancel_resrevation(request: CancellationRequest, response: Response, idempotency_key: Optional[str] = Header(default = None)):
     """
     Cancel a reservation
 
+    A request retried with the same Idempotency-Key header gets the response
+    of the first one, without cancelling (and refunding) again
+
     - **reservation_id**: Id of the reservation that the customer wants to cancel
 
     Returns:
@@ -144,10 +403,88 @@ def cancel_resrevation(request: CancellationRequest):
             'detail': 'error message'
         }
     """
-    return handle_request(cancel_args(request))
+    return idempotent_request(idempotency_key, "Cancellation", request, response,
+                              lambda: handle_request(cancel_args(request)))
+
+
+@app.delete("/reservations/batch", status_code = 200)
+@version(1, 0)
+def cancel_reservations(request: BatchCancellationRequest, response: Response, idempotency_key: Optional[str] = Header(default = None)):
+    """
+    Cancel several reservations at once, either a list of reservations or all
+    the reservations of a customer starting within a date range. Either all
+    the listed reservations are cancelled or none of them
+
+    - **reservation_ids**: Optional, ids of the reservations to cancel
+    - **customer_id**: Optional, the customer whose reservations to cancel
+    - **start_date**: Optional, the first start date of the customer's
+        reservations to cancel (default: today)
+    - **end_date**: Optional, the last start date of the customer's
+        reservations to cancel (default: 30 days from today)
+
+    Returns:
+    
+        dict object
+
+    Example returns:
+
+        On success:
+        {
+            'status_code': '200', 
+            'detail': {
+                'cancellations': [
+                    {'reservation_id': '12', 'percent_returned': '75', 'refund': '5.5'},
+                    {'reservation_id': '13', 'percent_returned': '50', 'refund': '0.0'}
+                ],
+                'total_refund': '5.5'
+            }
+        }
+
+        On error:
+        {
+            'detail': 'error message'
+        }
+    """
+    return idempotent_request(idempotency_key, "Cancellation", request, response,
+                              lambda: handle_request(batch_cancel_args(request)))
 
 
-@app.get("/transactions", status_code = 200)
+@app.get("/waitlist/{waitlist_id}", status_code = 200)
+@version(1, 0)
+def get_waitlist_status(waitlist_id: str):
+    """
+    Get the status of a reservation request on the waitlist: waiting, or
+    promoted along with the id of the reservation made for it. Requests are
+    dropped from the waitlist once their start date has passed
+
+    - **waitlist_id**: Id of the waitlisted request
+
+    Returns:
+    
+        dict object
+
+    Example returns:
+
+        On success:
+        {   'status_code': '200', 
+		    'detail':{
+        		    'waitlist_id': '3',
+        		    'status': 'promoted',
+        		    'reservation_id': '14'
+    		}
+	    }
+
+        On error:
+        {
+            'detail': 'error message'
+        }
+    """
+    if not waitlist_id.isdecimal():
+        reserve.handle_error(404, "Waitlist", f"Unknown waitlist id: {waitlist_id}")
+    return handle_request(['waitlist_status', waitlist_id])
+
+
+@app.get("/transactions", status_code = 200, response_class = ReportResponse)
 @version(1, 0)
 def get_transactions(request: GetTransactionRequest = Depends()):
     """
@@ -189,10 +526,177 @@ def get_transactions(request: GetTransactionRequest = Depends()):
             'detail': 'error message'
         }
     """
-    return handle_request(transaction_args(request))
+    return ReportResponse(handle_request(transaction_args(request)))
+
+
+@app.get("/transactions/summary", status_code = 200)
+@version(1, 0)
+def get_transactions_summary(request: GetSummaryRequest = Depends()):
+    """
+    Get the revenue, deposits and refunds recorded by the system per day and
+    resource between the start date and end date<br>
+    Note: The start date must be given for the end date argument to be valid
+
+    - **start_date**: optional, the start date of the summary (default: today)
+    - **end_date**: optional, the end date of the summary (default: 7 days from start_date)
+    - **resource**: optional, the resource to summarize (default: all resources)
+
+    Returns:
+
+        dict object
+
+    Example returns:
+
+        On success:
+        {
+		    "status_code": 200,
+		    "detail": {
+		    	"summary": [list of summary_data],
+		    	"totals": {"revenue": 10300.0, "deposits": 5150.0, "refunds": 0.0}
+		    }
+	    }
+	    summary_data: {
+		    "date": "04-30-2022",
+		    "resource": "hvc",
+		    "revenue": 10000.0,
+		    "deposits": 5000.0,
+		    "refunds": 0.0
+	    }
+
+        On error:
+        {
+            'detail': 'error message'
+        }
+    """
+    return handle_request(summary_args(request))
 
 
-@app.get("/reservations", status_code = 200)
+@app.get("/transactions/changes", status_code = 200, response_class = ReportResponse)
+@version(1, 0)
+def get_transactions_changes(request: GetChangesRequest = Depends()):
+    """
+    Get the transactions recorded after a sequence number, in order, so that
+    a consumer syncing the ledger only fetches the new ones. The sequence
+    number of a transaction is its id, the last_seq of a response is the
+    after of the next request
+
+    - **after**: optional, the sequence number to start after (default: 0, from the first transaction)
+    - **limit**: optional, the maximum number of transactions to return, at most 1000 (default: 100)
+
+    Returns:
+
+        dict object
+
+    Example returns:
+
+        On success:
+        {
+		    "status_code": 200,
+		    "detail": {
+		    	"changes": [list of transaction_data],
+		    	"last_seq": 57
+		    }
+	    }
+
+        On error:
+        {
+            'detail': 'error message'
+        }
+    """
+    return ReportResponse(handle_request(changes_args(request)))
+
+
+@app.get("/analytics/utilization", status_code = 200)
+@version(1, 0)
+def get_utilization(request: GetUtilizationRequest = Depends()):
+    """
+    Get the utilization of the resources (reservations over the limit of
+    is_available) in every half hour slot between the start date and end
+    date, averaged per day of the week, with the peak hours. Cancelled
+    reservations do not count
+
+    - **start_date**: optional, the first day of the report (default: 12 weeks before end_date)
+    - **end_date**: optional, the last day of the report, at most 731 days after start_date (default: today)
+    - **resource**: optional, the resource to report on (default: all of them)
+
+    Returns:
+
+        dict object
+
+    Example returns:
+
+        On success:
+        {
+		    "status_code": 200,
+		    "detail": {
+		    	"start_date": "07-27-2026",
+		    	"end_date": "10-19-2026",
+		    	"slots": ["09:00", "09:30", ..., "17:30"],
+		    	"resources": {"workshop": utilization_data, ...}
+		    }
+	    }
+	    utilization_data: {
+		    "capacity": 15,
+		    "utilization": 0.0831,
+		    "heatmap": {"mon": [0.0, 0.0667, ...], ..., "sun": [0.0, 0.0, ...]},
+		    "peak_hours": [{"day": "tue", "time": "10:00", "utilization": 0.4}, ...],
+		    "max_reserved": {"count": 9, "date": "09-15-2026", "time": "10:00"}
+	    }
+
+        On error:
+        {
+            'detail': 'error message'
+        }
+    """
+    first_day, last_day, resources = utilization_args(request)
+    report = utilization.get().report(first_day, last_day, resources)
+    return success_response(200, {"start_date": first_day.strftime('%m-%d-%Y'),
+                                  "end_date": last_day.strftime('%m-%d-%Y'), **report})
+
+
+@app.get("/customers/{customer_id}/history", status_code = 200, response_class = ReportResponse)
+@version(1, 0)
+def get_customer_history(customer_id: str, request: GetHistoryRequest = Depends()):
+    """
+    Get the history of a customer, one entry per reservation made or
+    cancelled (past ones included) in the order they were recorded, with
+    whether each reservation made is still booked. Pages are fetched with
+    the last_seq of a response as the after of the next request
+
+    - **customer_id**: Id of the customer
+    - **after**: optional, the sequence number (transaction id) to start after (default: 0, from the first one)
+    - **limit**: optional, the maximum number of entries to return, at most 1000 (default: 100)
+
+    Returns:
+
+        dict object
+
+    Example returns:
+
+        On success:
+        {
+		    "status_code": 200,
+		    "detail": {
+		    	"customer_id": "hayder",
+		    	"history": [list of history_data],
+		    	"last_seq": 57
+		    }
+	    }
+	    history_data: transaction_data, along with
+	    {
+		    "reservation": reservation_data,
+		    "booked": true
+	    }
+
+        On error:
+        {
+            'detail': 'error message'
+        }
+    """
+    return ReportResponse(handle_request(history_args(customer_id, request)))
+
+
+@app.get("/reservations", status_code = 200, response_class = ReportResponse)
 @version(1, 0)
 def get_reservation(request: GetReservationsRequest = Depends()):
     """
@@ -233,9 +737,75 @@ def get_reservation(request: GetReservationsRequest = Depends()):
             'detail': 'error message'
         }
     """
-    return handle_request(reservations_args(request))
+    return ReportResponse(handle_request(reservations_args(request)))
+
+
+@app.get("/events", status_code = 200)
+@version(1, 0)
+async def get_events(after: Optional[str] = None, last_event_id: Optional[str] = Header(default = None)):
+    """
+    Subscribe to the changes to the reservations as Server-Sent Events, pushed
+    as soon as they are made, instead of polling GET /reservations
+
+    Every reservation and cancellation (waitlist promotions included) is an
+    event of type reserve or cancel. Its id is a sequence number, the id of
+    its transaction, and its data is a JSON object with the sequence number,
+    the type, the date and the reservation_data of the reservation made or
+    cancelled. A client that reconnects gets the events it missed
+
+    - **after**: optional, the sequence number to resume from, the events
+        after it are sent first (default: only send new events)
+    - **Last-Event-ID**: header sent by EventSource clients when they
+        reconnect, same as after
 
-app = VersionedFastAPI(app)
+    Example events:
+
+        id: 57
+        event: cancel
+        data: {"seq":57,"type":"cancel","date":"5-2-2022","reservation":{reservation_data}}
+    """
+    after = after if after is not None else last_event_id
+    if after is not None and not after.isdecimal():
+        reserve.handle_error(400, "Get Events", f"Invalid sequence number: {after}")
+    if after is None:
+        after = await run_in_threadpool(latest_sequence_number)
+    return StreamingResponse(feeds.get().stream(int(after), reserve.transactions_after),
+                             media_type = "text/event-stream",
+                             headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.get("/metrics", status_code = 200)
+@version(1, 0)
+def get_metrics():
+    """
+    Get the counters of the server since it started: reservations rejected
+    per rule, and requests admitted or rejected by the rate and concurrency
+    limits, along with the requests being handled and waiting
+
+    Returns:
+    
+        dict object
+
+    Example returns:
+
+        {   'status_code': '200', 
+            'detail':{
+                'rejections': {'capacity': 12, 'opening_hours': 3},
+                'admission': {'admitted': 1520, 'rejected_client': 4, 'rejected_customer': 31,
+                              'rejected_busy': 0, 'active': 2, 'waiting': 0}
+            }
+        }
+    """
+    return success_response(200, {"rejections": logconfig.rejection_counts(), "admission": ratelimit.metrics()})
+
+# The snapshots of the shards are written on shutdown, see reserve.SNAPSHOT_EVERY
+app = VersionedFastAPI(app, on_shutdown=[reserve.write_snapshots])
+# Requests are admitted (see ratelimit.py) within the request id middleware,
+# so that rejected requests are logged with their id too, and then routed to
+# their facility (see facilities.py)
+app.add_middleware(facilities.FacilityMiddleware)
+app.add_middleware(ratelimit.AdmissionMiddleware)
+app.add_middleware(logconfig.RequestIdMiddleware)
 #-------------------- helpers -------------------#
 
 def handle_request(request, success_code=200):
@@ -257,6 +827,63 @@ def handle_request(request, success_code=200):
     return success_response(success_code, result)
 
 
+def reservation_response(request):
+    """
+    Make (or waitlist) a reservation by invoking the reservation system
+    
+    Args:
+        request (List[str]): the reserve or waitlist request to be handled
+
+    Returns:
+        A dict object containing status code (201, or 202 if the reservation
+        is waiting on the waitlist) and detail information
+    """
+    result = reserve.handle_request(request)
+    return success_response(202 if "waitlist_id" in result else 201, result)
+
+
+def idempotent_request(idempotency_key, operation_name, request, response, handle):
+    """
+    Handle a request, unless it is a retry of a request with the same
+    Idempotency-Key that succeeded, in which case the response of that
+    request is returned again (with an Idempotent-Replayed header). Keys
+    are only compared within a facility
+
+    Args:
+        idempotency_key (str): the Idempotency-Key header, or None
+        operation_name (str): name of the operation, e.g. "Reservation"
+        request (BaseModel): submitted data of the request
+        response (Response): the response, to add headers to
+        handle (callable): handles the request and returns the response content
+
+    Raises:
+        HTTPException Error: if the key was already used for a different
+        request, or the request violates any constraints specified in A-01
+
+    Returns:
+        A dict object containing status code and detail information
+    """
+    if idempotency_key is None:
+        return handle()
+    fingerprint = (operation_name, request.model_dump())
+    try:
+        result, replayed = idempotency.store.run((reserve.facility().name, idempotency_key), fingerprint, handle)
+    except idempotency.IdempotencyKeyReused:
+        reserve.handle_error(422, operation_name, "Idempotency-Key already used for a different request")
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
+
+
+def latest_sequence_number():
+    """
+    Returns the sequence number of the latest change, the id of the latest transaction
+    """
+    reserve.load_shards()
+    with reserve.facility().ids_lock:
+        return reserve.new_transaction_id() - 1
+
+
 def invalid_time_format(time):
     """
     Check if time is of HH:MM format
@@ -268,12 +895,7 @@ def invalid_time_format(time):
         True if time is not of HH:MM format;
         False otherwise
     """
-    time = time.split(':')
-    if len(time) != 2:
-        return True
-    if not time[0].isdigit() or not time[1].isdigit():
-        return True
-    return False
+    return reserve.parse_time(time) is None
 
 
 def time_after_30min(time):
@@ -286,12 +908,11 @@ def time_after_30min(time):
     Returns:
         time + 30 minutes in HH:MM format
     """
-    if invalid_time_format(time):
+    parsed = reserve.parse_time(time)
+    if parsed is None:
         return time
-    hour, minute = map(int, time.split(':'))
-    d = datetime(2022, 4, 26, hour, minute)
-    d += timedelta(minutes=30)
-    return d.strftime("%H:%M")
+    minutes = parsed[0] * 60 + parsed[1] + 30
+    return f"{minutes // 60 % 24:02d}:{minutes % 60:02d}"
 
 def date_after_7days(date):
     """
@@ -303,7 +924,7 @@ def date_after_7days(date):
     Returns:
         date + 7 days in mm-dd-yyyy format
     """
-    dt_date = datetime.strptime(date, "%m-%d-%Y")
+    dt_date = reserve.to_date(date)
     dt_date += timedelta(days=7)
     return dt_date.strftime("%m-%d-%Y")
 
@@ -330,6 +951,28 @@ def check_time_format(time):
         reserve.handle_error(400, "Reservation", f"Invalid time format: {time}")
 
 
+def days_pattern(days):
+    """
+    Check the days pattern of a recurring reservation and return it in the
+    form it is stored in (see reserve.format_days)
+    
+    Args:
+        days (str): days pattern to verify, None for every day
+
+    raise:
+        HTTPException Error: Invalid days pattern
+
+    Returns:
+        The normalized days pattern
+    """
+    if days is None:
+        return 'daily'
+    weekdays = reserve.parse_days(days)
+    if weekdays is None:
+        reserve.handle_error(400, "Reservation", f"Invalid days pattern: {days}")
+    return reserve.format_days(weekdays)
+
+
 def check_date_format(date):
     """
     Check whether format of date is valid
@@ -344,34 +987,24 @@ def check_date_format(date):
         reserve.handle_error(400, "Reservation", f"Invalid date format: {date}")
 
 
-def reserve_args(request: ReservationRequest):
+def reserve_args(request: QuoteRequest, command="reserve"):
     """
     Return a list of arguments to be sent to the reservation system
-    to create a reservation
+    to create (or validate, or quote) a reservation, the request has already been
+    checked by ReservationRequest.check_formats
     
     Args:
-        request (ReservationRequest): submitted data of the request
-    
-    raise:
-        HTTPException Error: Invalid time format
-        HTTPException Error: Invalid date format
-        HTTPException Error: Empty customer_id
+        request (QuoteRequest): submitted data of the request
+        command (str): "reserve", "waitlist", "validate" or "quote"
 
     Returns:
         List of command and arguments to sent to reservation system
         to create a reservation
     """
-    if request.customer_id == "":
-        reserve.handle_error(400, "Reservation", "Empty customer_id")
-    check_time_format(request.start_time)
-    check_time_format(request.end_time)
-    check_date_format(request.start_date)
-    check_date_format(request.end_date)
-    end_date = request.end_date if request.end_date else request.start_date
-    end_time = request.end_time if request.end_time else time_after_30min(request.start_time)
     reservation_date = get_today_date()
-    return ["reserve", request.customer_id, request.resource, request.start_date, 
-            end_date, request.start_time, end_time, reservation_date]
+    return [command, request.customer_id, request.resource, request.start_date, 
+            request.end_date, request.start_time, request.end_time, reservation_date,
+            request.days]
 
 
 def cancel_args(request: CancellationRequest):
@@ -389,6 +1022,43 @@ def cancel_args(request: CancellationRequest):
     cancellation_date = get_today_date()
     return ['cancel', request.reservation_id, cancellation_date]
 
+def batch_cancel_args(request: BatchCancellationRequest):
+    """
+    Check the arguments of a batch cancellation request, if they are correct,
+    return a list of arguments to be sent to the reservation system
+    
+    Args:
+        request (BatchCancellationRequest): submitted data of the request
+
+    Raises:
+        HTTPException Error: Neither or both of reservation_ids and customer_id
+        HTTPException Error: Invalid reservation id
+        HTTPException Error: Dates in wrong format
+
+    Returns:
+        List of command and arguments to sent to reservation system
+        to cancel the reservations
+    """
+    cancellation_date = get_today_date()
+    if (request.reservation_ids is None) == (request.customer_id is None):
+        reserve.handle_error(400, "Cancellation", "either reservation_ids or customer_id must be given")
+
+    if request.reservation_ids is not None:
+        for reservation_id in request.reservation_ids:
+            if not reservation_id.isdecimal():
+                reserve.handle_error(400, "Cancellation", f"Invalid reservation id: {reservation_id}")
+        return ['cancel_batch', cancellation_date, 'ids'] + request.reservation_ids
+
+    if request.customer_id == "":
+        reserve.handle_error(400, "Cancellation", "Empty customer_id")
+    if  not date_format_is_correct(request.start_date) or \
+        not date_format_is_correct(request.end_date):
+            reserve.handle_error(400, "Cancellation", "date format incorrect")
+    # Reservations are made at most 30 days in advance
+    start_date = request.start_date or cancellation_date
+    end_date = request.end_date or (datetime.today() + timedelta(days = 30)).strftime("%m-%d-%Y")
+    return ['cancel_batch', cancellation_date, 'customer', request.customer_id, start_date, end_date]
+
 def date_format_is_correct(date):
     """
     Check that a given date is in mm-dd-yyyy format, or is None
@@ -401,11 +1071,7 @@ def date_format_is_correct(date):
     """
     if date == None:
         return True
-    try:
-        datetime.strptime(date, "%m-%d-%Y")
-        return True
-    except:
-        return False
+    return reserve.parse_date(date) is not None
         
 
 def transaction_args(request: GetTransactionRequest):
@@ -435,6 +1101,117 @@ def transaction_args(request: GetTransactionRequest):
     return ["financial", request.start_date, request.end_date]
 
 
+def summary_args(request: GetSummaryRequest):
+    """
+    Check the format of arguments in the transactions summary request, if
+    formatting is correct, return a list of arguments to be sent to the
+    reservation system
+    
+    Args:
+        request (GetSummaryRequest): inputs received from API endpoint
+
+    Raises:
+        HTTPException Error: Dates in wrong format
+
+    Returns:
+        List of command and arguments to sent to reservation system to generate
+        a transactions summary
+    """
+    if  not date_format_is_correct(request.start_date) or \
+        not date_format_is_correct(request.end_date):
+            reserve.handle_error(400, "Get Transactions Summary", "date format incorrect")
+
+    if request.start_date == None:
+        request.start_date = get_today_date()
+        request.end_date = date_after_7days(request.start_date)
+    elif request.end_date == None:
+        request.end_date = date_after_7days(request.start_date)
+    resource = request.resource if request.resource else ""
+    return ["summary", request.start_date, request.end_date, resource]
+
+
+def utilization_args(request: GetUtilizationRequest):
+    """
+    Check the format of arguments in the utilization request, if formatting
+    is correct, return the range of days and the resources to report on
+    
+    Args:
+        request (GetUtilizationRequest): inputs received from API endpoint
+
+    Raises:
+        HTTPException Error: Dates in wrong format
+        HTTPException Error: Invalid date range
+        HTTPException Error: Unsupported resource
+
+    Returns:
+        (first_day, last_day, resources) of the report
+    """
+    if  not date_format_is_correct(request.start_date) or \
+        not date_format_is_correct(request.end_date):
+            reserve.handle_error(400, "Get Utilization", "date format incorrect")
+
+    last_day = reserve.to_date(request.end_date) if request.end_date else datetime.today().date()
+    first_day = reserve.to_date(request.start_date) if request.start_date else last_day - timedelta(weeks=12)
+    if not 0 <= (last_day - first_day).days <= 731:
+        reserve.handle_error(400, "Get Utilization", "Invalid date range")
+    if request.resource and request.resource not in reserve.RESOURCES:
+        reserve.handle_error(400, "Get Utilization", f"Unsupported resource: {request.resource}")
+    return first_day, last_day, [request.resource] if request.resource else reserve.RESOURCES
+
+
+def changes_args(request: GetChangesRequest):
+    """
+    Check the format of arguments in the transactions changes request, if
+    formatting is correct, return a list of arguments to be sent to the
+    reservation system
+    
+    Args:
+        request (GetChangesRequest): inputs received from API endpoint
+
+    Raises:
+        HTTPException Error: Invalid sequence number
+        HTTPException Error: Invalid limit
+
+    Returns:
+        List of command and arguments to sent to reservation system to list
+        the changes to the ledger
+    """
+    after = request.after if request.after is not None else "0"
+    limit = request.limit if request.limit is not None else "100"
+    if not after.isdecimal():
+        reserve.handle_error(400, "Get Transactions Changes", f"Invalid sequence number: {after}")
+    if not limit.isdecimal() or not 1 <= int(limit) <= 1000:
+        reserve.handle_error(400, "Get Transactions Changes", f"Invalid limit: {limit}")
+    return ["changes", after, limit]
+
+
+def history_args(customer_id, request: GetHistoryRequest):
+    """
+    Check the format of arguments in the customer history request, if
+    formatting is correct, return a list of arguments to be sent to the
+    reservation system
+    
+    Args:
+        customer_id (str): the customer from the path of the request
+        request (GetHistoryRequest): inputs received from API endpoint
+
+    Raises:
+        HTTPException Error: Invalid sequence number
+        HTTPException Error: Invalid limit
+
+    Returns:
+        List of command and arguments to sent to reservation system to list
+        the history of the customer
+    """
+    after = request.after if request.after is not None else "0"
+    limit = request.limit if request.limit is not None else "100"
+    if not after.isdecimal():
+        reserve.handle_error(400, "Get Customer History", f"Invalid sequence number: {after}")
+    if not limit.isdecimal() or not 1 <= int(limit) <= 1000:
+        reserve.handle_error(400, "Get Customer History", f"Invalid limit: {limit}")
+    return ["history", customer_id, after, limit]
+
+
 def reservations_args(request: GetReservationsRequest):
     """
     Check the format of arguments in the get reservations request, if formatting
@@ -479,4 +1256,23 @@ def success_response(status_code, detail):
     return {
         "status_code": status_code,
         "detail": detail
-    }
\ No newline at end of file
+    }
+
+
+def encode_record(record):
+    """
+    Serialize a report row that orjson cannot encode natively
+    
+    Args:
+        record (Reservation or Transaction): a row of a report
+
+    raise:
+        TypeError: if the object is not a report row
+
+    Returns:
+        A dataclass with the fields of the row in the report, which orjson
+        encodes natively
+    """
+    if not hasattr(record, "report_row"):
+        raise TypeError(f"Cannot serialize {type(record).__name__}")
+    return record.report_row()